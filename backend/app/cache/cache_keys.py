@@ -2,13 +2,6 @@
 import hashlib
 import json
 
-def _hash_if_needed(obj: dict, prefix: str, max_length: int = 150) -> str:
-    json_str = json.dumps(obj, sort_keys=True, default=str)
-    if len(json_str) > max_length:
-        digest = hashlib.md5(json_str.encode("utf-8")).hexdigest()
-        return f"{prefix}:{digest}"
-    return f"{prefix}:{json_str}"
-
 def generic_cache_key(prefix: str, **params) -> str:
     """
     Génère une clé Redis générique basée sur un préfixe et des paramètres.
@@ -20,37 +13,88 @@ def generic_cache_key(prefix: str, **params) -> str:
         return f"{prefix}:{digest}"
     return f"{prefix}:{json_str}"
 
+# Paramètres dont l'ordre et les doublons sont sans effet sur le résultat : leurs listes de
+# scalaires sont triées et dédoublonnées ; toute autre liste garde son ordre
+UNORDERED_PARAMS = frozenset({"cod_pro_list"})
+
+def _is_scalar(value) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+def _canonical(value, unordered: bool = False):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        items = ((k, _canonical(v, k in UNORDERED_PARAMS)) for k, v in value.items())
+        return {k: v for k, v in items if v not in (None, "")}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_canonical(v) for v in value]
+        if isinstance(value, (set, frozenset)) or unordered:
+            if all(_is_scalar(v) for v in items):
+                return sorted(dict.fromkeys(items), key=repr)
+            if isinstance(value, (set, frozenset)):
+                return sorted(items, key=lambda v: json.dumps(v, sort_keys=True, default=str))
+        return items
+    return value
+
+def canonical_key(prefix: str, **params) -> str:
+    """
+    Clé stable pour des paramètres équivalents : ensembles et listes de UNORDERED_PARAMS
+    (de scalaires) triés et dédoublonnés, autres listes dans leur ordre, chaînes nettoyées,
+    None / "" retirés, puis hash blake2b (128 bits) du JSON canonique.
+    Ne passer que les champs qui influencent le résultat ; pour un modèle Pydantic,
+    `model_dump(exclude_defaults=True)` retire aussi les valeurs par défaut.
+    """
+    canonical = _canonical(params)
+    json_str = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(json_str.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{prefix}:{digest}"
+
 # 🔔 Alertes
 def alertes_summary_key(**kwargs) -> str:
-    return _hash_if_needed(kwargs, "alertes_summary")
+    return canonical_key("alertes_summary", **kwargs)
 
 def alertes_details_key(cod_pro: int, no_tarif: int) -> str:
     return f"alertes:details:{cod_pro}:{no_tarif}"
 
 def alertes_map_key(no_tarif: int, cod_pro_list: list[int]) -> str:
-    key = ",".join(map(str, cod_pro_list))
-    return f"alertes:map:{no_tarif}:{key}"
+    return canonical_key("alertes:map", no_tarif=no_tarif, cod_pro_list=cod_pro_list)
 
 def alertes_parametrage_key() -> str:
     return "parametrage:alertes"
 
 # 📊 Dashboard
 def dashboard_kpi_key(no_tarif: int, cod_pro_list: list[int]) -> str:
-    key = ",".join(map(str, sorted(cod_pro_list)))
-    return f"dashboard:kpi:{no_tarif}:{key}"
+    return canonical_key("dashboard:kpi", no_tarif=no_tarif, cod_pro_list=cod_pro_list)
+
+def dashboard_histo_key(no_tarif: int, cod_pro_list: list[int]) -> str:
+    return canonical_key("dashboard:histoprix", no_tarif=no_tarif, cod_pro_list=cod_pro_list)
 
-def dashboard_histo_key(**kwargs) -> str:
-    return _hash_if_needed(kwargs, "dashboard:histoprix")
+def dashboard_products_key(
+    no_tarif: int, cod_pro_list: list[int], page: int, limit: int, cursor: str = None
+) -> str:
+    # La liste résolue suffit : les critères d'identification (ref_crn, refint...)
+    # n'y ajoutent rien
+    return canonical_key(
+        "dashboard:products", no_tarif=no_tarif, cod_pro_list=cod_pro_list,
+        page=page, limit=limit, cursor=cursor
+    )
 
-def dashboard_products_key(payload: dict, page: int, limit: int) -> str:
-    base = payload.copy()
-    base["page"] = page
-    base["limit"] = limit
-    return _hash_if_needed(base, "dashboard:products")
+def dashboard_bundle_key(no_tarif: int, cod_pro_list: list[int], limit: int) -> str:
+    return canonical_key(
+        "dashboard:bundle", no_tarif=no_tarif, cod_pro_list=cod_pro_list, limit=limit
+    )
 
 # 📈 Comparatif Tarifaire
 def comparatif_multi_key(**kwargs) -> str:
-    return _hash_if_needed(kwargs, "comparatif_multi")
+    return canonical_key("comparatif_multi", **kwargs)
+
+def comparatif_usage_key() -> str:
+    """Sorted set des combinaisons comparatif les plus demandées (préchauffage)"""
+    return "stats:comparatif_usage"
+
+def comparatif_pivot_tarifs_key() -> str:
+    """Tarifs disposant de colonnes dans Comparatif_Tarif_Pivot (liste blanche SQL)"""
+    return "comparatif_multi:pivot_tarifs"
 
 # 📦 Produit
 def produit_key(cod_pro: int) -> str:
@@ -58,7 +102,7 @@ def produit_key(cod_pro: int) -> str:
 
 # 🧠 Résolution produits
 def resolve_codpro_key(**kwargs) -> str:
-    return _hash_if_needed(kwargs, "resolve_codpro")
+    return canonical_key("resolve_codpro", **kwargs)
 
 def fiche_key(no_tarif: int, cod_pro: int) -> str:
     return f"fiche:{no_tarif}:{cod_pro}"
@@ -68,3 +112,25 @@ def parametres_tarifs_key() -> str:
 # Tarifs
 def tarif_filter_options_key() -> str:
     return "filter:tarif_options"
+
+def dim_tarif_cache_keys() -> list[str]:
+    """Caches dérivés de dm.Dim_Tarif, à purger ensemble après modification"""
+    return [parametres_tarifs_key(), tarif_filter_options_key()]
+# 🔢 Totaux paginés (indépendants de la page, cf. app.db.counts)
+def count_key(scope: str, **filters) -> str:
+    return canonical_key(f"count:{scope}", **filters)
+
+def table_row_count_key(table: str) -> str:
+    return f"count:table:{table}"
+# 📤 Jobs d'export (état et progression, cf. app.services.exports.jobs)
+def export_job_key(job_id: str) -> str:
+    return f"export_job:{job_id}"
+# 🏷️ Tags d'invalidation (ensembles Redis des clés dépendant d'une donnée)
+def tag_cod_pro(cod_pro: int) -> str:
+    return f"tag:cod_pro:{cod_pro}"
+
+def tag_no_tarif(no_tarif: int) -> str:
+    return f"tag:no_tarif:{no_tarif}"
+
+def tag_table(table: str) -> str:
+    return f"tag:table:{table}"
@@ -0,0 +1,103 @@
+# 📄 backend/app/cache/local_cache.py
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from app.common.redis_client import redis_client
+from app.common.logger import logger
+from app.settings import get_settings
+
+# Canal pub/sub : chaque message est la liste JSON des clés à purger dans tous les workers
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+class LocalCache:
+    """Cache LRU/TTL en mémoire du process (L1), borné en nombre d'entrées et en octets"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # clé → (expiration monotonic, taille sérialisée, valeur décodée)
+        self._entries: "OrderedDict[str, tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: int):
+        if size > self.max_bytes:
+            return
+        self._pop(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._pop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+_settings = get_settings()
+local_cache = LocalCache(
+    max_entries=_settings.LOCAL_CACHE_MAX_ENTRIES,
+    max_bytes=_settings.LOCAL_CACHE_MAX_BYTES
+)
+
+
+async def invalidate(*keys: str):
+    """Supprime les clés dans Redis et dans le L1 de tous les workers (pub/sub)"""
+    local_cache.delete(*keys)
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.delete(*keys)
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(keys))
+            await pipe.execute()
+    except Exception:
+        logger.exception(f"[Redis] invalidation échouée pour {keys}")
+
+
+async def listen_invalidations():
+    """Tâche de fond (une par worker) : applique au L1 les invalidations publiées"""
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message:
+                        local_cache.delete(*json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Des messages ont pu être perdus pendant la coupure : on repart d'un L1 vide
+            logger.exception("[Redis] écoute des invalidations interrompue, nouvel essai dans 5s")
+            local_cache.clear()
+            await asyncio.sleep(5)
@@ -0,0 +1,394 @@
+# 📄 backend/app/cache/read_through.py
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from app.common.redis_client import redis_client
+from app.common.logger import logger
+from app.cache.stats import cache_stats, key_prefix
+from app.cache.local_cache import local_cache
+from app.cache import serializer
+from app.cache.tags import register_tags
+
+# Verrou inter-workers : durée max d'un calcul avant que le verrou n'expire
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+_MISS = object()
+
+# Préfixe (sentinelle) des entrées de cache négatif : résultat vide, TTL dédié
+NEGATIVE_PREFIX = b"NEG:"
+
+# Calculs en cours dans ce process, indexés par clé Redis (single-flight) : le futur reçoit
+# la valeur calculée par l'appelant propriétaire, ou _MISS s'il a échoué / été annulé
+_inflight: dict[str, asyncio.Future] = {}
+# Rafraîchissements stale-while-revalidate en cours dans ce process
+_revalidating: dict[str, asyncio.Task] = {}
+
+
+def _lock_name(key: str) -> str:
+    return f"lock:{key}"
+
+
+def _fresh_marker(key: str) -> str:
+    """Clé témoin de fraîcheur (stale-while-revalidate) : expire après le TTL « soft »"""
+    return f"{key}:fresh"
+
+
+def _remember_local(key: str, value: Any, ttl: int):
+    local_cache.set(key, value, len(serializer.dumps(value)), ttl)
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+async def _timed_compute(key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+    start = time.perf_counter()
+    value = await compute()
+    cache_stats.observe(key_prefix(key), "compute_latency_ms", _elapsed_ms(start))
+    return value
+
+
+def _decode(key: str, raw: Optional[bytes]) -> Any:
+    if raw is None:
+        return _MISS
+    cache_stats.observe(key_prefix(key), "payload_bytes", len(raw))
+    try:
+        if raw.startswith(NEGATIVE_PREFIX):
+            cache_stats.incr(key_prefix(key), "negative_hits")
+            return serializer.loads(raw[len(NEGATIVE_PREFIX):])
+        return serializer.loads(raw)
+    except Exception:
+        # Valeur illisible (format inconnu, corrompue) : traitée comme absente
+        logger.exception(f"[Redis] décodage {key} impossible")
+        cache_stats.incr(key_prefix(key), "errors")
+        return _MISS
+
+
+async def _read(key: str) -> Any:
+    start = time.perf_counter()
+    try:
+        raw = await redis_client.get(key)
+    except Exception:
+        logger.exception(f"[Redis] lecture {key} fallback")
+        cache_stats.incr(key_prefix(key), "errors")
+        return _MISS
+    cache_stats.observe(key_prefix(key), "get_latency_ms", _elapsed_ms(start))
+    return _decode(key, raw)
+
+
+async def _read_with_freshness(key: str) -> tuple[Any, bool]:
+    start = time.perf_counter()
+    try:
+        raw, fresh = await redis_client.mget(key, _fresh_marker(key))
+    except Exception:
+        logger.exception(f"[Redis] lecture {key} fallback")
+        cache_stats.incr(key_prefix(key), "errors")
+        return _MISS, False
+    cache_stats.observe(key_prefix(key), "get_latency_ms", _elapsed_ms(start))
+    return _decode(key, raw), fresh is not None
+
+
+async def _write(
+    key: str,
+    value: Any,
+    ttl: int,
+    stale_ttl: Optional[int] = None,
+    tags: Iterable[str] = (),
+    negative_ttl: Optional[int] = None
+):
+    payload = serializer.dumps(value)
+    if negative_ttl is not None and not value:
+        payload, ttl, stale_ttl = NEGATIVE_PREFIX + payload, negative_ttl, None
+    cache_stats.observe(key_prefix(key), "payload_bytes", len(payload))
+    try:
+        if stale_ttl is None and not tags:
+            await redis_client.set(key, payload, ex=ttl)
+            return
+        async with redis_client.pipeline(transaction=False) as pipe:
+            if stale_ttl is None:
+                pipe.set(key, payload, ex=ttl)
+            else:
+                # La valeur vit ttl + stale_ttl ; le témoin de fraîcheur seulement ttl
+                pipe.set(key, payload, ex=ttl + stale_ttl)
+                pipe.set(_fresh_marker(key), 1, ex=ttl)
+            register_tags(pipe, key, tags, ttl + (stale_ttl or 0))
+            await pipe.execute()
+    except Exception:
+        logger.exception(f"[Redis] écriture {key} échouée")
+        cache_stats.incr(key_prefix(key), "errors")
+
+
+async def _wait_for_peer(key: str) -> Any:
+    """Attend qu'un autre worker (détenteur du verrou) publie la valeur"""
+    deadline = asyncio.get_running_loop().time() + LOCK_TIMEOUT
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        try:
+            raw, lock_token = await redis_client.mget(key, _lock_name(key))
+        except Exception:
+            logger.exception(f"[Redis] attente {key} fallback")
+            return _MISS
+        if raw is not None:
+            return _decode(key, raw)
+        if lock_token is None:
+            # Verrou relâché sans valeur publiée (erreur côté pair) : on calcule nous-mêmes
+            return _MISS
+    return _MISS
+
+
+async def _load(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: Optional[int] = None,
+    tags: Iterable[str] = (),
+    negative_ttl: Optional[int] = None
+) -> Any:
+    prefix = key_prefix(key)
+    lock = redis_client.lock(_lock_name(key), timeout=LOCK_TIMEOUT)
+    try:
+        acquired = await lock.acquire(blocking=False)
+    except Exception:
+        logger.exception(f"[Redis] verrou {key} indisponible, calcul direct")
+        acquired = None
+
+    if acquired is False:
+        value = await _wait_for_peer(key)
+        if value is not _MISS:
+            cache_stats.incr(prefix, "coalesced")
+            return value
+
+    cache_stats.incr(prefix, "misses")
+    try:
+        value = await _timed_compute(key, compute)
+        await _write(key, value, ttl, stale_ttl, tags, negative_ttl)
+        return value
+    finally:
+        if acquired:
+            try:
+                await lock.release()
+            except Exception:
+                logger.warning(f"[Redis] verrou {key} expiré avant libération")
+
+
+async def _revalidate(
+    key: str,
+    refresh: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int,
+    tags: Iterable[str] = ()
+):
+    """Rafraîchit en arrière-plan une entrée périmée ; un seul worker s'en charge (verrou Redis)"""
+    lock = redis_client.lock(_lock_name(key), timeout=LOCK_TIMEOUT)
+    try:
+        if not await lock.acquire(blocking=False):
+            return
+    except Exception:
+        logger.exception(f"[Redis] verrou {key} indisponible, rafraîchissement abandonné")
+        return
+    try:
+        await _write(key, await _timed_compute(key, refresh), ttl, stale_ttl, tags)
+    except Exception:
+        logger.exception(f"[Cache] rafraîchissement {key} échoué")
+    finally:
+        try:
+            await lock.release()
+        except Exception:
+            logger.warning(f"[Redis] verrou {key} expiré avant libération")
+
+
+def _schedule_revalidation(
+    key: str,
+    refresh: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int,
+    tags: Iterable[str] = ()
+):
+    if key in _revalidating:
+        return
+    task = asyncio.ensure_future(_revalidate(key, refresh, ttl, stale_ttl, tags))
+    _revalidating[key] = task
+    task.add_done_callback(lambda _: _revalidating.pop(key, None))
+
+
+async def get_or_compute(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: Optional[int] = None,
+    refresh: Optional[Callable[[], Awaitable[Any]]] = None,
+    local_ttl: Optional[int] = None,
+    tags: Iterable[str] = (),
+    negative_ttl: Optional[int] = None
+) -> Any:
+    """
+    Lecture Redis, sinon calcul + mise en cache.
+    Les calculs concurrents d'une même clé sont fusionnés : un seul calcul par process
+    et un seul calcul entre workers (verrou Redis `lock:{key}`). Le calcul s'exécute dans
+    la tâche du premier appelant, avec sa session : les autres n'attendent que le résultat
+    et, si ce calcul échoue ou est annulé, relancent le leur (avec leur propre session).
+
+    Avec `stale_ttl` (stale-while-revalidate), l'entrée est fraîche pendant `ttl` puis
+    servie périmée pendant `stale_ttl` secondes supplémentaires, le temps que `refresh`
+    la recalcule en arrière-plan. `refresh` ne doit pas dépendre de la session de la
+    requête (cf. app.db.session.run_in_session).
+
+    Avec `local_ttl`, la valeur est aussi gardée en mémoire du worker (L1, borné à `ttl`) :
+    réservé aux petits référentiels lus à chaque requête, purgés via
+    app.cache.local_cache.invalidate (propagé à tous les workers).
+
+    `tags` (cf. cache_keys.tag_*) enregistre la clé dans des ensembles Redis, purgés
+    par app.cache.tags.invalidate_tags quand la donnée sous-jacente est modifiée.
+
+    Avec `negative_ttl`, un résultat vide ([], {}, None) est mis en cache négatif :
+    entrée marquée NEGATIVE_PREFIX, gardée `negative_ttl` secondes au lieu de `ttl`
+    (non combinable avec `stale_ttl`).
+    """
+    prefix = key_prefix(key)
+    if local_ttl is not None:
+        value = local_cache.get(key, _MISS)
+        if value is not _MISS:
+            cache_stats.incr(prefix, "local_hits")
+            return value
+        value = await get_or_compute(key, compute, ttl, stale_ttl, refresh, tags=tags, negative_ttl=negative_ttl)
+        _remember_local(key, value, min(local_ttl, ttl))
+        return value
+
+    if stale_ttl is None:
+        value = await _read(key)
+    else:
+        value, fresh = await _read_with_freshness(key)
+        if value is not _MISS and not fresh:
+            cache_stats.incr(prefix, "stale")
+            _schedule_revalidation(key, refresh or compute, ttl, stale_ttl, tags)
+            return value
+    if value is not _MISS:
+        cache_stats.incr(prefix, "hits")
+        return value
+
+    flight = _inflight.get(key)
+    if flight is not None:
+        value = await asyncio.shield(flight)
+        if value is not _MISS:
+            cache_stats.incr(prefix, "coalesced")
+            return value
+        # Calcul du propriétaire échoué ou annulé : on ne partage pas son erreur
+        return await get_or_compute(key, compute, ttl, stale_ttl, refresh, tags=tags, negative_ttl=negative_ttl)
+
+    flight = asyncio.get_running_loop().create_future()
+    _inflight[key] = flight
+    value = _MISS
+    try:
+        value = await _load(key, compute, ttl, stale_ttl, tags, negative_ttl)
+        return value
+    finally:
+        _inflight.pop(key, None)
+        flight.set_result(value)
+
+
+async def get_many(keys: list[str]) -> list[Any]:
+    """Lecture de plusieurs clés en un aller-retour (MGET) ; `_MISS` pour les absentes"""
+    if not keys:
+        return []
+    start = time.perf_counter()
+    try:
+        raws = await redis_client.mget(*keys)
+    except Exception:
+        logger.exception(f"[Redis] lecture groupée de {len(keys)} clés fallback")
+        for key in keys:
+            cache_stats.incr(key_prefix(key), "errors")
+        return [_MISS] * len(keys)
+    elapsed = _elapsed_ms(start)
+    values = []
+    for key, raw in zip(keys, raws):
+        cache_stats.observe(key_prefix(key), "get_latency_ms", elapsed)
+        values.append(_decode(key, raw))
+    return values
+
+
+async def set_many(values: dict[str, Any], ttl: int, tags: Optional[dict[str, Iterable[str]]] = None):
+    """Écriture de plusieurs clés (et de leurs tags) en un seul pipeline"""
+    if not values:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                payload = serializer.dumps(value)
+                cache_stats.observe(key_prefix(key), "payload_bytes", len(payload))
+                pipe.set(key, payload, ex=ttl)
+                register_tags(pipe, key, (tags or {}).get(key, ()), ttl)
+            await pipe.execute()
+    except Exception:
+        logger.exception(f"[Redis] écriture groupée de {len(values)} clés échouée")
+        for key in values:
+            cache_stats.incr(key_prefix(key), "errors")
+
+
+async def get_or_compute_many(
+    keys: dict[Any, str],
+    compute_missing: Callable[[list[Any]], Awaitable[dict[Any, Any]]],
+    ttl: int,
+    tags: Optional[Callable[[Any], Iterable[str]]] = None
+) -> dict[Any, Any]:
+    """
+    Variante groupée de get_or_compute : `keys` associe un identifiant (ex: cod_pro)
+    à sa clé Redis. Un MGET pour tout le lot, puis un seul appel à `compute_missing`
+    pour les identifiants absents (une requête SQL groupée, qui doit renvoyer une valeur
+    pour chacun, même vide) et un pipeline d'écriture.
+    Pas de single-flight par clé : le lot entier est l'unité de calcul.
+    """
+    items = list(keys)
+    cached = await get_many([keys[item] for item in items])
+    result, missing = {}, []
+    for item, value in zip(items, cached):
+        if value is _MISS:
+            missing.append(item)
+        else:
+            cache_stats.incr(key_prefix(keys[item]), "hits")
+            result[item] = value
+    if not missing:
+        return result
+
+    for item in missing:
+        cache_stats.incr(key_prefix(keys[item]), "misses")
+    computed = await _timed_compute(keys[missing[0]], lambda: compute_missing(missing))
+    await set_many(
+        {keys[item]: computed[item] for item in missing},
+        ttl,
+        tags={keys[item]: tags(item) for item in missing} if tags else None
+    )
+    result.update(computed)
+    return result
+
+
+def read_through(
+    key: Callable[..., str],
+    ttl: int,
+    local_ttl: Optional[int] = None,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    negative_ttl: Optional[int] = None
+):
+    """
+    Décorateur read-through : `key` (et `tags`) reçoivent les mêmes arguments que la
+    fonction décorée. `local_ttl` (cache mémoire L1) et `negative_ttl` (cache négatif) :
+    cf. get_or_compute.
+
+        @read_through(key=lambda no_tarif, cod_pro, db: fiche_key(no_tarif, cod_pro), ttl=REDIS_TTL_MEDIUM)
+        async def fetch_product_fiche(no_tarif, cod_pro, db): ...
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await get_or_compute(
+                key(*args, **kwargs),
+                lambda: func(*args, **kwargs),
+                ttl,
+                local_ttl=local_ttl,
+                tags=tags(*args, **kwargs) if tags else (),
+                negative_ttl=negative_ttl
+            )
+        return wrapper
+    return decorator
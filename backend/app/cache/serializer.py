@@ -0,0 +1,94 @@
+# 📄 backend/app/cache/serializer.py
+"""
+Format binaire des valeurs mises en cache dans Redis.
+
+    MAGIC (3 octets) | version (1 octet) | codec (1 octet) | corps
+
+Le corps est du JSON (orjson si installé, sinon json), compressé (zstd si installé,
+sinon zlib) au-delà de COMPRESS_MIN_BYTES. Les valeurs sans en-tête (anciens
+json.dumps) restent lisibles, ce qui permet un déploiement sans purge de Redis.
+"""
+import datetime
+import decimal
+import json
+import zlib
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    zstandard = None
+
+MAGIC = b"CBM"
+VERSION = 1
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# En dessous de ce seuil la compression coûte plus qu'elle ne rapporte
+COMPRESS_MIN_BYTES = 1024
+ZLIB_LEVEL = 1
+ZSTD_LEVEL = 3
+
+_HEADER_SIZE = len(MAGIC) + 2
+
+_zstd_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard else None
+_zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(obj).__name__}")
+
+
+def _to_json(value: Any, default: Callable[[Any], Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=default, separators=(",", ":")).encode()
+
+
+def _from_json(body: bytes) -> Any:
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Sérialise une valeur pour Redis (en-tête + JSON éventuellement compressé)"""
+    body = _to_json(value, default or _default)
+    codec = CODEC_RAW
+    if len(body) >= COMPRESS_MIN_BYTES:
+        if _zstd_compressor is not None:
+            body, codec = _zstd_compressor.compress(body), CODEC_ZSTD
+        else:
+            body, codec = zlib.compress(body, ZLIB_LEVEL), CODEC_ZLIB
+    return MAGIC + bytes((VERSION, codec)) + body
+
+
+def loads(raw: bytes) -> Any:
+    """Désérialise une valeur lue dans Redis (format binaire ou ancien JSON brut)"""
+    if isinstance(raw, str):
+        raw = raw.encode()
+    if not raw.startswith(MAGIC):
+        return _from_json(raw)
+
+    version, codec = raw[len(MAGIC)], raw[len(MAGIC) + 1]
+    if version != VERSION:
+        raise ValueError(f"Version de format cache inconnue : {version}")
+    body = raw[_HEADER_SIZE:]
+    if codec == CODEC_ZSTD:
+        if _zstd_decompressor is None:
+            raise ValueError("Valeur compressée en zstd mais 'zstandard' n'est pas installé")
+        body = _zstd_decompressor.decompress(body)
+    elif codec == CODEC_ZLIB:
+        body = zlib.decompress(body)
+    elif codec != CODEC_RAW:
+        raise ValueError(f"Codec de cache inconnu : {codec}")
+    return _from_json(body)
@@ -0,0 +1,127 @@
+# 📄 backend/app/cache/stats.py
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Any, List
+
+# Bornes supérieures des histogrammes (format Prometheus, +Inf implicite)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """Histogramme à bornes fixes (agrégeable entre workers côté Prometheus)"""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Approximation : borne supérieure du bucket contenant le quantile"""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return float(self.buckets[-1])
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": round(self.sum / self.count, 2) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+class CacheStats:
+    """Compteurs et histogrammes de la couche read-through, par préfixe de clé (par process)"""
+
+    # negative_hits : sous-ensemble de hits / coalesced servis depuis une entrée de cache négatif
+    EVENTS = ("local_hits", "hits", "stale", "misses", "coalesced", "errors", "negative_hits")
+    HISTOGRAMS = {
+        "get_latency_ms": LATENCY_BUCKETS_MS,
+        "compute_latency_ms": LATENCY_BUCKETS_MS,
+        "payload_bytes": SIZE_BUCKETS_BYTES,
+    }
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.EVENTS, 0))
+        self._histograms: Dict[str, Dict[str, Histogram]] = defaultdict(
+            lambda: {name: Histogram(buckets) for name, buckets in self.HISTOGRAMS.items()}
+        )
+
+    def incr(self, prefix: str, event: str, amount: int = 1):
+        self._counters[prefix][event] += amount
+
+    def observe(self, prefix: str, metric: str, value: float):
+        self._histograms[prefix][metric].observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        totals = dict.fromkeys(self.EVENTS, 0)
+        by_prefix = {}
+        for prefix in sorted(set(self._counters) | set(self._histograms)):
+            counters = dict(self._counters.get(prefix) or dict.fromkeys(self.EVENTS, 0))
+            for event in self.EVENTS:
+                totals[event] += counters[event]
+            counters["hit_rate"] = _hit_rate(counters)
+            for name, histogram in self._histograms.get(prefix, {}).items():
+                counters[name] = histogram.snapshot()
+            by_prefix[prefix] = counters
+        return {
+            "totals": totals,
+            "hit_rate": _hit_rate(totals),
+            "by_prefix": by_prefix,
+        }
+
+    def to_prometheus(self) -> str:
+        """Exposition au format texte Prometheus (v0.0.4)"""
+        lines = [
+            "# HELP cbm_cache_events_total Evenements de la couche cache read-through",
+            "# TYPE cbm_cache_events_total counter",
+        ]
+        for prefix, counters in sorted(self._counters.items()):
+            for event, value in counters.items():
+                lines.append(f'cbm_cache_events_total{{prefix="{prefix}",event="{event}"}} {value}')
+        for name in self.HISTOGRAMS:
+            metric = f"cbm_cache_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for prefix, histograms in sorted(self._histograms.items()):
+                histogram = histograms[name]
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{prefix="{prefix}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{prefix="{prefix}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{prefix="{prefix}"}} {round(histogram.sum, 3)}')
+                lines.append(f'{metric}_count{{prefix="{prefix}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        self._counters.clear()
+        self._histograms.clear()
+
+
+def _hit_rate(counters: Dict[str, int]) -> float:
+    served = counters["local_hits"] + counters["hits"] + counters["stale"] + counters["coalesced"]
+    return round(served / max(served + counters["misses"], 1), 4)
+
+
+def key_prefix(key: str) -> str:
+    """Préfixe logique d'une clé Redis (ex: 'dashboard:kpi:42:1,2' → 'dashboard:kpi')"""
+    parts = key.split(":")
+    prefix = [parts[0]]
+    if len(parts) > 1 and parts[1].replace("_", "").isalpha():
+        prefix.append(parts[1])
+    return ":".join(prefix)
+
+
+cache_stats = CacheStats()
@@ -0,0 +1,52 @@
+# 📄 backend/app/cache/tags.py
+from typing import Iterable
+
+from app.common.redis_client import redis_client
+from app.common.logger import logger
+from app.cache.local_cache import INVALIDATION_CHANNEL, local_cache
+
+# Lecture des ensembles, suppression des clés et des tags, publication aux workers : un seul
+# script, donc atomique (une clé taguée entre la lecture et la purge ne peut pas survivre).
+# UNLINK par paquets de 1000 (limite d'arguments de unpack côté Lua).
+INVALIDATE_TAGS_SCRIPT = """
+local keys = {}
+for _, tag in ipairs(KEYS) do
+    for _, key in ipairs(redis.call('SMEMBERS', tag)) do
+        keys[#keys + 1] = key
+    end
+end
+for i = 1, #keys, 1000 do
+    redis.call('UNLINK', unpack(keys, i, math.min(i + 999, #keys)))
+end
+redis.call('UNLINK', unpack(KEYS))
+local purged = {unpack(KEYS)}
+for _, key in ipairs(keys) do
+    purged[#purged + 1] = key
+end
+redis.call('PUBLISH', ARGV[1], cjson.encode(purged))
+return keys
+"""
+
+
+def register_tags(pipe, key: str, tags: Iterable[str], ttl: int):
+    """
+    Ajoute `key` aux ensembles de ses tags, dans le pipeline d'écriture de la valeur.
+    `ttl` : durée de vie de la clé (stale compris). Le TTL d'un tag n'est jamais raccourci,
+    il couvre ainsi la plus durable de ses clés.
+    """
+    for tag in tags:
+        pipe.sadd(tag, key)
+        pipe.expire(tag, ttl, nx=True)
+        pipe.expire(tag, ttl, gt=True)
+
+
+async def invalidate_tags(*tags: str):
+    """Purge (Redis + L1 de tous les workers) toutes les clés enregistrées sous ces tags"""
+    if not tags:
+        return
+    try:
+        keys = await redis_client.eval(INVALIDATE_TAGS_SCRIPT, len(tags), *tags, INVALIDATION_CHANNEL)
+    except Exception:
+        logger.exception(f"[Redis] invalidation des tags {tags} échouée")
+        return
+    local_cache.delete(*(k.decode() if isinstance(k, bytes) else k for k in keys), *tags)
@@ -0,0 +1,125 @@
+# 📄 backend/app/cache/warmup.py
+"""
+Préchauffage du cache après un déploiement ou un flush Redis.
+
+    python -m app.cache.warmup [--pages 3] [--top 10] [--concurrency 4]
+
+Lancé aussi au démarrage de l'API si CACHE_WARMUP_ON_STARTUP est activé.
+Chaque calcul passe par sa propre session, au plus `concurrency` à la fois pour
+ne pas épuiser le pool de connexions face au trafic réel.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.cache.cache_keys import comparatif_usage_key
+from app.common.redis_client import redis_client
+from app.common.logger import logger
+from app.db.session import run_in_session
+from app.schemas.alertes.alertes_schema import AlertesSummaryRequest
+from app.schemas.tarifs.comparatif_multi_schema import ComparatifFilterRequest
+from app.services.alertes.alertes_service import get_alertes_summary, get_parametrage_regles
+from app.services.tarifs.comparatif_multi_service import get_comparatif_multi
+from app.services.tarifs.tarif_service import get_tarif_filter_options
+from app.settings import get_settings
+
+# Un seul worker uvicorn préchauffe ; les autres profitent du résultat via Redis
+WARMUP_LOCK_KEY = "lock:warmup"
+WARMUP_LOCK_TIMEOUT = 600
+
+
+async def _warm(semaphore: asyncio.Semaphore, label: str, func, *args, **kwargs) -> bool:
+    async with semaphore:
+        try:
+            await run_in_session(func, *args, **kwargs)
+            return True
+        except Exception:
+            logger.exception(f"[Warmup] {label} échoué")
+            return False
+
+
+async def _top_comparatif_combinations(top: int) -> list[dict]:
+    try:
+        members = await redis_client.zrevrange(comparatif_usage_key(), 0, top - 1)
+    except Exception:
+        logger.exception("[Redis] lecture usage comparatif échouée")
+        return []
+    return [json.loads(m) for m in members]
+
+
+async def _visible_tarifs() -> list[int]:
+    try:
+        return [t["no_tarif"] for t in await run_in_session(get_tarif_filter_options)]
+    except Exception:
+        logger.exception("[Warmup] lecture des tarifs visibles échouée, synthèses alertes ignorées")
+        return []
+
+
+async def warmup_caches(pages: int = None, top: int = None, concurrency: int = None) -> dict:
+    settings = get_settings()
+    pages = pages or settings.CACHE_WARMUP_PAGES
+    top = top or settings.CACHE_WARMUP_TOP_COMBINATIONS
+    semaphore = asyncio.Semaphore(concurrency or settings.CACHE_WARMUP_CONCURRENCY)
+    start = time.perf_counter()
+
+    # Référentiels : nécessaires pour connaître les tarifs visibles
+    results = await asyncio.gather(
+        _warm(semaphore, "options tarifs", get_tarif_filter_options),
+        _warm(semaphore, "paramétrage alertes", get_parametrage_regles)
+    )
+    visible_tarifs = await _visible_tarifs()
+
+    jobs = []
+    for combination in await _top_comparatif_combinations(top):
+        for page in range(1, pages + 1):
+            payload = ComparatifFilterRequest(**combination, page=page)
+            # Non compté : le préchauffage ne doit pas renforcer son propre classement d'usage
+            jobs.append(_warm(
+                semaphore, f"comparatif {combination} p{page}", get_comparatif_multi,
+                payload=payload, record_usage=False
+            ))
+    for no_tarif in visible_tarifs:
+        payload = AlertesSummaryRequest(no_tarif=no_tarif)
+        jobs.append(_warm(semaphore, f"synthèse alertes {no_tarif}", get_alertes_summary, payload))
+    results += await asyncio.gather(*jobs)
+
+    summary = {
+        "warmed": sum(results),
+        "failed": len(results) - sum(results),
+        "duration_s": round(time.perf_counter() - start, 2)
+    }
+    logger.info(f"[Warmup] {summary['warmed']}/{len(results)} entrées préchauffées en {summary['duration_s']}s")
+    return summary
+
+
+async def warmup_on_startup():
+    """Tâche de démarrage : préchauffe si aucun autre worker ne l'a déjà lancé"""
+    try:
+        if not await redis_client.set(WARMUP_LOCK_KEY, 1, nx=True, ex=WARMUP_LOCK_TIMEOUT):
+            logger.info("[Warmup] déjà lancé par un autre worker")
+            return
+    except Exception:
+        logger.exception("[Redis] verrou warmup indisponible, préchauffage ignoré")
+        return
+    try:
+        await warmup_caches()
+    except Exception:
+        logger.exception("[Warmup] préchauffage interrompu")
+
+
+async def _main(args):
+    from app.db.engine import engine
+    try:
+        await warmup_caches(pages=args.pages, top=args.top, concurrency=args.concurrency)
+    finally:
+        await engine.dispose()
+        await redis_client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Préchauffage du cache Redis CBM Pricing")
+    parser.add_argument("--pages", type=int, help="pages comparatif par combinaison")
+    parser.add_argument("--top", type=int, help="nombre de combinaisons de tarifs les plus utilisées")
+    parser.add_argument("--concurrency", type=int, help="calculs simultanés maximum")
+    asyncio.run(_main(parser.parse_args()))
@@ -3,5 +3,12 @@
 REDIS_TTL_SHORT = 30
 REDIS_TTL_MEDIUM = 600
 REDIS_TTL_LONG = 86400
+# Stale-while-revalidate : durée pendant laquelle une entrée périmée reste servie
+REDIS_TTL_STALE = 600
+# Cache négatif : résultat vide (produit / ref_crn inconnu) gardé peu de temps
+REDIS_TTL_NEGATIVE = 60
+
+# Nombre max de cod_pro par requête (liste transmise en un paramètre JSON / OPENJSON)
+MAX_COD_PRO_LIST = 50_000
 
 DEFAULT_PAGE_SIZE = 100
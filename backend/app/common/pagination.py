@@ -1,2 +1,40 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+
 def calculate_offset(page: int, limit: int) -> int:
     return max((page - 1), 0) * limit
+
+
+def _cursor_value(value):
+    # Valeurs rebindées telles quelles côté SQL Server (conversion implicite vers le type colonne)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="milliseconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(sort: str, values: list) -> str:
+    """
+    Curseur opaque de pagination keyset : valeurs des colonnes de tri de la dernière
+    ligne servie, liées à la signature du tri (`sort`, ex: "ca_total:desc").
+    """
+    raw = json.dumps({"s": sort, "v": [_cursor_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    """Valeurs du curseur ; ValueError si illisible ou émis pour un autre tri"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values, cursor_sort = data["v"], data["s"]
+    except Exception:
+        raise ValueError("Curseur de pagination invalide.")
+    if cursor_sort != sort or not isinstance(values, list):
+        raise ValueError("Curseur de pagination émis pour un autre tri.")
+    return values
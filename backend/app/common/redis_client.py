@@ -1,16 +1,22 @@
 # app/common/redis_client.py
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
 from app.settings import get_settings
 from app.common.logger import logger
 
 _settings = get_settings()
-redis_client = Redis(
+
+# Pool borné : au-delà de REDIS_MAX_CONNECTIONS, on attend une connexion libre
+# (REDIS_POOL_TIMEOUT) au lieu d'en ouvrir sans limite sous forte charge
+redis_pool = BlockingConnectionPool(
     host=_settings.REDIS_HOST,
     port=_settings.REDIS_PORT,
+    max_connections=_settings.REDIS_MAX_CONNECTIONS,
+    timeout=_settings.REDIS_POOL_TIMEOUT,
     socket_timeout=5,
     socket_connect_timeout=5,
     retry_on_timeout=True
 )
+redis_client = Redis(connection_pool=redis_pool)
 
 async def test_connection():
     try:
@@ -1,4 +1,5 @@
 # 📄 backend/app/common/sql_utils.py
+import json
 
 def build_placeholders(name: str, count: int) -> str:
     return ", ".join(f":{name}{i}" for i in range(count))
@@ -6,6 +7,21 @@ def build_placeholders(name: str, count: int) -> str:
 def build_params(name: str, values: list) -> dict:
     return {f"{name}{i}": v for i, v in enumerate(values)}
 
+def json_int_list(name: str, values: list[int]) -> tuple[str, dict]:
+    """
+    Liste d'entiers transmise en UN paramètre JSON, dépliée par OPENJSON (SQL Server 2016+).
+    Le texte SQL ne dépend plus de la taille de la liste (plan réutilisé) et n'est plus
+    limité à 2100 paramètres ODBC. Retourne le sous-select à placer dans `IN (...)`
+    et le paramètre associé :
+
+        in_sql, params = json_int_list("cod_pro_json", cod_pro_list)
+        f"... WHERE cod_pro IN ({in_sql})"
+    """
+    return (
+        f"SELECT CAST([value] AS INT) FROM OPENJSON(:{name})",
+        {name: json.dumps([int(v) for v in values])}
+    )
+
 def sanitize_sort_column(column: str | None, valid_columns: set[str] | list[str], default: str = "id", strict: bool = False) -> str:
     safe_columns = set(valid_columns)
     if column in safe_columns:
@@ -19,3 +35,30 @@ def sanitize_sort_direction(direction: str | None) -> str:
     Valide la direction de tri (asc/desc). Par défaut : 'asc'.
     """
     return direction.lower() if direction and direction.lower() in {"asc", "desc"} else "asc"
+
+def keyset_condition(keys: list[tuple[str, str]], values: list, name: str = "seek") -> tuple[str, dict]:
+    """
+    Prédicat « strictement après » pour la pagination keyset sur `keys` [(colonne, asc|desc)],
+    à combiner avec `ORDER BY` sur les mêmes colonnes (la dernière doit être unique).
+    Suit l'ordre SQL Server des NULL (en tête en ASC, en fin en DESC) :
+
+        seek_sql, params = keyset_condition([("ca_total", "desc"), ("cod_pro", "asc")], [1250.0, 42])
+        f"... WHERE {seek_sql} ORDER BY ca_total DESC, cod_pro ASC"
+    """
+    if len(keys) != len(values):
+        raise ValueError("Curseur de pagination incompatible avec le tri.")
+
+    params, equal, branches = {}, [], []
+    for i, ((column, direction), value) in enumerate(zip(keys, values)):
+        param = f"{name}{i}"
+        if value is None:
+            after = "1 = 0" if direction == "desc" else f"{column} IS NOT NULL"
+            same = f"{column} IS NULL"
+        else:
+            params[param] = value
+            after = f"({column} < :{param} OR {column} IS NULL)" if direction == "desc" else f"{column} > :{param}"
+            same = f"{column} = :{param}"
+        if after != "1 = 0":
+            branches.append(f"({' AND '.join(equal)} AND {after})" if equal else after)
+        equal.append(same)
+    return "(" + " OR ".join(branches or ["1 = 0"]) + ")", params
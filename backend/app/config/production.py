@@ -30,9 +30,7 @@ class ProductionSettings(BaseSettings):
     DB_USER: str = Field(..., description="Utilisateur SQL Server")
     DB_PASSWORD: str = Field(..., description="Mot de passe SQL Server")
     DB_DRIVER: str = Field(default="ODBC Driver 17 for SQL Server", description="Driver ODBC")
-    DB_POOL_SIZE: int = Field(default=20, description="Taille du pool de connexions")
-    DB_MAX_OVERFLOW: int = Field(default=30, description="Connexions supplémentaires max")
-    DB_POOL_TIMEOUT: int = Field(default=60, description="Timeout pool en secondes")
+    # Pool de connexions : DB_POOL_* de app.settings, seuls lus par app.db.engine
     
     # === Redis ===
     REDIS_HOST: str = Field(default="localhost", description="Host Redis")
@@ -0,0 +1,58 @@
+# 📄 backend/app/db/counts.py
+"""
+Totaux des listes paginées, sans COUNT(*) à chaque page :
+
+- count_total : COUNT exact mis en cache par signature de filtres (cache_keys.count_key,
+  indépendant de la page / du curseur) ; pour une table lue sans aucun filtre, total
+  approché lu dans sys.dm_db_partition_stats (métadonnées, pas de scan) ;
+- WINDOW_TOTAL_COLUMN : total calculé dans la requête de données via COUNT(*) OVER().
+
+Les réponses exposent `total_exact` : False quand le total vient des statistiques.
+"""
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.cache_keys import table_row_count_key
+from app.cache.read_through import get_or_compute, read_through
+from app.common.constants import REDIS_TTL_MEDIUM
+from app.common.logger import logger
+
+# Colonne à ajouter aux SELECT paginés : `COUNT(*) OVER() AS total_count`
+WINDOW_TOTAL_COLUMN = "total_count"
+
+
+@read_through(key=lambda db, table: table_row_count_key(table), ttl=REDIS_TTL_MEDIUM)
+async def table_row_count(db: AsyncSession, table: str) -> int:
+    """Nombre de lignes (tas ou index cluster) d'après sys.dm_db_partition_stats"""
+    result = await db.execute(text("""
+        SELECT SUM(row_count)
+        FROM sys.dm_db_partition_stats
+        WHERE object_id = OBJECT_ID(:table) AND index_id IN (0, 1)
+    """), {"table": table})
+    total = result.scalar()
+    if total is None:
+        raise LookupError(f"Table inconnue : {table}")
+    return int(total)
+
+
+async def count_total(
+    db: AsyncSession,
+    key: str,
+    compute: Callable[[], Awaitable[int]],
+    unfiltered_table: Optional[str] = None,
+    ttl: int = REDIS_TTL_MEDIUM,
+    tags: Iterable[str] = ()
+) -> Tuple[int, bool]:
+    """
+    Retourne (total, total_exact). `unfiltered_table` : à passer seulement quand la
+    requête ne filtre pas la table ; repli sur le COUNT exact si la DMV est inaccessible
+    (droit VIEW DATABASE STATE).
+    """
+    if unfiltered_table:
+        try:
+            return await table_row_count(db, unfiltered_table), False
+        except Exception:
+            logger.exception(f"[DB] statistiques de partition {unfiltered_table} indisponibles, COUNT exact")
+    return await get_or_compute(key, compute, ttl, tags=tags), True
@@ -7,6 +7,7 @@ from sqlalchemy.exc import OperationalError
 from sqlalchemy import text  # Manquait ici
 from app.settings import get_settings
 from app.common.logger import logger  # 💥 Corrige l'erreur d'import
+from app.db.pool_stats import pool_stats, TimedAsyncAdaptedQueuePool
 
 
 settings = get_settings()
@@ -27,11 +28,14 @@ engine = create_async_engine(
     async_url,
     echo=False,
     future=True,
-    pool_size=50,
-    max_overflow=5,
-    pool_timeout=5,
-    pool_pre_ping=True
+    poolclass=TimedAsyncAdaptedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING
 )
+pool_stats.instrument(engine.sync_engine.pool)
 
 async def test_db_connection():
     try:
@@ -0,0 +1,33 @@
+# 📄 backend/app/db/fanout.py
+"""
+Exécution concurrente de requêtes SQL indépendantes.
+
+Une AsyncSession ne traite qu'une requête à la fois : pour paralléliser un COUNT et
+une page de données (ou plusieurs agrégats), chaque appel reçoit sa propre session,
+donc sa propre connexion du pool. Une session ne prend une connexion qu'à sa première
+requête : un appel servi depuis le cache n'en consomme pas.
+
+    total, rows = await fanout(
+        partial(count_rows, filters=filters),
+        partial(fetch_page, filters=filters, offset=0, limit=100),
+        db=db,
+    )
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import run_in_session
+
+
+async def fanout(*calls: Callable[..., Awaitable[Any]], db: Optional[AsyncSession] = None) -> list:
+    """
+    Lance chaque `call(db=session)` sur une session dédiée ; résultats dans l'ordre des appels.
+    Avec `db` (session de la requête, inactive pendant le fan-out), le premier appel la
+    réutilise : une connexion de moins prise au pool.
+    """
+    coroutines = [run_in_session(call) for call in calls[1 if db is not None else 0:]]
+    if db is not None and calls:
+        coroutines.insert(0, calls[0](db=db))
+    return list(await asyncio.gather(*coroutines))
@@ -0,0 +1,137 @@
+# 📄 backend/app/db/pool_stats.py
+"""
+Métriques du pool de connexions SQL Server (par process) : attente au checkout,
+connexions empruntées, débordement (max_overflow) et timeouts.
+
+À comparer à la concurrence réelle pour dimensionner DB_POOL_SIZE / DB_MAX_OVERFLOW :
+un p95 d'attente non nul ou des timeouts signalent un pool trop petit, un pic
+d'emprunt très inférieur à pool_size un pool surdimensionné.
+"""
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.cache.stats import Histogram, LATENCY_BUCKETS_MS
+
+
+class PoolStats:
+    """Compteurs alimentés par les événements du pool et par TimedPoolMixin"""
+
+    EVENTS = ("checkouts", "checkins", "connects", "invalidations", "timeouts")
+
+    def __init__(self):
+        self._pool: Optional[Pool] = None
+        self.reset()
+
+    def instrument(self, pool: Pool):
+        """Branche les écouteurs d'événements sur `pool` (une fois, au démarrage)"""
+        self._pool = pool
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+
+    def observe_wait(self, wait_ms: float, timed_out: bool = False):
+        self.wait_ms.observe(wait_ms)
+        if timed_out:
+            self.counters["timeouts"] += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.counters["connects"] += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.counters["checkouts"] += 1
+        if self._pool is not None:
+            self.peak_checked_out = max(self.peak_checked_out, self._pool.checkedout())
+            self.peak_overflow = max(self.peak_overflow, _overflow(self._pool))
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.counters["checkins"] += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.counters["invalidations"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot: Dict[str, Any] = {
+            **self.counters,
+            "checkout_wait_ms": self.wait_ms.snapshot(),
+            "peak_checked_out": self.peak_checked_out,
+            "peak_overflow": self.peak_overflow,
+        }
+        pool = self._pool
+        if pool is not None:
+            size = pool.size()
+            checked_out = pool.checkedout()
+            snapshot.update({
+                "pool_size": size,
+                "max_overflow": getattr(pool, "_max_overflow", 0),
+                "timeout_s": getattr(pool, "_timeout", None),
+                "checked_out": checked_out,
+                "checked_in": pool.checkedin(),
+                "overflow": _overflow(pool),
+                "saturation": round(checked_out / max(size + getattr(pool, "_max_overflow", 0), 1), 4),
+            })
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """Exposition au format texte Prometheus (v0.0.4)"""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP cbm_db_pool_events_total Evenements du pool de connexions SQL Server",
+            "# TYPE cbm_db_pool_events_total counter",
+        ]
+        for name in self.EVENTS:
+            lines.append(f'cbm_db_pool_events_total{{event="{name}"}} {self.counters[name]}')
+        lines.append("# TYPE cbm_db_pool_connections gauge")
+        for state in ("pool_size", "checked_out", "checked_in", "overflow", "peak_checked_out", "peak_overflow"):
+            if state in snapshot:
+                lines.append(f'cbm_db_pool_connections{{state="{state}"}} {snapshot[state]}')
+        metric = "cbm_db_pool_checkout_wait_ms"
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in zip(self.wait_ms.buckets, self.wait_ms.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {self.wait_ms.count}')
+        lines.append(f"{metric}_sum {round(self.wait_ms.sum, 3)}")
+        lines.append(f"{metric}_count {self.wait_ms.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        self.counters: Dict[str, int] = dict.fromkeys(self.EVENTS, 0)
+        self.wait_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+
+
+def _overflow(pool: Pool) -> int:
+    """Connexions ouvertes au-delà de pool_size (QueuePool.overflow() est négatif tant que le pool n'est pas plein)"""
+    overflow = getattr(pool, "overflow", None)
+    return max(overflow(), 0) if overflow else 0
+
+
+pool_stats = PoolStats()
+
+
+class TimedPoolMixin:
+    """
+    Mesure l'attente d'une connexion : l'événement "checkout" n'est émis qu'une fois la
+    connexion obtenue, la durée passée à attendre une connexion libre n'y est pas visible.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.observe_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        pool_stats.observe_wait((time.perf_counter() - start) * 1000)
+        return connection
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    """Pool par défaut des moteurs async, instrumenté"""
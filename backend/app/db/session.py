@@ -9,3 +9,8 @@ async_session = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession
 async def get_session():
     async with async_session() as session:
         yield session
+
+async def run_in_session(func, *args, **kwargs):
+    """Exécute func(*args, db=session, **kwargs) dans une session dédiée (tâches de fond)"""
+    async with async_session() as session:
+        return await func(*args, db=session, **kwargs)
@@ -10,13 +10,18 @@ from starlette.middleware.trustedhost import TrustedHostMiddleware
 from starlette.requests import Request
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
+import asyncio
 import time
 import redis.asyncio as redis
 
 from app.settings import get_settings
 from app.db.engine import test_db_connection
 from app.common.logger import logger
-from app.common.redis_client import test_connection, redis_client
+from app.common.redis_client import test_connection, redis_client, redis_pool
+from app.cache.local_cache import listen_invalidations
+from app.cache.warmup import warmup_on_startup
+from app.services.dashboard.ventes_mensuelles import refresh_loop
+from app.services.exports.jobs import cleanup_loop as export_cleanup_loop
 
 # === Chargement des paramètres ===
 settings = get_settings()
@@ -80,6 +85,16 @@ async def startup():
     await test_connection()
     if not await test_db_connection():
         raise RuntimeError("La base de données est inaccessible.")
+    # Invalidation du cache local (L1) propagée entre workers via pub/sub
+    app.state.cache_invalidation_listener = asyncio.create_task(listen_invalidations())
+    # Préchauffage en arrière-plan : ne retarde pas l'ouverture du service
+    if settings.CACHE_WARMUP_ON_STARTUP:
+        app.state.cache_warmup = asyncio.create_task(warmup_on_startup())
+    # Rafraîchissement incrémental du datamart des ventes mensuelles
+    if settings.DASHBOARD_DATAMART_REFRESH_MINUTES > 0:
+        app.state.datamart_refresh = asyncio.create_task(refresh_loop(settings.DASHBOARD_DATAMART_REFRESH_MINUTES))
+    # Ménage des fichiers produits par les jobs d'export
+    app.state.export_cleanup = asyncio.create_task(export_cleanup_loop())
 
 @app.get("/test-cors")
 def test_cors():
@@ -156,4 +171,9 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
 
 @app.on_event("shutdown")
 async def shutdown():
+    app.state.cache_invalidation_listener.cancel()
+    if hasattr(app.state, "datamart_refresh"):
+        app.state.datamart_refresh.cancel()
+    app.state.export_cleanup.cancel()
     await redis_client.aclose()
+    await redis_pool.disconnect()
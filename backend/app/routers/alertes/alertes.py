@@ -1,7 +1,7 @@
 # 📄 backend/app/routers/alertes/alertes.py
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Dict, List
 
 from app.main import limiter
 from app.db.dependencies import get_db
@@ -10,12 +10,14 @@ from app.schemas.alertes.alertes_schema import (
     AlertesSummaryRequest,
     AlertesSummaryPaginatedResponse,
     AlertesDetailItem,
+    AlertesDetailsBatchRequest,
     AlertesMapRequest
 )
 from app.services.alertes.alertes_service import (
     get_parametrage_regles,
     get_alertes_summary,
     get_alertes_details,
+    get_alertes_details_batch,
     get_alertes_map
 )
 
@@ -68,6 +70,21 @@ async def fetch_alertes_details(
     return await get_alertes_details(cod_pro, no_tarif, db)
 
 
+@alertes_router.post(
+    "/details/batch",
+    response_model=Dict[int, List[AlertesDetailItem]],
+    status_code=status.HTTP_200_OK
+)
+async def fetch_alertes_details_batch(
+    payload: AlertesDetailsBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Détail des alertes de plusieurs produits (grille) pour un tarif : cod_pro → alertes.
+    """
+    return await get_alertes_details_batch(payload.cod_pro_list, payload.no_tarif, db)
+
+
 @alertes_router.post(
     "/map",
     status_code=status.HTTP_200_OK
@@ -1,7 +1,7 @@
 # 📄 backend/app/routers/dashboard/router.py
 from fastapi import APIRouter, Depends, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from app.main import limiter
 from app.db.dependencies import get_db
@@ -9,12 +9,14 @@ from app.services.dashboard.dashboard_service import (
     get_dashboard_kpi,
     get_historique_prix_marge,
     get_dashboard_products,
+    get_dashboard_bundle,
 )
 from app.schemas.dashboard.dashboard_schema import (
     DashboardFilterRequest,
     DashboardKPIResponse,
     HistoriqueResponse,
     DashboardProductsPaginatedResponse,
+    DashboardBundleResponse,
 )
 
 dashboard_router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
@@ -45,5 +47,17 @@ async def fetch_dashboard_products(
     db: AsyncSession = Depends(get_db),
     page: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor de la page précédente (pagination keyset)"),
 ):
-    return await get_dashboard_products(payload, db, page, limit)
+    return await get_dashboard_products(payload, db, page, limit, cursor)
+
+@dashboard_router.post("/bundle", response_model=DashboardBundleResponse)
+@limiter.limit("30/minute")
+async def fetch_dashboard_bundle(
+    request: Request,
+    payload: DashboardFilterRequest,
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1, le=200),
+):
+    """KPI, historique et 1re page produits en une requête (suite via /products?cursor=...)"""
+    return await get_dashboard_bundle(payload, db, limit)
@@ -1,5 +1,6 @@
 # backend/app/routers/monitoring/monitoring.py
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -16,6 +17,8 @@ from app.services.ai.pricing_analysis_service import (
     run_ai_pricing_analysis,
     get_ai_recommendations_summary
 )
+from app.cache.stats import cache_stats
+from app.db.pool_stats import pool_stats
 from app.common.logger import logger
 
 router = APIRouter(prefix="/monitoring", tags=["Monitoring & IA"])
@@ -61,6 +64,7 @@ async def performance_metrics(db: AsyncSession = Depends(get_db)) -> Dict[str, A
     
     Inclut:
     - Statistiques base de données
+    - Pool de connexions SQL (attente, emprunts, débordement)
     - Métriques cache Redis
     - Performance application
     - Requêtes lentes
@@ -80,6 +84,19 @@ async def performance_metrics(db: AsyncSession = Depends(get_db)) -> Dict[str, A
         logger.error(f"Erreur récupération métriques: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/metrics/prometheus", summary="📈 Métriques cache (format Prometheus)", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    Compteurs et histogrammes de la couche cache, par préfixe de clé
+    (hits, misses, latence GET Redis, latence de calcul, taille des valeurs),
+    puis pool de connexions SQL Server (attente au checkout, emprunts, débordement).
+    Valeurs propres au worker qui répond : à scraper par worker.
+    """
+    return PlainTextResponse(
+        cache_stats.to_prometheus() + pool_stats.to_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 @router.get("/alerts", summary="🚨 Alertes Métier")
 async def business_alerts(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
     """
@@ -31,6 +31,8 @@ class AlertesSummaryRequest(BaseModel):
     qualite: Optional[str] = None
     force_single: Optional[bool] = False
     export_all: Optional[bool] = False
+    # Pagination keyset : next_cursor de la réponse précédente (prioritaire sur page)
+    cursor: Optional[str] = None
     
     @model_validator(mode="before")
     def override_limit_if_export_all(cls, values: dict) -> dict:
@@ -66,6 +68,8 @@ class AlertesSyntheseItem(BaseModel):
 class AlertesSummaryPaginatedResponse(BaseModel):
     total: int
     rows: List[AlertesSyntheseItem]
+    next_cursor: Optional[str] = None
+    total_exact: bool = True
 
 class AlertesDetailItem(BaseModel):
     id_alerte: int
@@ -96,3 +100,7 @@ class AlertesDetailItem(BaseModel):
 class AlertesMapRequest(BaseModel):
     no_tarif: int
     cod_pro_list: List[int]
+
+class AlertesDetailsBatchRequest(BaseModel):
+    no_tarif: int
+    cod_pro_list: List[int] = Field(..., max_length=500)
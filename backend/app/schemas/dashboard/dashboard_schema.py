@@ -49,6 +49,8 @@ class DashboardProductsResponse(BaseModel):
 class DashboardProductsPaginatedResponse(BaseModel):
     total: int
     rows: List[DashboardProductsResponse]
+    next_cursor: Optional[str] = None
+    total_exact: bool = True
 
 class HistoriqueResponse(BaseModel):
     periode: str
@@ -57,3 +59,8 @@ class HistoriqueResponse(BaseModel):
     marge_mensuelle: float
     qte_mensuelle : float
     marge_mensuelle_pourcentage: float
+
+class DashboardBundleResponse(BaseModel):
+    kpi: DashboardKPIResponse
+    historique: List[HistoriqueResponse]
+    products: DashboardProductsPaginatedResponse
@@ -14,6 +14,8 @@ class ComparatifFilterRequest(BaseModel):
     page: Optional[int] = 1
     limit: Optional[int] = Field(100, ge=1)
     export_all: Optional[bool] = False
+    # Pagination keyset : next_cursor de la réponse précédente (prioritaire sur page)
+    cursor: Optional[str] = None
 
     @model_validator(mode="before")
     def override_limit_if_export_all(cls, values: dict) -> dict:
@@ -57,4 +59,6 @@ class TarifComparatifMultiResponse(BaseModel):
 class ComparatifMultiResponseList(BaseModel):
     total: int
     rows: List[TarifComparatifMultiResponse]
+    next_cursor: Optional[str] = None
+    total_exact: bool = True
     meta: Optional[ComparatifMeta] = None  # Nouvelles métadonnées
\ No newline at end of file
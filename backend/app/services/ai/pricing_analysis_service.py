@@ -13,7 +13,7 @@ warnings.filterwarnings('ignore')
 
 from app.common.logger import logger
 from app.common.redis_client import redis_client
-import json
+from app.cache import serializer
 
 class PricingAIAnalyzer:
     """Analyseur IA pour détection d'anomalies tarifaires et recommandations"""
@@ -74,7 +74,7 @@ class PricingAIAnalyzer:
             
             # Cache pour 1 heure
             cache_key = f"ai_analysis:tarif_{no_tarif or 'all'}"
-            await redis_client.setex(cache_key, 3600, json.dumps(result, default=str))
+            await redis_client.setex(cache_key, 3600, serializer.dumps(result, default=str))
             
             logger.info(f"✅ Analyse IA terminée: {len(anomalies)} anomalies, {len(set(clusters))} clusters")
             return result
@@ -419,7 +419,7 @@ async def run_ai_pricing_analysis(db: AsyncSession, no_tarif: int = None) -> Dic
         cached = await redis_client.get(cache_key)
         if cached:
             logger.info("📋 Analyse IA récupérée du cache")
-            return json.loads(cached)
+            return serializer.loads(cached)
     except Exception:
         pass
     
@@ -1,33 +1,37 @@
 #backend/app/services/alertes/alertes_service.py
 from collections import defaultdict
+from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.common.redis_client import redis_client
-from app.common.constants import REDIS_TTL_MEDIUM, REDIS_TTL_SHORT
-from app.cache.cache_keys import alertes_summary_key
+from app.common.constants import REDIS_TTL_LONG, REDIS_TTL_MEDIUM
+from app.cache.cache_keys import (
+    alertes_summary_key,
+    alertes_details_key,
+    alertes_map_key,
+    alertes_parametrage_key,
+    count_key,
+    tag_cod_pro,
+    tag_no_tarif,
+    tag_table
+)
+from app.cache.read_through import get_or_compute, get_or_compute_many, read_through
 from app.schemas.alertes.alertes_schema import (
     AlertesSyntheseItem,
     AlertesDetailItem,
     AlertesSummaryRequest,
     ParametrageRegleSchema
 )
-from app.common.sql_utils import sanitize_sort_column, sanitize_sort_direction
-from app.common.logger import logger
+from app.common.sql_utils import json_int_list, keyset_condition, sanitize_sort_column, sanitize_sort_direction
+from app.common.pagination import decode_cursor, encode_cursor
+from app.db.counts import count_total
+from app.db.fanout import fanout
 from app.common.sortable_columns import ALERTES_COLUMNS
 from app.services.filters.product_identifier_filter_service import  extract_cod_pro_list
-import json
 
 # ============================================================
+@read_through(key=lambda db: alertes_parametrage_key(), ttl=REDIS_TTL_MEDIUM, local_ttl=REDIS_TTL_MEDIUM)
 async def get_parametrage_regles(db: AsyncSession) -> list[dict]:
-    key = "parametrage:alertes"
-    try:
-        cached = await redis_client.get(key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] Erreur sur get_parametrage_regles")
-
     query = """
         SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
         SELECT code_regle, libelle_regle, categorie, est_active, criticite, seuil_1, seuil_2, unite
@@ -36,25 +40,11 @@ async def get_parametrage_regles(db: AsyncSession) -> list[dict]:
         ORDER BY ordre_affichage ASC
     """
     result = await db.execute(text(query))
-    data = [dict(r._mapping) for r in result.fetchall()]
-    await redis_client.set(key, json.dumps(data), ex=REDIS_TTL_MEDIUM)
-    return data
-
-  # ============================================================
-async def get_alertes_summary(payload: AlertesSummaryRequest, db: AsyncSession):
-    key = alertes_summary_key(func=None, **payload.model_dump())
-
-    try:
-        cached = await redis_client.get(key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] alertes_summary_key fallback")
+    return [dict(r._mapping) for r in result.fetchall()]
 
-    limit = max(min(payload.limit, 200), 10)
-    offset = max(payload.page - 1, 0) * limit
-    params = {"offset": offset, "limit": limit}
-    filters = []
+async def alertes_filters(payload: AlertesSummaryRequest, db: AsyncSession) -> tuple[list[str], dict, list[int], bool]:
+    """Conditions WHERE sur Alertes_Synthese (paramètres liés), communes à la synthèse et à l'export"""
+    filters, params = [], {}
 
     # 🔍 Construction de la logique produit
     cod_pro_list = await extract_cod_pro_list(payload, db)
@@ -69,10 +59,9 @@ async def get_alertes_summary(payload: AlertesSummaryRequest, db: AsyncSession):
     )
 
     if has_product_filter and cod_pro_list:
-        placeholders = ", ".join([f":p{i}" for i in range(len(cod_pro_list))])
-        filters.append(f"cod_pro IN ({placeholders})")
-        for i, cod in enumerate(cod_pro_list):
-            params[f"p{i}"] = cod
+        cod_pro_in, list_params = json_int_list("cod_pro_json", cod_pro_list)
+        filters.append(f"cod_pro IN ({cod_pro_in})")
+        params.update(list_params)
 
     # Filtres supplémentaires
     if payload.code_regle:
@@ -83,22 +72,53 @@ async def get_alertes_summary(payload: AlertesSummaryRequest, db: AsyncSession):
     if payload.no_tarif:
         filters.append("no_tarif = :no_tarif")
         params["no_tarif"] = payload.no_tarif
+    return filters, params, cod_pro_list, has_product_filter
 
-    where_clause = f" WHERE {' AND '.join(filters)}" if filters else ""
 
-    # Tri
+def alertes_sort_keys(payload: AlertesSummaryRequest) -> list[tuple[str, str]]:
+    """Tri (cod_pro, no_tarif en départage : ordre total, requis par la pagination keyset)"""
     sort_by = sanitize_sort_column(payload.sort_by, ALERTES_COLUMNS, default="ca_total")
     sort_dir = sanitize_sort_direction(payload.sort_dir)
+    if sort_by == "cod_pro":
+        return [("cod_pro", sort_dir), ("no_tarif", "asc")]
+    return [(sort_by, sort_dir), ("cod_pro", "asc"), ("no_tarif", "asc")]
+
+  # ============================================================
+@read_through(
+    key=lambda payload, db: alertes_summary_key(**payload.model_dump(exclude_defaults=True)),
+    ttl=REDIS_TTL_MEDIUM,
+    tags=lambda payload, db: [tag_table("Alertes_Tarif")]
+)
+async def get_alertes_summary(payload: AlertesSummaryRequest, db: AsyncSession):
+    limit = max(min(payload.limit, 200), 10)
+    offset = max(payload.page - 1, 0) * limit
+    filters, params, cod_pro_list, has_product_filter = await alertes_filters(payload, db)
+    params.update({"offset": offset, "limit": limit})
+
+    where_clause = f" WHERE {' AND '.join(filters)}" if filters else ""
+    count_params = dict(params)
+
+    keys = alertes_sort_keys(payload)
+    signature = ",".join(f"{column}:{direction}" for column, direction in keys)
+    order_clause = "ORDER BY " + ", ".join(f"{column} {direction.upper()}" for column, direction in keys)
+
+    # Pagination : curseur keyset (prioritaire) ou OFFSET historique
+    seek_clause = ""
+    if payload.cursor and not payload.export_all:
+        try:
+            seek_sql, seek_params = keyset_condition(keys, decode_cursor(payload.cursor, signature))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        seek_clause = f"{' AND' if where_clause else ' WHERE'} {seek_sql}"
+        params.update(seek_params)
+        params["offset"] = 0
 
-    # Pagination
     if not payload.export_all:
-        params["offset"] = offset
-        params["limit"] = limit
         pagination_clause = "OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY"
     else:
         pagination_clause = ""
 
-    # Requête SQL count
+    # Requête SQL count (exécutée seulement si le total n'est pas déjà en cache)
     count_query = f"""
         SET NOCOUNT ON;
         SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
@@ -111,33 +131,56 @@ async def get_alertes_summary(payload: AlertesSummaryRequest, db: AsyncSession):
         SET NOCOUNT ON; 
         SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
         SELECT * FROM CBM_DATA.Pricing.Alertes_Synthese WITH (NOLOCK)
-        {where_clause}
-        ORDER BY {sort_by} {sort_dir.upper()}
+        {where_clause}{seek_clause}
+        {order_clause}
         {pagination_clause}
     """
 
-    total = (await db.execute(text(count_query), params)).scalar()
-    rows = (await db.execute(text(data_query), params)).fetchall()
+    # Sans filtre : statistiques de partition (approché) ; sinon COUNT mis en cache par filtres
+    async def fetch_total(db: AsyncSession):
+        async def compute_total():
+            return (await db.execute(text(count_query), count_params)).scalar()
+
+        return await count_total(
+            db,
+            count_key(
+                "alertes",
+                cod_pro_list=cod_pro_list if has_product_filter else None,
+                code_regle=payload.code_regle,
+                refint=payload.refint,
+                no_tarif=payload.no_tarif
+            ),
+            compute_total,
+            unfiltered_table=None if filters else "CBM_DATA.Pricing.Alertes_Synthese",
+            tags=[tag_table("Alertes_Tarif")]
+        )
+
+    async def fetch_rows(db: AsyncSession):
+        return (await db.execute(text(data_query), params)).fetchall()
+
+    # Total et page en parallèle, chacun sur sa connexion
+    (total, total_exact), rows = await fanout(fetch_total, fetch_rows, db=db)
 
-    response = {
+    next_cursor = None
+    if rows and len(rows) == limit and not payload.export_all:
+        last = {column.lower(): value for column, value in rows[-1]._mapping.items()}
+        next_cursor = encode_cursor(signature, [last[column.lower()] for column, _ in keys])
+
+    return {
         "total": total,
-        "rows": [AlertesSyntheseItem(**r._mapping).model_dump(mode="json") for r in rows]
+        "rows": [AlertesSyntheseItem(**r._mapping).model_dump(mode="json") for r in rows],
+        "next_cursor": next_cursor,
+        "total_exact": total_exact
     }
 
-    await redis_client.set(key, json.dumps(response), ex=REDIS_TTL_SHORT)
-    return response
-
 
 # ============================================================
+@read_through(
+    key=lambda cod_pro, no_tarif, db: alertes_details_key(cod_pro, no_tarif),
+    ttl=REDIS_TTL_LONG,
+    tags=lambda cod_pro, no_tarif, db: [tag_cod_pro(cod_pro)]
+)
 async def get_alertes_details(cod_pro: int, no_tarif: int, db: AsyncSession):
-    key = f"alertes:details:{cod_pro}:{no_tarif}"
-    try:
-        cached = await redis_client.get(key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] alertes_details fallback")
-
     query = """
         SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
         SELECT *
@@ -145,34 +188,59 @@ async def get_alertes_details(cod_pro: int, no_tarif: int, db: AsyncSession):
         WHERE cod_pro = :cod_pro AND no_tarif = :no_tarif
     """
     result = await db.execute(text(query), {"cod_pro": cod_pro, "no_tarif": no_tarif})
-    data = jsonable_encoder([AlertesDetailItem(**r._mapping) for r in result.fetchall()])
-    await redis_client.set(key, json.dumps(data), ex=REDIS_TTL_MEDIUM)
-    return data
+    return jsonable_encoder([AlertesDetailItem(**r._mapping) for r in result.fetchall()])
 
 # ============================================================
-async def get_alertes_map(db: AsyncSession, cod_pro_list: list[int], no_tarif: int) -> dict:
-    key = f"alertes:map:{no_tarif}:{','.join(map(str, cod_pro_list))}"
-    try:
-        cached = await redis_client.get(key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] alertes_map fallback")
+async def get_alertes_details_batch(cod_pro_list: list[int], no_tarif: int, db: AsyncSession) -> dict:
+    """Détails d'alertes de plusieurs produits : un MGET Redis + une requête pour les absents"""
+    cod_pro_list = list(dict.fromkeys(cod_pro_list))
+    return await get_or_compute_many(
+        {cod_pro: alertes_details_key(cod_pro, no_tarif) for cod_pro in cod_pro_list},
+        lambda missing: _query_alertes_details_batch(db, missing, no_tarif),
+        REDIS_TTL_LONG,
+        tags=lambda cod_pro: [tag_cod_pro(cod_pro)]
+    )
+
+
+async def _query_alertes_details_batch(db: AsyncSession, cod_pro_list: list[int], no_tarif: int) -> dict:
+    cod_pro_in, params = json_int_list("cod_pro_json", cod_pro_list)
+    params["no_tarif"] = no_tarif
+    query = f"""
+        SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
+        SELECT *
+        FROM CBM_DATA.Pricing.vw_Alertes_Detaillees
+        WHERE no_tarif = :no_tarif AND cod_pro IN ({cod_pro_in})
+    """
+
+    result = await db.execute(text(query), params)
+    details = {cod_pro: [] for cod_pro in cod_pro_list}
+    for r in result.fetchall():
+        details[r.cod_pro].append(AlertesDetailItem(**r._mapping))
+    return {cod_pro: jsonable_encoder(items) for cod_pro, items in details.items()}
 
+# ============================================================
+async def get_alertes_map(db: AsyncSession, cod_pro_list: list[int], no_tarif: int) -> dict:
     if not cod_pro_list:
         return {}
-    placeholders = ", ".join([f":p{i}" for i in range(len(cod_pro_list))])
+    return await get_or_compute(
+        alertes_map_key(no_tarif, cod_pro_list),
+        lambda: _query_alertes_map(db, cod_pro_list, no_tarif),
+        REDIS_TTL_LONG,
+        tags=[tag_no_tarif(no_tarif)]
+    )
+
+
+async def _query_alertes_map(db: AsyncSession, cod_pro_list: list[int], no_tarif: int) -> dict:
+    cod_pro_in, params = json_int_list("cod_pro_json", cod_pro_list)
+    params["no_tarif"] = no_tarif
     query = f"""
         SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
         SELECT cod_pro, code_regle
         FROM CBM_DATA.Pricing.vw_Alertes_Detaillees
-        WHERE no_tarif = :no_tarif AND cod_pro IN ({placeholders})
+        WHERE no_tarif = :no_tarif AND cod_pro IN ({cod_pro_in})
         AND ISNULL(statut_utilisateur, '') = ''
     """
 
-    params = {"no_tarif": no_tarif}
-    params.update({f"p{i}": cod for i, cod in enumerate(cod_pro_list)})
-
     result = await db.execute(text(query), params)
     alertes_map = defaultdict(lambda: defaultdict(list))
 
@@ -184,7 +252,7 @@ async def get_alertes_map(db: AsyncSession, cod_pro_list: list[int], no_tarif: i
         elif row.code_regle == "FIN_02":
             alertes_map[row.cod_pro]["stock"].append(row.code_regle)
 
-    data = {
+    return {
         "items": [
             {"cod_pro": cod_pro, "champ": champ, "code_regle": code}
             for cod_pro, champs in alertes_map.items()
@@ -192,6 +260,3 @@ async def get_alertes_map(db: AsyncSession, cod_pro_list: list[int], no_tarif: i
             for code in codes
         ]
     }
-
-    await redis_client.set(key, json.dumps(data), ex=REDIS_TTL_MEDIUM)
-    return data
@@ -1,7 +1,7 @@
 # backend/app/services/dashboard/dashboard_service.py
 
-import json
 import time
+from functools import partial
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from fastapi import HTTPException
@@ -9,10 +9,29 @@ from fastapi import HTTPException
 from app.schemas.dashboard.dashboard_schema import DashboardFilterRequest
 from app.schemas.produits.identifier_schema import ProductIdentifierRequest
 from app.services.filters.product_identifier_filter_service import resolve_cod_pro_list
-from app.common.redis_client import redis_client
-from app.common.constants import REDIS_TTL_SHORT
+from app.cache.read_through import get_or_compute
+from app.db.session import run_in_session
+from app.common.constants import MAX_COD_PRO_LIST, REDIS_TTL_SHORT, REDIS_TTL_STALE
+from app.common.sql_utils import json_int_list, keyset_condition
+from app.common.pagination import decode_cursor, encode_cursor
 from app.common.logger import logger
-from app.cache.cache_keys import dashboard_kpi_key, dashboard_histo_key, dashboard_products_key
+from app.cache.cache_keys import (
+    count_key, dashboard_bundle_key, dashboard_kpi_key, dashboard_histo_key, dashboard_products_key,
+    tag_no_tarif, tag_table
+)
+from app.db.counts import count_total
+from app.db.fanout import fanout
+from app.services.dashboard.ventes_mensuelles import ventes_depot_annee_sql, ventes_source
+
+# Dépôt du Mans (colonnes *_le_mans)
+LE_MANS_NDOS = 918
+
+DIMENSIONS_PRODUIT = "CBM_DATA.Pricing.Dimensions_Produit WITH (NOLOCK)"
+
+# Tri des produits : qualité (OE, OEM, autres), prix de vente décroissant, cod_pro en départage
+PRODUCTS_SORT_KEYS = [("rang_qualite", "asc"), ("px_vente", "desc"), ("cod_pro", "asc")]
+PRODUCTS_SORT_SIGNATURE = ",".join(f"{column}:{direction}" for column, direction in PRODUCTS_SORT_KEYS)
+PRODUCTS_ORDER_BY = ", ".join(f"{column} {direction.upper()}" for column, direction in PRODUCTS_SORT_KEYS)
 
 async def extract_cod_pro_list(payload: DashboardFilterRequest, db: AsyncSession) -> list[int]:
     identifier_payload = ProductIdentifierRequest(
@@ -37,34 +56,31 @@ async def get_dashboard_kpi(payload: DashboardFilterRequest, db: AsyncSession):
     if not payload.cod_pro_list:
       return {"items": []}
 
+    if len(payload.cod_pro_list) > MAX_COD_PRO_LIST:
+        raise HTTPException(status_code=400, detail=f"Nombre maximum de produits autorisé : {MAX_COD_PRO_LIST}.")
+
     redis_key = dashboard_kpi_key(
         no_tarif=payload.no_tarif,
         cod_pro_list=payload.cod_pro_list
     )
-    
-    try:
-        cached = await redis_client.get(redis_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] dashboard_kpi fallback")
-
-    if not payload.cod_pro_list:
-        return {"items": []}
+    return await get_or_compute(
+        redis_key,
+        lambda: _query_dashboard_kpi(payload.no_tarif, payload.cod_pro_list, db),
+        REDIS_TTL_SHORT,
+        stale_ttl=REDIS_TTL_STALE,
+        refresh=partial(run_in_session, _query_dashboard_kpi, payload.no_tarif, payload.cod_pro_list),
+        tags=[tag_no_tarif(payload.no_tarif), tag_table("Ventes_Mensuelles")]
+    )
 
-    if len(payload.cod_pro_list) > 500:
-        raise HTTPException(status_code=400, detail="Nombre maximum de produits autorisé : 500.")
 
-    params = {"no_tarif": payload.no_tarif}
-    placeholders = ", ".join([f":p{i}" for i in range(len(payload.cod_pro_list))])
-    
+def _kpi_sql(cod_pro_in: str, ventes: str, dimensions: str = DIMENSIONS_PRODUIT) -> str:
     # CORRECTION: Ajouter marge_absolue pour calcul correct
-    query = f"""
+    return f"""
         SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
         WITH produits AS (
             SELECT DISTINCT cod_pro, refint, no_tarif
-            FROM CBM_DATA.Pricing.Dimensions_Produit WITH (NOLOCK)
-            WHERE no_tarif = :no_tarif AND cod_pro IN ({placeholders})
+            FROM {dimensions}
+            WHERE no_tarif = :no_tarif AND cod_pro IN ({cod_pro_in})
         )
         SELECT p.cod_pro,
                 p.refint, 
@@ -74,23 +90,30 @@ async def get_dashboard_kpi(payload: DashboardFilterRequest, db: AsyncSession):
                ISNULL(ROUND(CASE WHEN SUM(v.tot_vte_eur) = 0 THEN 0 ELSE SUM(v.tot_marge_pr_eur) / SUM(v.tot_vte_eur) END, 4), 0.0) AS marge_moyenne,
                COUNT(DISTINCT a.cod_pro) AS alertes_actives
         FROM produits p
-        LEFT JOIN CBM_DATA.Pricing.Px_vte_mouvement v WITH (NOLOCK)
+        LEFT JOIN {ventes} v
             ON v.cod_pro = p.cod_pro AND v.no_tarif = p.no_tarif
-            AND v.dat_mvt >= DATEFROMPARTS(YEAR(DATEADD(month, -11, GETDATE())), MONTH(DATEADD(month, -11, GETDATE())), 1)
+            AND v.mois >= DATEFROMPARTS(YEAR(DATEADD(month, -11, GETDATE())), MONTH(DATEADD(month, -11, GETDATE())), 1)
             AND v.type_prix_code = 3
         LEFT JOIN CBM_DATA.Pricing.vw_Alertes_Detaillees a WITH (NOLOCK)
             ON a.cod_pro = p.cod_pro AND a.no_tarif = p.no_tarif AND a.est_active = 1
         GROUP BY p.cod_pro, p.refint;
     """
-    params.update({f"p{i}": cod for i, cod in enumerate(payload.cod_pro_list)})
+
+
+async def _query_dashboard_kpi(no_tarif: int, cod_pro_list: list[int], db: AsyncSession) -> dict:
+    cod_pro_in, params = json_int_list("cod_pro_json", cod_pro_list)
+    params["no_tarif"] = no_tarif
 
     start = time.perf_counter()
-    result = await db.execute(text(query), params)
+    result = await db.execute(text(_kpi_sql(cod_pro_in, ventes_source())), params)
     rows = result.fetchall()
     elapsed = (time.perf_counter() - start) * 1000
     logger.info(f"[get_dashboard_kpi] {len(rows)} rows in {elapsed:.1f} ms")
+    return _kpi_data(rows)
+
 
-    data = {
+def _kpi_data(rows) -> dict:
+    return {
         "items": [
             {
                 "cod_pro": row[0],
@@ -105,45 +128,33 @@ async def get_dashboard_kpi(payload: DashboardFilterRequest, db: AsyncSession):
         ]
     }
 
-    try:
-        await redis_client.set(redis_key, json.dumps(data), ex=REDIS_TTL_SHORT)
-    except Exception:
-        logger.exception("[Redis] dashboard_kpi set failed")
-
-    return data
-
 
 async def get_historique_prix_marge(payload: DashboardFilterRequest, db: AsyncSession):
     payload.cod_pro_list = await extract_cod_pro_list(payload, db)
     if not payload.cod_pro_list:
       return {"items": []}  # ou "rows": [] selon la fonction
 
-    redis_key = dashboard_histo_key(no_tarif=payload.no_tarif, cod_pro_list=payload.cod_pro_list)
-    
-    try:
-        cached = await redis_client.get(redis_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] histoprix fallback")
-
-    cod_pro_list = payload.cod_pro_list
-    if not cod_pro_list:
-        return {"items": []}
-
-    if len(cod_pro_list) > 500:
+    if len(payload.cod_pro_list) > MAX_COD_PRO_LIST:
         raise HTTPException(400, "Trop de produits demandés.")
 
-    params = {"no_tarif": payload.no_tarif}
-    placeholders = ", ".join([f":p{i}" for i in range(len(cod_pro_list))])
-    params.update({f"p{i}": cod for i, cod in enumerate(cod_pro_list)})
+    redis_key = dashboard_histo_key(no_tarif=payload.no_tarif, cod_pro_list=payload.cod_pro_list)
+    return await get_or_compute(
+        redis_key,
+        lambda: _query_historique_prix_marge(payload.no_tarif, payload.cod_pro_list, db),
+        REDIS_TTL_SHORT,
+        stale_ttl=REDIS_TTL_STALE,
+        refresh=partial(run_in_session, _query_historique_prix_marge, payload.no_tarif, payload.cod_pro_list),
+        tags=[tag_no_tarif(payload.no_tarif), tag_table("Ventes_Mensuelles")]
+    )
+
 
-    query = f"""
+def _historique_sql(cod_pro_in: str, ventes: str, dimensions: str = DIMENSIONS_PRODUIT) -> str:
+    return f"""
     SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
     WITH produits AS (
         SELECT DISTINCT cod_pro, refint, qualite, famille, s_famille, no_tarif
-        FROM CBM_DATA.Pricing.Dimensions_Produit WITH (NOLOCK)
-        WHERE no_tarif = :no_tarif AND cod_pro IN ({placeholders})
+        FROM {dimensions}
+        WHERE no_tarif = :no_tarif AND cod_pro IN ({cod_pro_in})
     ),
     base_data AS (
         SELECT
@@ -152,9 +163,9 @@ async def get_historique_prix_marge(payload: DashboardFilterRequest, db: AsyncSe
             mvt.tot_vte_eur,
             mvt.tot_marge_pr_eur, 
             mvt.qte
-        FROM CBM_DATA.Pricing.Px_vte_mouvement mvt WITH (NOLOCK)
+        FROM {ventes} mvt
         INNER JOIN produits p ON p.cod_pro = mvt.cod_pro AND p.no_tarif = mvt.no_tarif
-        INNER JOIN CBM_DATA.dm.Dim_Date d WITH (NOLOCK) ON mvt.dat_mvt = d.Date 
+        INNER JOIN CBM_DATA.dm.Dim_Date d WITH (NOLOCK) ON mvt.mois = d.Date 
         WHERE mvt.[type_prix_code] = 3
         AND d.FirstOfMonth >= DATEADD(MONTH, -11, DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1))
     ),
@@ -182,13 +193,21 @@ async def get_historique_prix_marge(payload: DashboardFilterRequest, db: AsyncSe
     ORDER BY b.periode
     """
 
+
+async def _query_historique_prix_marge(no_tarif: int, cod_pro_list: list[int], db: AsyncSession) -> list[dict]:
+    cod_pro_in, params = json_int_list("cod_pro_json", cod_pro_list)
+    params["no_tarif"] = no_tarif
+
     start = time.perf_counter()
-    result = await db.execute(text(query), params)
+    result = await db.execute(text(_historique_sql(cod_pro_in, ventes_source())), params)
     rows = result.fetchall()
     elapsed = (time.perf_counter() - start) * 1000
     logger.info(f"[get_historique_prix_marge] {len(rows)} rows in {elapsed:.1f} ms")
+    return _historique_data(rows)
 
-    data = [
+
+def _historique_data(rows) -> list[dict]:
+    return [
         {
             "periode": row[0],
             "cod_pro": row[1],
@@ -200,69 +219,110 @@ async def get_historique_prix_marge(payload: DashboardFilterRequest, db: AsyncSe
         for row in rows
     ]
 
-    try:
-        await redis_client.set(redis_key, json.dumps(data), ex=REDIS_TTL_SHORT)
-    except Exception:
-        logger.exception("[Redis] histoprix set failed")
-
-    return data
-
 async def get_dashboard_products(
     payload: DashboardFilterRequest,
     db: AsyncSession,
     page: int = 0,
     limit: int = 100,
+    cursor: str = None,
 ):
     payload.cod_pro_list = await extract_cod_pro_list(payload, db)
     if not payload.cod_pro_list:
         return {"total": 0, "rows": []}
 
-    redis_key = dashboard_products_key(payload.model_dump(), page, limit)
+    if len(payload.cod_pro_list) > MAX_COD_PRO_LIST:
+        raise HTTPException(400, "Trop de produits demandés.")
 
+    # Curseur keyset : validé avant lecture du cache (400 si illisible)
     try:
-        cached = await redis_client.get(redis_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] dashboard_products fallback")
-
-    cod_pro_list = payload.cod_pro_list
-    if not cod_pro_list:
-        return {"total": 0, "rows": []}
+        cursor_values = decode_cursor(cursor, PRODUCTS_SORT_SIGNATURE) if cursor else None
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    redis_key = dashboard_products_key(payload.no_tarif, payload.cod_pro_list, page, limit, cursor)
+    return await get_or_compute(
+        redis_key,
+        lambda: _query_dashboard_products(payload.no_tarif, payload.cod_pro_list, page, limit, db, cursor_values),
+        REDIS_TTL_SHORT,
+        stale_ttl=REDIS_TTL_STALE,
+        refresh=partial(
+            run_in_session, _query_dashboard_products, payload.no_tarif, payload.cod_pro_list, page, limit,
+            cursor_values=cursor_values
+        ),
+        tags=[tag_no_tarif(payload.no_tarif), tag_table("Ventes_Mensuelles")]
+    )
 
-    if len(cod_pro_list) > 1000:
-        raise HTTPException(400, "Trop de produits demandés.")
 
+async def _query_dashboard_products(
+    no_tarif: int,
+    cod_pro_list: list[int],
+    page: int,
+    limit: int,
+    db: AsyncSession,
+    cursor_values: list = None,
+) -> dict:
     limit = max(min(limit, 400), 10)
     offset = max(page, 0) * limit
 
-    count_query = """
-        SELECT COUNT(DISTINCT cod_pro)
-        FROM CBM_DATA.Pricing.Dimensions_Produit WITH (NOLOCK)
-        WHERE no_tarif = :no_tarif
-    """
-    count_params = {"no_tarif": payload.no_tarif}
-    placeholders = ", ".join([f":p{i}" for i in range(len(cod_pro_list))])
-    count_query += f" AND cod_pro IN ({placeholders})"
-    count_params.update({f"p{i}": cod for i, cod in enumerate(cod_pro_list)})
+    cod_pro_in, list_params = json_int_list("cod_pro_json", cod_pro_list)
+
+    # Total mis en cache par (tarif, produits) : partagé par toutes les pages / curseurs
+    async def fetch_total(db: AsyncSession):
+        async def compute_total():
+            count_query = f"""
+                SELECT COUNT(DISTINCT cod_pro)
+                FROM CBM_DATA.Pricing.Dimensions_Produit WITH (NOLOCK)
+                WHERE no_tarif = :no_tarif AND cod_pro IN ({cod_pro_in})
+            """
+            result_count = await db.execute(text(count_query), {"no_tarif": no_tarif, **list_params})
+            return result_count.scalar() or 0
+
+        return await count_total(
+            db, count_key("dashboard_products", no_tarif=no_tarif, cod_pro_list=cod_pro_list), compute_total
+        )
+
+    # Pagination keyset : reprise après la dernière ligne servie, sans OFFSET
+    seek_clause, seek_params = "", {}
+    if cursor_values is not None:
+        seek_sql, seek_params = keyset_condition(PRODUCTS_SORT_KEYS, cursor_values)
+        seek_clause = f"WHERE {seek_sql}"
+        offset = 0
 
-    result_count = await db.execute(text(count_query), count_params)
-    totalRowCount = result_count.scalar() or 0
+    query = _products_sql(cod_pro_in, ventes_source(), ventes_depot_annee_sql(LE_MANS_NDOS), seek_clause)
+    params = {"no_tarif": no_tarif, "offset": offset, "limit": limit, **list_params, **seek_params}
 
-    query = f"""
+    async def fetch_rows(db: AsyncSession):
+        return (await db.execute(text(query), params)).fetchall()
+
+    # Total et page en parallèle, chacun sur sa connexion
+    start = time.perf_counter()
+    (totalRowCount, total_exact), rows = await fanout(fetch_total, fetch_rows, db=db)
+    elapsed = (time.perf_counter() - start) * 1000
+    logger.info(f"[get_dashboard_products] {len(rows)} produits chargés en {elapsed:.1f} ms")
+    return _products_data(rows, totalRowCount, total_exact, limit)
+
+
+def _products_sql(
+    cod_pro_in: str,
+    ventes: str,
+    ventes_le_mans: str,
+    seek_clause: str = "",
+    dimensions: str = DIMENSIONS_PRODUIT
+) -> str:
+    return f"""
         SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
         WITH produits AS (
             SELECT DISTINCT cod_pro, refint, qualite, statut, famille, s_famille, no_tarif
-            FROM CBM_DATA.Pricing.Dimensions_Produit WITH (NOLOCK)
-            WHERE no_tarif = :no_tarif AND cod_pro IN ({placeholders})
+            FROM {dimensions}
+            WHERE no_tarif = :no_tarif AND cod_pro IN ({cod_pro_in})
         ),
         mvt_main AS (
             SELECT cod_pro, no_tarif,
                    SUM(tot_vte_eur) AS ca_total,
                    SUM(tot_marge_pr_eur) AS marge_total,
                    SUM(qte) AS qte
-            FROM CBM_DATA.Pricing.Px_vte_mouvement WITH (NOLOCK)
-            WHERE dat_mvt >= DATEFROMPARTS(YEAR(DATEADD(month, -11, GETDATE())), MONTH(DATEADD(month, -11, GETDATE())), 1)
+            FROM {ventes} v
+            WHERE mois >= DATEFROMPARTS(YEAR(DATEADD(month, -11, GETDATE())), MONTH(DATEADD(month, -11, GETDATE())), 1)
             AND type_prix_code = 3
             GROUP BY cod_pro, no_tarif
         ),
@@ -271,26 +331,26 @@ async def get_dashboard_products(
                    SUM(tot_vte_eur) AS ca_total_le_mans,
                    SUM(tot_marge_pr_eur) AS marge_total_le_mans,
                    SUM(qte) AS qte_le_mans
-            FROM CBM_DATA.Pricing.Px_vte_mouvement WITH (NOLOCK)
-            WHERE dat_mvt >= DATEADD(YEAR, -1, GETDATE())
-              AND ndos = 918
+            FROM ({ventes_le_mans}) ventes_le_mans
             GROUP BY cod_pro
-        )
-        SELECT d.cod_pro, d.refint, CAST(d.famille AS VARCHAR), CAST(d.s_famille AS VARCHAR), d.qualite, d.statut, 
+        ),
+        lignes AS (
+        SELECT d.cod_pro, d.refint, CAST(d.famille AS VARCHAR) AS famille, CAST(d.s_famille AS VARCHAR) AS s_famille, d.qualite, d.statut, 
                ISNULL(pvte.px_refv_eur, 0) AS px_vente,
                ISNULL(pxa.px_net_eur, 0) AS px_achat,
                ISNULL(100 * CASE WHEN ISNULL(pvte.px_refv_eur, 0) = 0 THEN 0
                    ELSE (ISNULL(pvte.px_refv_eur, 0) - ISNULL(pxa.px_net_eur, 0)) / NULLIF(pvte.px_refv_eur,0) END,0) AS taux_marge_px,
-               ISNULL(mvt.ca_total, 0),
-               ISNULL(mvt.marge_total, 0),
-               ISNULL(mvt.qte, 0),
+               ISNULL(mvt.ca_total, 0) AS ca_total,
+               ISNULL(mvt.marge_total, 0) AS marge_total,
+               ISNULL(mvt.qte, 0) AS qte,
                ISNULL(ROUND(100 * CASE WHEN ISNULL(mvt.ca_total,0)=0 THEN 0 ELSE mvt.marge_total / NULLIF(mvt.ca_total,0) END,2),0) AS taux_marge,
-               ISNULL(mvt_le_mans.ca_total_le_mans, 0),
-               ISNULL(mvt_le_mans.marge_total_le_mans, 0),
-               ISNULL(mvt_le_mans.qte_le_mans, 0),
+               ISNULL(mvt_le_mans.ca_total_le_mans, 0) AS ca_total_le_mans,
+               ISNULL(mvt_le_mans.marge_total_le_mans, 0) AS marge_total_le_mans,
+               ISNULL(mvt_le_mans.qte_le_mans, 0) AS qte_le_mans,
                ISNULL(ROUND(100 * CASE WHEN ISNULL(mvt_le_mans.ca_total_le_mans,0)=0 THEN 0 ELSE mvt_le_mans.marge_total_le_mans / NULLIF(mvt_le_mans.ca_total_le_mans,0) END,2),0) AS taux_marge_le_mans,
-               ISNULL(st.stock_le_mans, 0),
-               ISNULL(st.pmp_le_mans, 0)
+               ISNULL(st.stock_le_mans, 0) AS stock_le_mans,
+               ISNULL(st.pmp_le_mans, 0) AS pmp_le_mans,
+               CASE WHEN d.qualite = 'OE' THEN 1 WHEN d.qualite = 'OEM' THEN 2 ELSE 3 END AS rang_qualite
         FROM produits d
         LEFT JOIN CBM_DATA.Pricing.Px_vte_tarif_actuel pvte WITH (NOLOCK)
             ON d.cod_pro = pvte.cod_pro AND d.no_tarif = pvte.no_tarif
@@ -302,21 +362,20 @@ async def get_dashboard_products(
             ON d.cod_pro = mvt.cod_pro AND d.no_tarif = mvt.no_tarif
         LEFT JOIN mvt_le_mans 
             ON d.cod_pro = mvt_le_mans.cod_pro
-        ORDER BY CASE WHEN qualite = 'OE' THEN 1 WHEN qualite = 'OEM' THEN 2 ELSE 3 END, ISNULL(pvte.px_refv_eur, 0) DESC
+        )
+        SELECT cod_pro, refint, famille, s_famille, qualite, statut, px_vente, px_achat, taux_marge_px,
+               ca_total, marge_total, qte, taux_marge, ca_total_le_mans, marge_total_le_mans,
+               qte_le_mans, taux_marge_le_mans, stock_le_mans, pmp_le_mans, rang_qualite
+        FROM lignes
+        {seek_clause}
+        ORDER BY {PRODUCTS_ORDER_BY}
         OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY;
     """
 
-    params = {"no_tarif": payload.no_tarif, "offset": offset, "limit": limit}
-    params.update({f"p{i}": cod for i, cod in enumerate(cod_pro_list)})
 
-    start = time.perf_counter()
-    result = await db.execute(text(query), params)
-    rows = result.fetchall()
-    elapsed = (time.perf_counter() - start) * 1000
-    logger.info(f"[get_dashboard_products] {len(rows)} produits chargés en {elapsed:.1f} ms")
-
-    data = {
-        "total": totalRowCount,
+def _products_data(rows, total: int, total_exact: bool, limit: int) -> dict:
+    return {
+        "total": total,
         "rows": [
             {
                 "cod_pro": r[0], "refint": r[1], "famille": r[2], "s_famille": r[3], "qualite": r[4], "statut": r[5],
@@ -327,12 +386,144 @@ async def get_dashboard_products(
             }
 
             for r in rows
-        ]
+        ],
+        "total_exact": total_exact,
+        "next_cursor": (
+            encode_cursor(PRODUCTS_SORT_SIGNATURE, [rows[-1][19], rows[-1][6], rows[-1][0]])
+            if rows and len(rows) == limit else None
+        )
+    }
+
+
+
+# ============================================================
+# 📦 Bundle : KPI + historique + 1re page produits en un aller-retour
+# ============================================================
+async def get_dashboard_bundle(payload: DashboardFilterRequest, db: AsyncSession, limit: int = 100):
+    """
+    Équivalent de /kpi + /historique + /products (page 0) : liste produits résolue une
+    seule fois, mouvements agrégés une seule fois, résultat mis en cache comme un tout.
+    """
+    payload.cod_pro_list = await extract_cod_pro_list(payload, db)
+    if not payload.cod_pro_list:
+        return {
+            "kpi": {"items": []},
+            "historique": [],
+            "products": {"total": 0, "rows": []}
+        }
+
+    if len(payload.cod_pro_list) > MAX_COD_PRO_LIST:
+        raise HTTPException(status_code=400, detail=f"Nombre maximum de produits autorisé : {MAX_COD_PRO_LIST}.")
+
+    return await get_or_compute(
+        dashboard_bundle_key(payload.no_tarif, payload.cod_pro_list, limit),
+        lambda: _query_dashboard_bundle(payload.no_tarif, payload.cod_pro_list, limit, db),
+        REDIS_TTL_SHORT,
+        stale_ttl=REDIS_TTL_STALE,
+        refresh=partial(run_in_session, _query_dashboard_bundle, payload.no_tarif, payload.cod_pro_list, limit),
+        tags=[tag_no_tarif(payload.no_tarif), tag_table("Ventes_Mensuelles")]
+    )
+
+
+# Mouvements du périmètre agrégés une seule fois (par cod_pro, no_tarif, mois) puis relus par
+# les requêtes /kpi, /historique et /products elles-mêmes : mêmes formules, arrondis et NULL.
+# Tables créées vides par un lot sans paramètre (exécution directe, portée session) : une
+# table #temp créée dans un lot paramétré (sp_executesql) disparaît à la fin de l'appel.
+BUNDLE_CREATE_SQL = """
+    SET NOCOUNT ON;
+    DROP TABLE IF EXISTS #bundle_produits;
+    DROP TABLE IF EXISTS #bundle_ventes;
+    DROP TABLE IF EXISTS #bundle_ventes_le_mans;
+
+    SELECT TOP 0 cod_pro, refint, qualite, statut, famille, s_famille, no_tarif
+    INTO #bundle_produits
+    FROM {dimensions};
+
+    SELECT TOP 0 v.cod_pro, v.no_tarif, v.type_prix_code, v.mois,
+           SUM(v.tot_vte_eur) AS tot_vte_eur,
+           SUM(v.tot_marge_pr_eur) AS tot_marge_pr_eur,
+           SUM(v.qte) AS qte
+    INTO #bundle_ventes
+    FROM {ventes} v
+    GROUP BY v.cod_pro, v.no_tarif, v.type_prix_code, v.mois;
+
+    SELECT TOP 0 l.cod_pro,
+           SUM(l.tot_vte_eur) AS tot_vte_eur,
+           SUM(l.tot_marge_pr_eur) AS tot_marge_pr_eur,
+           SUM(l.qte) AS qte
+    INTO #bundle_ventes_le_mans
+    FROM ({ventes_le_mans}) l
+    GROUP BY l.cod_pro;
+"""
+
+# Remplissage paramétré : les tables de la session restent visibles depuis sp_executesql
+BUNDLE_FILL_SQL = """
+    SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
+    SET NOCOUNT ON;
+
+    INSERT INTO #bundle_produits (cod_pro, refint, qualite, statut, famille, s_famille, no_tarif)
+    SELECT DISTINCT cod_pro, refint, qualite, statut, famille, s_famille, no_tarif
+    FROM {dimensions}
+    WHERE no_tarif = :no_tarif AND cod_pro IN ({cod_pro_in});
+
+    INSERT INTO #bundle_ventes (cod_pro, no_tarif, type_prix_code, mois, tot_vte_eur, tot_marge_pr_eur, qte)
+    SELECT v.cod_pro, v.no_tarif, v.type_prix_code, v.mois,
+           SUM(v.tot_vte_eur), SUM(v.tot_marge_pr_eur), SUM(v.qte)
+    FROM {ventes} v
+    WHERE v.no_tarif = :no_tarif
+      AND v.cod_pro IN (SELECT cod_pro FROM #bundle_produits)
+      AND v.type_prix_code = 3
+      AND v.mois >= DATEFROMPARTS(YEAR(DATEADD(month, -11, GETDATE())), MONTH(DATEADD(month, -11, GETDATE())), 1)
+    GROUP BY v.cod_pro, v.no_tarif, v.type_prix_code, v.mois;
+
+    INSERT INTO #bundle_ventes_le_mans (cod_pro, tot_vte_eur, tot_marge_pr_eur, qte)
+    SELECT l.cod_pro, SUM(l.tot_vte_eur), SUM(l.tot_marge_pr_eur), SUM(l.qte)
+    FROM ({ventes_le_mans}) l
+    WHERE l.cod_pro IN (SELECT cod_pro FROM #bundle_produits)
+    GROUP BY l.cod_pro;
+"""
+
+BUNDLE_DROP_SQL = """
+    DROP TABLE IF EXISTS #bundle_produits;
+    DROP TABLE IF EXISTS #bundle_ventes;
+    DROP TABLE IF EXISTS #bundle_ventes_le_mans;
+"""
+
+
+async def _query_dashboard_bundle(no_tarif: int, cod_pro_list: list[int], limit: int, db: AsyncSession) -> dict:
+    limit = max(min(limit, 400), 10)
+    cod_pro_in, list_params = json_int_list("cod_pro_json", cod_pro_list)
+    params = {"no_tarif": no_tarif, **list_params}
+    sources = {
+        "dimensions": DIMENSIONS_PRODUIT,
+        "ventes": ventes_source(),
+        "ventes_le_mans": ventes_depot_annee_sql(LE_MANS_NDOS)
     }
 
+    # Tables temporaires propres à la connexion : tout reste sur la même session (pas de fanout)
+    start = time.perf_counter()
+    await db.execute(text(BUNDLE_CREATE_SQL.format(**sources)))
     try:
-        await redis_client.set(redis_key, json.dumps(data), ex=REDIS_TTL_SHORT)
-    except Exception:
-        logger.exception("[Redis] dashboard_products set failed")
+        await db.execute(text(BUNDLE_FILL_SQL.format(cod_pro_in=cod_pro_in, **sources)), params)
+        ventes = "#bundle_ventes"
+        ventes_le_mans = "SELECT cod_pro, tot_vte_eur, tot_marge_pr_eur, qte FROM #bundle_ventes_le_mans"
+        kpi = _kpi_data(
+            (await db.execute(text(_kpi_sql(cod_pro_in, ventes, "#bundle_produits")), params)).fetchall()
+        )
+        historique = _historique_data(
+            (await db.execute(text(_historique_sql(cod_pro_in, ventes, "#bundle_produits")), params)).fetchall()
+        )
+        products_query = _products_sql(cod_pro_in, ventes, ventes_le_mans, dimensions="#bundle_produits")
+        rows = (await db.execute(text(products_query), {**params, "offset": 0, "limit": limit})).fetchall()
+    finally:
+        # Connexion rendue au pool sans tables résiduelles, y compris après une erreur
+        try:
+            await db.execute(text(BUNDLE_DROP_SQL))
+        except Exception:
+            logger.exception("[get_dashboard_bundle] suppression des tables temporaires échouée")
+    elapsed = (time.perf_counter() - start) * 1000
+    logger.info(f"[get_dashboard_bundle] {len(cod_pro_list)} produits, {len(historique)} agrégats mensuels en {elapsed:.1f} ms")
 
-    return data
+    # Même total que /products : produits distincts du périmètre
+    total = len({item["cod_pro"] for item in kpi["items"]})
+    return {"kpi": kpi, "historique": historique, "products": _products_data(rows, total, True, limit)}
@@ -0,0 +1,224 @@
+# 📄 backend/app/services/dashboard/ventes_mensuelles.py
+"""
+Datamart des ventes mensuelles : Pricing.Ventes_Mensuelles agrège Px_vte_mouvement par
+(mois, no_tarif, cod_pro, ndos, type_prix_code). Les requêtes dashboard le lisent au
+lieu des mouvements bruts quand DASHBOARD_DATAMART_ENABLED est activé.
+
+Rafraîchissement incrémental depuis le dernier dat_mvt chargé (watermark) : le mois du
+watermark, éventuellement incomplet, est recalculé en entier. Un mouvement antidaté sur
+un mois déjà clos n'est repris que par une reconstruction complète (--full).
+
+Le nouveau contenu est construit dans une table de staging puis basculé par ALTER TABLE
+… SWITCH (métadonnées seulement) : les requêtes dashboard, lues en READ UNCOMMITTED, ne
+voient jamais de mois supprimé ou à moitié rechargé.
+
+    python -m app.services.dashboard.ventes_mensuelles [--full]
+
+Lancé aussi périodiquement par l'API si DASHBOARD_DATAMART_REFRESH_MINUTES > 0.
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.cache_keys import tag_table
+from app.cache.tags import invalidate_tags
+from app.common.logger import logger
+from app.common.redis_client import redis_client
+from app.db.session import run_in_session
+from app.settings import get_settings
+
+VENTES_MENSUELLES_TABLE = "CBM_DATA.Pricing.Ventes_Mensuelles"
+# Même structure et mêmes index (condition du SWITCH) : reconstruction, puis ancien contenu
+STAGING_TABLE = "CBM_DATA.Pricing.Ventes_Mensuelles_Staging"
+ANCIEN_TABLE = "CBM_DATA.Pricing.Ventes_Mensuelles_Ancien"
+WATERMARK_TABLE = "CBM_DATA.Pricing.Ventes_Mensuelles_Watermark"
+MOUVEMENTS_TABLE = "CBM_DATA.Pricing.Px_vte_mouvement"
+
+# Profondeur conservée : fenêtre dashboard (12 mois glissants) + marge pour les comparaisons
+MOIS_HISTORIQUE = 24
+
+# Un seul rafraîchissement à la fois entre workers / CLI
+REFRESH_LOCK_KEY = "lock:datamart:ventes_mensuelles"
+REFRESH_LOCK_TIMEOUT = 1800
+
+
+def _create_table_sql(table: str) -> str:
+    return f"""
+    IF OBJECT_ID('{table}') IS NULL
+    BEGIN
+        CREATE TABLE {table} (
+            mois DATE NOT NULL,
+            no_tarif INT NULL,
+            cod_pro INT NULL,
+            ndos INT NULL,
+            type_prix_code INT NULL,
+            tot_vte_eur DECIMAL(19, 4) NULL,
+            tot_marge_pr_eur DECIMAL(19, 4) NULL,
+            qte DECIMAL(19, 4) NULL,
+            nb_mvt INT NOT NULL
+        );
+        CREATE CLUSTERED INDEX IX_Ventes_Mensuelles_Tarif
+            ON {table} (no_tarif, cod_pro, mois);
+        CREATE NONCLUSTERED INDEX IX_Ventes_Mensuelles_Depot
+            ON {table} (ndos, mois) INCLUDE (cod_pro, tot_vte_eur, tot_marge_pr_eur, qte);
+    END;
+"""
+
+
+CREATE_TABLES_SQL = "".join(
+    _create_table_sql(table) for table in (VENTES_MENSUELLES_TABLE, STAGING_TABLE, ANCIEN_TABLE)
+) + f"""
+    IF OBJECT_ID('{WATERMARK_TABLE}') IS NULL
+        CREATE TABLE {WATERMARK_TABLE} (
+            id TINYINT NOT NULL PRIMARY KEY CHECK (id = 1),
+            dernier_dat_mvt DATETIME NULL,
+            date_refresh DATETIME NOT NULL
+        );
+"""
+
+REFRESH_SQL = f"""
+    SET NOCOUNT ON;
+    DECLARE @watermark DATETIME = CASE WHEN :full = 1 THEN NULL ELSE (SELECT dernier_dat_mvt FROM {WATERMARK_TABLE} WHERE id = 1) END;
+    DECLARE @plus_ancien DATE = DATEADD(MONTH, -:mois_historique, DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1));
+    DECLARE @debut DATE = ISNULL(DATEFROMPARTS(YEAR(@watermark), MONTH(@watermark), 1), @plus_ancien);
+    DECLARE @fin DATETIME = (SELECT MAX(dat_mvt) FROM {MOUVEMENTS_TABLE} WITH (NOLOCK));
+    IF @debut < @plus_ancien SET @debut = @plus_ancien;
+
+    -- Staging : mois conservés [@plus_ancien, @debut[ + mois recalculés depuis @debut
+    TRUNCATE TABLE {STAGING_TABLE};
+    INSERT INTO {STAGING_TABLE}
+        (mois, no_tarif, cod_pro, ndos, type_prix_code, tot_vte_eur, tot_marge_pr_eur, qte, nb_mvt)
+    SELECT mois, no_tarif, cod_pro, ndos, type_prix_code, tot_vte_eur, tot_marge_pr_eur, qte, nb_mvt
+    FROM {VENTES_MENSUELLES_TABLE}
+    WHERE mois >= @plus_ancien AND mois < @debut;
+
+    INSERT INTO {STAGING_TABLE}
+        (mois, no_tarif, cod_pro, ndos, type_prix_code, tot_vte_eur, tot_marge_pr_eur, qte, nb_mvt)
+    SELECT DATEFROMPARTS(YEAR(dat_mvt), MONTH(dat_mvt), 1), no_tarif, cod_pro, ndos, type_prix_code,
+           SUM(tot_vte_eur), SUM(tot_marge_pr_eur), SUM(qte), COUNT(*)
+    FROM {MOUVEMENTS_TABLE} WITH (NOLOCK)
+    WHERE dat_mvt >= @debut AND dat_mvt <= @fin
+    GROUP BY DATEFROMPARTS(YEAR(dat_mvt), MONTH(dat_mvt), 1), no_tarif, cod_pro, ndos, type_prix_code;
+    DECLARE @lignes INT = @@ROWCOUNT;
+
+    -- Bascule dans la transaction de la session (commit par refresh_ventes_mensuelles) :
+    -- le verrou Sch-M des SWITCH fait attendre les lecteurs, même NOLOCK, jusqu'au commit
+    TRUNCATE TABLE {ANCIEN_TABLE};
+    ALTER TABLE {VENTES_MENSUELLES_TABLE} SWITCH TO {ANCIEN_TABLE};
+    ALTER TABLE {STAGING_TABLE} SWITCH TO {VENTES_MENSUELLES_TABLE};
+    TRUNCATE TABLE {ANCIEN_TABLE};
+
+    UPDATE {WATERMARK_TABLE} SET dernier_dat_mvt = @fin, date_refresh = GETDATE() WHERE id = 1;
+    IF @@ROWCOUNT = 0
+        INSERT INTO {WATERMARK_TABLE} (id, dernier_dat_mvt, date_refresh) VALUES (1, @fin, GETDATE());
+
+    SELECT @debut AS debut, @fin AS watermark, @lignes AS lignes;
+"""
+
+
+# ============================================================
+# 📥 Sources lues par les requêtes dashboard
+# ============================================================
+def ventes_source() -> str:
+    """
+    Table dérivée (cod_pro, no_tarif, ndos, type_prix_code, mois, tot_vte_eur, tot_marge_pr_eur, qte).
+    `mois` est le 1er du mois côté datamart, dat_mvt côté mouvements bruts : les filtres
+    doivent porter sur des bornes de mois (ex: DATEADD(MONTH, -11, <1er du mois courant>)).
+    """
+    if get_settings().DASHBOARD_DATAMART_ENABLED:
+        return f"""(
+            SELECT cod_pro, no_tarif, ndos, type_prix_code, mois, tot_vte_eur, tot_marge_pr_eur, qte
+            FROM {VENTES_MENSUELLES_TABLE}
+        )"""
+    return f"""(
+            SELECT cod_pro, no_tarif, ndos, type_prix_code, dat_mvt AS mois, tot_vte_eur, tot_marge_pr_eur, qte
+            FROM {MOUVEMENTS_TABLE} WITH (NOLOCK)
+        )"""
+
+
+def ventes_depot_annee_sql(ndos: int) -> str:
+    """
+    Ventes du dépôt `ndos` sur l'année glissante (depuis DATEADD(YEAR, -1, GETDATE())),
+    par cod_pro. Côté datamart : mois complets agrégés + début du 1er mois, partiel,
+    relu dans les mouvements bruts.
+    """
+    if not get_settings().DASHBOARD_DATAMART_ENABLED:
+        return f"""
+            SELECT cod_pro, tot_vte_eur, tot_marge_pr_eur, qte
+            FROM {MOUVEMENTS_TABLE} WITH (NOLOCK)
+            WHERE dat_mvt >= DATEADD(YEAR, -1, GETDATE()) AND ndos = {int(ndos)}
+        """
+    premier_mois_complet = "DATEADD(MONTH, 1, DATEFROMPARTS(YEAR(DATEADD(YEAR, -1, GETDATE())), MONTH(DATEADD(YEAR, -1, GETDATE())), 1))"
+    return f"""
+            SELECT cod_pro, tot_vte_eur, tot_marge_pr_eur, qte
+            FROM {VENTES_MENSUELLES_TABLE}
+            WHERE mois >= {premier_mois_complet} AND ndos = {int(ndos)}
+            UNION ALL
+            SELECT cod_pro, tot_vte_eur, tot_marge_pr_eur, qte
+            FROM {MOUVEMENTS_TABLE} WITH (NOLOCK)
+            WHERE dat_mvt >= DATEADD(YEAR, -1, GETDATE()) AND dat_mvt < {premier_mois_complet} AND ndos = {int(ndos)}
+    """
+
+
+# ============================================================
+# 🔄 Rafraîchissement
+# ============================================================
+async def refresh_ventes_mensuelles(db: AsyncSession, full: bool = False) -> dict:
+    await db.execute(text(CREATE_TABLES_SQL))
+    result = await db.execute(text(REFRESH_SQL), {"full": int(full), "mois_historique": MOIS_HISTORIQUE})
+    summary = dict(result.mappings().one())
+    await db.commit()
+    # Caches dashboard (kpi, historique, produits, bundle) calculés sur l'ancien contenu
+    await invalidate_tags(tag_table("Ventes_Mensuelles"))
+    logger.info(
+        f"[Datamart] Ventes_Mensuelles : {summary['lignes']} lignes recalculées depuis {summary['debut']} "
+        f"(watermark {summary['watermark']})"
+    )
+    return summary
+
+
+async def refresh_with_lock(full: bool = False):
+    """Rafraîchit si aucun autre worker ne le fait déjà (verrou Redis)"""
+    try:
+        if not await redis_client.set(REFRESH_LOCK_KEY, 1, nx=True, ex=REFRESH_LOCK_TIMEOUT):
+            logger.info("[Datamart] rafraîchissement déjà en cours")
+            return None
+    except Exception:
+        logger.exception("[Redis] verrou datamart indisponible, rafraîchissement ignoré")
+        return None
+    try:
+        return await run_in_session(refresh_ventes_mensuelles, full=full)
+    finally:
+        try:
+            await redis_client.delete(REFRESH_LOCK_KEY)
+        except Exception:
+            logger.exception("[Redis] libération verrou datamart échouée")
+
+
+async def refresh_loop(interval_minutes: int):
+    """Tâche de fond de l'API : rafraîchissement incrémental périodique"""
+    while True:
+        try:
+            await refresh_with_lock()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("[Datamart] rafraîchissement Ventes_Mensuelles échoué")
+        await asyncio.sleep(interval_minutes * 60)
+
+
+async def _main(args):
+    from app.db.engine import engine
+    try:
+        await refresh_with_lock(full=args.full)
+    finally:
+        await engine.dispose()
+        await redis_client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rafraîchissement du datamart Ventes_Mensuelles")
+    parser.add_argument("--full", action="store_true", help="reconstruction complète (MOIS_HISTORIQUE mois)")
+    asyncio.run(_main(parser.parse_args()))
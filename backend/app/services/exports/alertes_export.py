@@ -0,0 +1,39 @@
+# 📄 backend/app/services/exports/alertes_export.py
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.alertes.alertes_schema import AlertesSummaryRequest
+from app.services.alertes.alertes_service import alertes_filters, alertes_sort_keys
+from app.services.exports.rows import stream_rows
+
+ALERTES_EXPORT_COLUMNS = [
+    "cod_pro", "refint", "qualite", "grouping_crn", "no_tarif",
+    "nb_alertes", "regles", "ca_total", "date_detection",
+    "px_vente", "px_achat", "marge_relative"
+]
+
+
+def build_alertes_export_query(filters: list[str], payload: AlertesSummaryRequest) -> str:
+    """Seules les colonnes exportées, dans l'ordre de la synthèse, sans pagination"""
+    where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
+    order_clause = ", ".join(f"{column} {direction.upper()}" for column, direction in alertes_sort_keys(payload))
+    return f"""
+        SELECT {', '.join(ALERTES_EXPORT_COLUMNS)}
+        FROM CBM_DATA.Pricing.Alertes_Synthese WITH (NOLOCK)
+        {where_clause}
+        ORDER BY {order_clause}
+    """
+
+
+async def alertes_export(
+    payload: AlertesSummaryRequest,
+    db: AsyncSession
+) -> tuple[list[str], AsyncIterator[Sequence[RowMapping]]]:
+    """
+    Colonnes et flux de lignes de l'export alertes (mêmes filtres et tri que la synthèse).
+    `db` ne sert qu'à résoudre les filtres produit : les lignes sont lues sur une session dédiée.
+    """
+    filters, params, _, _ = await alertes_filters(payload, db)
+    return ALERTES_EXPORT_COLUMNS, stream_rows(build_alertes_export_query(filters, payload), params)
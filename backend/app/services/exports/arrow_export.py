@@ -0,0 +1,151 @@
+# 📄 backend/app/services/exports/arrow_export.py
+"""
+Exports colonnaires Parquet et Arrow IPC (fichier, lisible par pandas.read_feather) :
+chaque paquet de lignes du curseur SQL devient un record batch (un row group Parquet),
+émis dès qu'il est écrit ; seul le pied de fichier attend la fin du flux.
+
+Types stables d'un paquet à l'autre (un paquet tout NULL ne change pas le schéma) :
+identifiants, compteurs, stock et quantités (qte_LM, qte_{t}) en int64 comme dans les
+schémas de réponse, libellés en texte, date_detection en timestamp, toutes les autres
+colonnes — mesures fixes et colonnes dynamiques prix_{t}, marge_{t}, ca_{t},
+marge_realisee_{t} — en float64.
+
+pyarrow est importé au premier export seulement (module lourd, inutile au démarrage).
+"""
+import asyncio
+import importlib.util
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+INT_COLUMNS = {"cod_pro", "statut", "grouping_crn", "no_tarif", "nb_alertes", "stock_LM"}
+# qte_LM et qte_{t} : une colonne par tarif, reconnues au préfixe
+INT_PREFIXES = ("qte_",)
+TEXT_COLUMNS = {"refint", "nom_pro", "qualite", "regles"}
+TIMESTAMP_COLUMNS = {"date_detection"}
+
+PARQUET_COMPRESSION = "zstd"
+
+
+def _as_int(value):
+    return None if value is None else int(value)
+
+
+def _as_float(value):
+    return None if value is None else float(value)
+
+
+def _as_text(value):
+    return None if value is None else str(value)
+
+
+def _as_timestamp(value):
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _is_int(column: str) -> bool:
+    return column in INT_COLUMNS or column.startswith(INT_PREFIXES)
+
+
+def arrow_schema(pa, columns: Sequence[str]):
+    fields = []
+    for column in columns:
+        if _is_int(column):
+            fields.append(pa.field(column, pa.int64()))
+        elif column in TEXT_COLUMNS:
+            fields.append(pa.field(column, pa.string()))
+        elif column in TIMESTAMP_COLUMNS:
+            fields.append(pa.field(column, pa.timestamp("ms")))
+        else:
+            fields.append(pa.field(column, pa.float64()))
+    return pa.schema(fields)
+
+
+def _converter(column: str):
+    if _is_int(column):
+        return _as_int
+    if column in TEXT_COLUMNS:
+        return _as_text
+    if column in TIMESTAMP_COLUMNS:
+        return _as_timestamp
+    return _as_float
+
+
+def record_batch(pa, schema, rows: Sequence[Mapping[str, Any]]):
+    """Paquet de lignes (mappings) → record batch, colonne par colonne"""
+    arrays = []
+    for field in schema:
+        convert = _converter(field.name)
+        arrays.append(pa.array([convert(row.get(field.name)) for row in rows], type=field.type))
+    return pa.record_batch(arrays, schema=schema)
+
+
+class _Drain:
+    """
+    Sortie des writers pyarrow : accumule les octets écrits, vidés après chaque batch.
+    tell() reste la position absolue dans le fichier (offsets du pied Parquet / Arrow).
+    """
+
+    def __init__(self):
+        self.parts: list[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+async def _columnar_chunks(
+    open_writer,
+    columns: Sequence[str],
+    chunks: AsyncIterator[Sequence[Mapping[str, Any]]]
+) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+
+    schema = arrow_schema(pa, columns)
+    sink = _Drain()
+    writer = open_writer(sink, schema)
+    async for rows in chunks:
+        # Conversion et encodage (compression) hors de la boucle d'événements
+        await asyncio.to_thread(lambda: writer.write_batch(record_batch(pa, schema, rows)))
+        if data := sink.take():
+            yield data
+    await asyncio.to_thread(writer.close)
+    if data := sink.take():
+        yield data
+
+
+def parquet_chunks(columns: Sequence[str], chunks: AsyncIterator[Sequence[Mapping[str, Any]]]) -> AsyncIterator[bytes]:
+    """Parquet : un row group par paquet de lignes"""
+    def open_writer(sink, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(sink, schema, compression=PARQUET_COMPRESSION)
+    return _columnar_chunks(open_writer, columns, chunks)
+
+
+def arrow_chunks(columns: Sequence[str], chunks: AsyncIterator[Sequence[Mapping[str, Any]]]) -> AsyncIterator[bytes]:
+    """Arrow IPC, format fichier (Feather v2)"""
+    def open_writer(sink, schema):
+        import pyarrow as pa
+        return pa.ipc.new_file(sink, schema)
+    return _columnar_chunks(open_writer, columns, chunks)
@@ -0,0 +1,27 @@
+# 📄 backend/app/services/exports/comparatif_export.py
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.tarifs.comparatif_multi_schema import ComparatifFilterRequest
+from app.services.exports.rows import stream_rows
+from app.services.tarifs.comparatif_query import (
+    build_export_query, export_columns, get_pivot_tarifs, validate_tarifs
+)
+
+
+async def comparatif_export(
+    db: AsyncSession,
+    payload: ComparatifFilterRequest
+) -> tuple[list[str], AsyncIterator[Sequence[RowMapping]]]:
+    """
+    Colonnes et flux de lignes de l'export comparatif (mêmes filtres et tri que l'écran).
+    `db` ne sert qu'à valider les tarifs : les lignes sont lues sur une session dédiée.
+    """
+    if not (1 <= len(payload.tarifs) <= 3):
+        raise ValueError("Entre 1 et 3 tarifs requis.")
+    validate_tarifs(payload.tarifs, await get_pivot_tarifs(db))
+
+    sql, params = build_export_query(payload)
+    return export_columns(payload.tarifs), stream_rows(sql, params)
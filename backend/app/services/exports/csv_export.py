@@ -0,0 +1,44 @@
+# 📄 backend/app/services/exports/csv_export.py
+"""
+Écriture CSV incrémentale : un morceau encodé par paquet de lignes, mémoire
+bornée par la taille d'un paquet quel que soit le nombre de lignes exportées.
+"""
+import csv
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+CSV_SEPARATOR = ";"
+CSV_ENCODING = "utf-8"
+CSV_BOM = "\ufeff"  # Excel détecte l'UTF-8
+
+
+def csv_cell(value: Any) -> Any:
+    """Valeur telle qu'écrite dans le CSV (mêmes rendus que la réponse JSON)"""
+    if value is None:
+        return ""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def csv_chunks(
+    columns: Sequence[str],
+    chunks: AsyncIterator[Sequence[Mapping[str, Any]]]
+) -> AsyncIterator[bytes]:
+    """BOM + en-têtes, puis un morceau par paquet de lignes ; colonnes absentes → vide"""
+    buffer = StringIO()
+    writer = csv.writer(buffer, delimiter=CSV_SEPARATOR)
+    buffer.write(CSV_BOM)
+    writer.writerow(columns)
+    async for rows in chunks:
+        for row in rows:
+            writer.writerow([csv_cell(row.get(column)) for column in columns])
+        yield buffer.getvalue().encode(CSV_ENCODING)
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode(CSV_ENCODING)
@@ -0,0 +1,39 @@
+# 📄 backend/app/services/exports/formats.py
+"""
+Formats d'export : chaque writer transforme (colonnes, flux de paquets de lignes)
+en flux d'octets, consommé tel quel par StreamingResponse ou écrit sur disque par
+les jobs d'export (app.services.exports.jobs).
+"""
+from typing import Any, AsyncIterator, Callable, Mapping, NamedTuple, Sequence
+
+from app.services.exports.arrow_export import ARROW_AVAILABLE, arrow_chunks, parquet_chunks
+from app.services.exports.csv_export import csv_chunks
+from app.services.exports.xlsx_export import XLSX_AVAILABLE, xlsx_chunks
+
+Writer = Callable[[Sequence[str], AsyncIterator[Sequence[Mapping[str, Any]]]], AsyncIterator[bytes]]
+
+
+class ExportFormat(NamedTuple):
+    extension: str
+    media_type: str
+    write: Writer
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("csv", "text/csv; charset=utf-8", csv_chunks),
+}
+if XLSX_AVAILABLE:
+    EXPORT_FORMATS["xlsx"] = ExportFormat(
+        "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", xlsx_chunks
+    )
+if ARROW_AVAILABLE:
+    EXPORT_FORMATS["parquet"] = ExportFormat("parquet", "application/vnd.apache.parquet", parquet_chunks)
+    EXPORT_FORMATS["arrow"] = ExportFormat("arrow", "application/vnd.apache.arrow.file", arrow_chunks)
+
+
+def get_export_format(name: str) -> ExportFormat:
+    """ValueError (→ 400) si le format n'est pas supporté"""
+    try:
+        return EXPORT_FORMATS[name]
+    except KeyError:
+        raise ValueError(f"Format d'export non supporté : {name} (disponibles : {', '.join(EXPORT_FORMATS)})")
@@ -0,0 +1,144 @@
+# 📄 backend/app/services/exports/jobs.py
+"""
+Jobs d'export en arrière-plan : la requête HTTP ne fait que valider les filtres et
+lancer le job ; l'export tourne dans une tâche asyncio du worker (EXPORT_JOBS_CONCURRENCY
+au plus en parallèle), écrit le fichier dans EXPORT_DIR et publie son état dans Redis,
+lisible depuis n'importe quel worker :
+
+    pending → running (rows : lignes écrites) → done | error
+
+Fichier et état expirent après EXPORT_JOB_TTL_MINUTES (cleanup_loop). Un job interrompu
+par l'arrêt du worker reste "running" jusqu'à expiration de son état.
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Mapping, Optional, Sequence
+
+from app.cache.cache_keys import export_job_key
+from app.common.logger import logger
+from app.common.redis_client import redis_client
+from app.services.exports.formats import get_export_format
+from app.settings import get_settings
+
+# Fréquence du ménage des fichiers expirés
+CLEANUP_INTERVAL_SECONDS = 600
+
+_semaphore: Optional[asyncio.Semaphore] = None
+_running: set = set()
+
+
+def _job_ttl() -> int:
+    return get_settings().EXPORT_JOB_TTL_MINUTES * 60
+
+
+def export_path(job: dict) -> str:
+    return os.path.join(get_settings().EXPORT_DIR, f"{job['job_id']}.{get_export_format(job['format']).extension}")
+
+
+async def _save(job: dict):
+    await redis_client.set(export_job_key(job["job_id"]), json.dumps(job), ex=_job_ttl())
+
+
+async def get_export_job(job_id: str) -> Optional[dict]:
+    raw = await redis_client.get(export_job_key(job_id))
+    return json.loads(raw) if raw else None
+
+
+async def start_export_job(
+    kind: str,
+    export_format: str,
+    columns: Sequence[str],
+    chunks: AsyncIterator[Sequence[Mapping[str, Any]]]
+) -> dict:
+    """Enregistre le job (pending) et lance l'export en tâche de fond ; Redis indisponible → exception"""
+    global _semaphore
+    extension = get_export_format(export_format).extension
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "kind": kind,
+        "format": export_format,
+        "status": "pending",
+        "rows": 0,
+        "filename": f"export_{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+        "created_at": datetime.now().isoformat(),
+        "finished_at": None,
+        "error": None,
+    }
+    await _save(job)
+
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(get_settings().EXPORT_JOBS_CONCURRENCY)
+    task = asyncio.create_task(_run_export_job(job, columns, chunks))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return job
+
+
+async def _save_progress(job: dict):
+    try:
+        await _save(job)
+    except Exception:
+        logger.exception(f"[Redis] état du job d'export {job['job_id']} non enregistré")
+
+
+async def _counted(job: dict, chunks: AsyncIterator[Sequence[Mapping[str, Any]]]):
+    """Relaie les paquets de lignes en publiant la progression après chacun"""
+    async for rows in chunks:
+        yield rows
+        job["rows"] += len(rows)
+        await _save_progress(job)
+
+
+async def _run_export_job(job: dict, columns: Sequence[str], chunks: AsyncIterator[Sequence[Mapping[str, Any]]]):
+    async with _semaphore:
+        job["status"] = "running"
+        await _save_progress(job)
+
+        path = export_path(job)
+        partial_path = f"{path}.part"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(partial_path, "wb") as output:
+                async for data in get_export_format(job["format"]).write(columns, _counted(job, chunks)):
+                    await asyncio.to_thread(output.write, data)
+            os.replace(partial_path, path)
+            job["status"] = "done"
+            logger.info(f"[Export] job {job['job_id']} ({job['kind']}) terminé : {job['rows']} lignes")
+        except Exception as exc:
+            logger.exception(f"[Export] job {job['job_id']} ({job['kind']}) échoué")
+            job.update(status="error", error=f"{type(exc).__name__}: {exc}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        finally:
+            job["finished_at"] = datetime.now().isoformat()
+            await _save_progress(job)
+
+
+def cleanup_expired_exports() -> int:
+    """Supprime les fichiers d'export plus anciens que EXPORT_JOB_TTL_MINUTES"""
+    export_dir = get_settings().EXPORT_DIR
+    if not os.path.isdir(export_dir):
+        return 0
+    limit = time.time() - _job_ttl()
+    removed = 0
+    for entry in os.scandir(export_dir):
+        if entry.is_file() and entry.stat().st_mtime < limit:
+            os.remove(entry.path)
+            removed += 1
+    if removed:
+        logger.info(f"[Export] {removed} fichier(s) expiré(s) supprimé(s)")
+    return removed
+
+
+async def cleanup_loop():
+    """Tâche de fond de l'API : ménage périodique de EXPORT_DIR"""
+    while True:
+        try:
+            await asyncio.to_thread(cleanup_expired_exports)
+        except Exception:
+            logger.exception("[Export] ménage des fichiers expirés échoué")
+        await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
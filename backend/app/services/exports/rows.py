@@ -0,0 +1,50 @@
+# 📄 backend/app/services/exports/rows.py
+"""
+Lecture en flux des lignes d'export : curseur côté serveur (stream_results) lu par
+paquets de EXPORT_CHUNK_ROWS, sans jamais matérialiser le résultat complet ni le
+mettre en cache. Les formats (CSV...) consomment ces paquets au fil de l'eau.
+"""
+from typing import AsyncIterator, Optional, Sequence
+
+from sqlalchemy import RowMapping, text
+
+from app.common.logger import logger
+from app.db.session import async_session
+
+EXPORT_CHUNK_ROWS = 2000
+
+
+async def stream_rows(sql: str, params: dict, chunk_rows: int = EXPORT_CHUNK_ROWS) -> AsyncIterator[Sequence[RowMapping]]:
+    """
+    Paquets de lignes (mappings) de `sql`. Session dédiée, ouverte au premier paquet et
+    fermée à la fin du flux : le générateur survit à la requête HTTP qui l'a créé
+    (StreamingResponse), il ne peut pas s'appuyer sur la session de la dépendance get_db.
+    """
+    async with async_session() as session:
+        result = await session.stream(text(sql), params, execution_options={"yield_per": chunk_rows})
+        async for partition in result.mappings().partitions(chunk_rows):
+            yield partition
+
+
+async def peek_rows(chunks: AsyncIterator[Sequence[RowMapping]]) -> Optional[AsyncIterator[Sequence[RowMapping]]]:
+    """
+    Lit le premier paquet avant d'envoyer les en-têtes HTTP (404 encore possible) :
+    None si le résultat est vide, sinon le flux complet, premier paquet compris.
+    """
+    first = await anext(chunks, None)
+    if not first:
+        await chunks.aclose()
+        return None
+
+    async def replay():
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        except Exception:
+            logger.exception("[Export] lecture interrompue")
+            raise
+        finally:
+            await chunks.aclose()
+
+    return replay()
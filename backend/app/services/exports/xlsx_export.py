@@ -0,0 +1,92 @@
+# 📄 backend/app/services/exports/xlsx_export.py
+"""
+Écriture XLSX à mémoire constante (xlsxwriter, mode constant_memory) : chaque ligne est
+vidée sur disque dès qu'elle est écrite, le classeur est assemblé dans un répertoire
+temporaire à la fermeture puis relu par blocs. Cellules typées : nombres, dates, texte.
+"""
+import asyncio
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+try:
+    import xlsxwriter
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    xlsxwriter = None
+
+XLSX_AVAILABLE = xlsxwriter is not None
+
+# Limite Excel (en-tête compris) : au-delà, la suite est écrite sur une nouvelle feuille
+XLSX_MAX_ROWS = 1_048_576
+XLSX_READ_BLOCK = 1024 * 1024
+XLSX_DATE_FORMAT = "yyyy-mm-dd hh:mm:ss"
+
+WORKBOOK_OPTIONS = {
+    "constant_memory": True,
+    "strings_to_numbers": False,
+    "strings_to_formulas": False,
+    "strings_to_urls": False,
+    "nan_inf_to_errors": True,
+}
+
+
+class _Sheets:
+    """Feuilles successives d'un classeur write-only, en-tête répété sur chacune"""
+
+    def __init__(self, workbook, columns: Sequence[str], max_rows: int):
+        self.workbook, self.columns, self.max_rows = workbook, list(columns), max_rows
+        self.header_format = workbook.add_format({"bold": True})
+        self.date_format = workbook.add_format({"num_format": XLSX_DATE_FORMAT})
+        self.sheet, self.row_index = None, max_rows
+
+    def _next_sheet(self):
+        self.sheet = self.workbook.add_worksheet()
+        self.sheet.write_row(0, 0, self.columns, self.header_format)
+        self.sheet.freeze_panes(1, 0)
+        self.row_index = 1
+
+    def write_rows(self, rows: Sequence[Mapping[str, Any]]):
+        for row in rows:
+            if self.row_index >= self.max_rows:
+                self._next_sheet()
+            for column_index, column in enumerate(self.columns):
+                self._write_cell(column_index, row.get(column))
+            self.row_index += 1
+
+    def _write_cell(self, column_index: int, value: Any):
+        if value is None:
+            return
+        if isinstance(value, bool):
+            self.sheet.write_boolean(self.row_index, column_index, value)
+        elif isinstance(value, (int, float, Decimal)):
+            self.sheet.write_number(self.row_index, column_index, float(value) if isinstance(value, Decimal) else value)
+        elif isinstance(value, (datetime, date)):
+            self.sheet.write_datetime(self.row_index, column_index, value, self.date_format)
+        else:
+            self.sheet.write_string(self.row_index, column_index, str(value))
+
+    def close(self):
+        if self.sheet is None:
+            self._next_sheet()
+        self.workbook.close()
+
+
+async def xlsx_chunks(
+    columns: Sequence[str],
+    chunks: AsyncIterator[Sequence[Mapping[str, Any]]],
+    max_rows: int = XLSX_MAX_ROWS
+) -> AsyncIterator[bytes]:
+    """Classeur XLSX, émis par blocs une fois complet (le format zip ne s'écrit pas en flux)"""
+    with tempfile.TemporaryDirectory(prefix="cbm_xlsx_") as tmpdir:
+        path = os.path.join(tmpdir, "export.xlsx")
+        sheets = _Sheets(xlsxwriter.Workbook(path, {**WORKBOOK_OPTIONS, "tmpdir": tmpdir}), columns, max_rows)
+        # Écriture et assemblage du zip hors de la boucle d'événements
+        async for rows in chunks:
+            await asyncio.to_thread(sheets.write_rows, rows)
+        await asyncio.to_thread(sheets.close)
+
+        with open(path, "rb") as workbook_file:
+            while block := await asyncio.to_thread(workbook_file.read, XLSX_READ_BLOCK):
+                yield block
@@ -4,28 +4,12 @@ from sqlalchemy.orm import Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.produits.identifier_schema import ProductIdentifierRequest
 from app.services.produits.identifier_service import get_codpro_list_from_identifier
-from app.common.redis_client import redis_client
-from app.cache.cache_keys import resolve_codpro_key
-from app.common.constants import REDIS_TTL_SHORT
-from app.common.logger import logger
-import json
 from app.schemas.dashboard.dashboard_schema import DashboardFilterRequest
 from app.schemas.alertes.alertes_schema import AlertesSummaryRequest
 
 async def resolve_cod_pro_list(payload: ProductIdentifierRequest, db: AsyncSession) -> list[int]:
-    redis_key = resolve_codpro_key(**payload.model_dump())
-    try:
-        cached = await redis_client.get(redis_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] resolve_cod_pro_list fallback")
-    result = await get_codpro_list_from_identifier(payload, db)
-    try:
-        await redis_client.set(redis_key, json.dumps(result), ex=REDIS_TTL_SHORT)
-    except Exception:
-        logger.exception("[Redis] resolve_cod_pro_list set failed")
-    return result
+    # Mise en cache (clé resolve_codpro) assurée par get_codpro_list_from_identifier
+    return await get_codpro_list_from_identifier(payload, db)
 
 def apply_product_filters(query: Query, model_alias, cod_pro_list: list[int] | None = None):
     if cod_pro_list:
@@ -1,65 +1,74 @@
 # backend/app/services/log_modification/log_modification_service.py
 
+import json
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.common.redis_client import redis_client
-from app.cache.cache_keys import generic_cache_key
+from app.cache.cache_keys import generic_cache_key, tag_cod_pro, tag_no_tarif, tag_table
+from app.cache.read_through import get_or_compute
+from app.cache.tags import invalidate_tags
 from app.schemas.logs.log_modification_schema import LogModificationEntry
-from app.common.constants import REDIS_TTL_SHORT
-from app.common.logger import logger
-import json
-import decimal
-import datetime
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, decimal.Decimal):
-            return float(obj)
-        elif isinstance(obj, datetime.datetime):
-            return obj.isoformat()
-        elif isinstance(obj, datetime.date):
-            return obj.isoformat()
-        return super(DecimalEncoder, self).default(obj)
+from app.common.constants import REDIS_TTL_MEDIUM
+from app.db.counts import WINDOW_TOTAL_COLUMN
+
+# Lot complet transmis en un paramètre JSON : 1 INSERT multi-lignes + 1 UPDATE ensembliste,
+# quel que soit le nombre d'entrées (au lieu de 2 allers-retours par entrée).
+# Pas de table intermédiaire : OPENJSON lit les textes en NVARCHAR(MAX) et l'INSERT les
+# convertit vers les types des colonnes cibles (valeur trop longue → erreur, pas de troncature).
+LOG_MODIFICATIONS_BATCH_SQL = """
+    SET NOCOUNT ON;
+    DECLARE @entries NVARCHAR(MAX) = :entries;
+
+    INSERT INTO [Pricing].[Log_modifications_tarif]
+    (cod_pro, refint, no_tarif, ancien_prix, nouveau_prix, ancienne_marge,
+     marge_simulee, statut_utilisateur, commentaire_utilisateur, date_modification, utilisateur)
+    SELECT e.cod_pro, e.refint, e.no_tarif, e.ancien_prix, e.nouveau_prix, e.ancienne_marge,
+           e.marge_simulee, e.statut_utilisateur, e.commentaire_utilisateur, GETDATE(), :utilisateur
+    FROM OPENJSON(@entries) j
+    CROSS APPLY OPENJSON(j.[value]) WITH (
+        cod_pro INT, refint NVARCHAR(MAX), no_tarif INT,
+        ancien_prix FLOAT, nouveau_prix FLOAT, ancienne_marge FLOAT, marge_simulee FLOAT,
+        statut_utilisateur NVARCHAR(MAX), commentaire_utilisateur NVARCHAR(MAX)
+    ) e
+    ORDER BY CAST(j.[key] AS INT);
+
+    -- Plusieurs entrées pour un même produit / tarif : la dernière l'emporte (comme en saisie unitaire)
+    WITH derniere AS (
+        SELECT e.*, ROW_NUMBER() OVER (PARTITION BY e.cod_pro, e.no_tarif ORDER BY CAST(j.[key] AS INT) DESC) AS n
+        FROM OPENJSON(@entries) j
+        CROSS APPLY OPENJSON(j.[value]) WITH (
+            cod_pro INT, no_tarif INT, statut_utilisateur NVARCHAR(MAX), commentaire_utilisateur NVARCHAR(MAX)
+        ) e
+    )
+    UPDATE a
+    SET statut_utilisateur = d.statut_utilisateur,
+        commentaire_utilisateur = d.commentaire_utilisateur,
+        date_action_utilisateur = GETDATE(),
+        auteur_action = :utilisateur
+    FROM [CBM_DATA].[Pricing].[Alertes_Tarif] a
+    INNER JOIN derniere d ON d.cod_pro = a.cod_pro AND d.no_tarif = a.no_tarif AND d.n = 1
+    WHERE a.est_active = 1;
+"""
 
 async def log_modifications_in_db(entries: list[LogModificationEntry], db: AsyncSession, user_email: str):
-    for entry in entries:
-        await db.execute(text("""
-            INSERT INTO [Pricing].[Log_modifications_tarif]
-            (cod_pro, refint, no_tarif, ancien_prix, nouveau_prix, ancienne_marge,
-             marge_simulee, statut_utilisateur, commentaire_utilisateur, date_modification, utilisateur)
-            VALUES
-            (:cod_pro, :refint, :no_tarif, :ancien_prix, :nouveau_prix, :ancienne_marge,
-             :marge_simulee, :statut_utilisateur, :commentaire_utilisateur, GETDATE(), :utilisateur)
-        """), {
-            "cod_pro": entry.cod_pro,
-            "refint": entry.refint,
-            "no_tarif": entry.no_tarif,
-            "ancien_prix": entry.ancien_prix,
-            "nouveau_prix": entry.nouveau_prix,
-            "ancienne_marge": entry.ancienne_marge,
-            "marge_simulee": entry.marge_simulee,
-            "statut_utilisateur": entry.statut_utilisateur,
-            "commentaire_utilisateur": entry.commentaire_utilisateur,
-            "utilisateur": user_email
-        })
-
-        await db.execute(text("""
-            UPDATE [CBM_DATA].[Pricing].[Alertes_Tarif]
-            SET statut_utilisateur = :statut_utilisateur,
-                commentaire_utilisateur = :commentaire_utilisateur,
-                date_action_utilisateur = GETDATE(),
-                auteur_action = :utilisateur
-            WHERE cod_pro = :cod_pro AND no_tarif = :no_tarif AND est_active = 1
-        """), {
-            "cod_pro": entry.cod_pro,
-            "no_tarif": entry.no_tarif,
-            "statut_utilisateur": entry.statut_utilisateur,
-            "commentaire_utilisateur": entry.commentaire_utilisateur,
-            "utilisateur": user_email
-        })
+    if not entries:
+        return
+
+    await db.execute(text(LOG_MODIFICATIONS_BATCH_SQL), {
+        "entries": json.dumps([entry.model_dump() for entry in entries]),
+        "utilisateur": user_email
+    })
 
     await db.commit()
 
+    # ❗Purge des caches dépendant des alertes / de l'historique des produits modifiés
+    await invalidate_tags(
+        tag_table("Alertes_Tarif"),
+        tag_table("Log_modifications_tarif"),
+        *{tag_cod_pro(entry.cod_pro) for entry in entries},
+        *{tag_no_tarif(entry.no_tarif) for entry in entries}
+    )
+
 
 async def fetch_modification_history_paginated(
     db: AsyncSession,
@@ -69,7 +78,8 @@ async def fetch_modification_history_paginated(
     refint: str = None,
     no_tarif: int = None
 ):
-    base_query = "SELECT * FROM [Pricing].[Log_modifications_tarif] WHERE 1=1"
+    # Total calculé dans la même requête (COUNT(*) OVER()) : un seul aller-retour SQL
+    base_query = f"SELECT *, COUNT(*) OVER() AS {WINDOW_TOTAL_COLUMN} FROM [Pricing].[Log_modifications_tarif] WHERE 1=1"
     count_query = "SELECT COUNT(*) AS total FROM [Pricing].[Log_modifications_tarif] WHERE 1=1"
     params = {}
 
@@ -100,23 +110,21 @@ async def fetch_modification_history_paginated(
         refint=refint,
         no_tarif=no_tarif
     )
-    try:
-        cached = await redis_client.get(redis_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] fetch_modification_history fallback")
-
-    data_result = await db.execute(text(base_query), params)
-    count_result = await db.execute(text(count_query), params)
-
-    rows = [dict(row) for row in data_result.mappings().all()]
-    total = count_result.scalar_one()
-
-    result = {"total": total, "rows": rows}
-    try:
-        await redis_client.set(redis_key, json.dumps(result, cls=DecimalEncoder), ex=REDIS_TTL_SHORT)
-    except Exception:
-        logger.exception("[Redis] modif_log set failed")
-
-    return result
+
+    async def compute():
+        data_result = await db.execute(text(base_query), params)
+        rows = [dict(row) for row in data_result.mappings().all()]
+        if rows:
+            total = rows[0][WINDOW_TOTAL_COLUMN]
+            for row in rows:
+                del row[WINDOW_TOTAL_COLUMN]
+        elif params["offset"]:
+            # Page au-delà de la fin : aucune ligne ne porte le total
+            total = (await db.execute(text(count_query), params)).scalar_one()
+        else:
+            total = 0
+        return {"total": total, "rows": rows, "total_exact": True}
+
+    return await get_or_compute(
+        redis_key, compute, REDIS_TTL_MEDIUM, tags=[tag_table("Log_modifications_tarif")]
+    )
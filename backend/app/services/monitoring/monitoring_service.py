@@ -8,6 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.common.logger import logger
 from app.common.redis_client import redis_client
+from app.cache.stats import cache_stats
+from app.cache.local_cache import local_cache
+from app.db.pool_stats import pool_stats
 import json
 
 class SystemMonitor:
@@ -64,6 +67,7 @@ class SystemMonitor:
         metrics = {
             "timestamp": datetime.now().isoformat(),
             "database": await self._get_db_metrics(db),
+            "db_pool": pool_stats.snapshot(),
             "cache": await self._get_cache_metrics(),
             "application": await self._get_app_metrics(),
             "slow_queries": self.slow_queries[-10:]  # 10 dernières requêtes lentes
@@ -129,7 +133,9 @@ class SystemMonitor:
                 "keyspace_misses": info.get("keyspace_misses", 0),
                 "hit_rate": info.get("keyspace_hits", 0) / max(
                     info.get("keyspace_hits", 0) + info.get("keyspace_misses", 0), 1
-                )
+                ),
+                "read_through": cache_stats.snapshot(),
+                "local": local_cache.stats()
             }
         except Exception as e:
             return {"error": str(e)}
@@ -1,26 +1,19 @@
 # backend/app/services/parametres/parametres_service.py
 
+import json
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.schemas.parametres.parametres_schema import TarifParam
-from app.common.redis_client import redis_client
-from app.cache.cache_keys import parametres_tarifs_key
+from app.cache.cache_keys import dim_tarif_cache_keys, parametres_tarifs_key
+from app.cache.read_through import read_through
+from app.cache.local_cache import invalidate
 from typing import List
-from aiocache import cached, Cache
 
-import json
 from app.common.constants import REDIS_TTL_SHORT
-from app.common.logger import logger
 
+@read_through(key=lambda db: parametres_tarifs_key(), ttl=REDIS_TTL_SHORT, local_ttl=REDIS_TTL_SHORT)
 async def get_all_tarifs(db: AsyncSession):
-    redis_key = parametres_tarifs_key()
-    try:
-        cached = await redis_client.get(redis_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] get_all_tarifs fallback")
-
     query = text("""
         SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED;
         SELECT no_tarif, nom_tarif, visible
@@ -28,31 +21,27 @@ async def get_all_tarifs(db: AsyncSession):
         ORDER BY no_tarif
     """)
     result = await db.execute(query)
-    rows = [dict(row) for row in result.mappings().all()]
-
-    try:
-        await redis_client.set(redis_key, json.dumps(rows), ex=REDIS_TTL_SHORT)
-    except Exception:
-        logger.exception("[Redis] set failed get_all_tarifs")
-
-    return rows
+    return [dict(row) for row in result.mappings().all()]
 
 async def update_tarif_visibility(payload: List[TarifParam], db: AsyncSession):
-    for param in payload:
-        await db.execute(text("""
-            UPDATE CBM_DATA.dm.Dim_Tarif
-            SET visible = :visible
-            WHERE no_tarif = :no_tarif
-        """), {
-            "no_tarif": param.no_tarif,
-            "visible": param.visible
-        })
+    # Un seul UPDATE pour tout le lot ; seules les lignes dont la visibilité change sont écrites
+    visibilites = {param.no_tarif: param.visible for param in payload}
+    result = await db.execute(text("""
+        SET NOCOUNT ON;
+        UPDATE t
+        SET visible = p.visible
+        FROM CBM_DATA.dm.Dim_Tarif t
+        INNER JOIN OPENJSON(:visibilites) WITH (no_tarif INT, visible BIT) p ON p.no_tarif = t.no_tarif
+        WHERE t.visible IS NULL OR t.visible <> p.visible;
+        SELECT @@ROWCOUNT;
+    """), {
+        "visibilites": json.dumps([{"no_tarif": k, "visible": v} for k, v in visibilites.items()])
+    })
+    updated = result.scalar() or 0
     await db.commit()
 
-    # ❗Purge du cache
-    try:
-        await redis_client.delete("parametres:tarifs")
-    except Exception:
-        logger.exception("[Redis] delete failed after update_tarif_visibility")
+    # ❗Purge en un pipeline de tous les caches dérivés de Dim_Tarif (Redis + L1 de tous les workers)
+    if updated:
+        await invalidate(*dim_tarif_cache_keys())
 
-    return {"message": "Visibilité des tarifs mise à jour avec succès."}
+    return {"message": "Visibilité des tarifs mise à jour avec succès.", "updated": updated}
@@ -2,22 +2,17 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.common.redis_client import redis_client
 from app.cache.cache_keys import resolve_codpro_key
+from app.cache.read_through import read_through
 from app.schemas.produits.identifier_schema import ProductIdentifierRequest
-from app.common.constants import REDIS_TTL_SHORT
-from app.common.logger import logger
-import json
+from app.common.constants import REDIS_TTL_NEGATIVE, REDIS_TTL_SHORT
 
+@read_through(
+    key=lambda payload, db: resolve_codpro_key(**payload.model_dump(exclude_defaults=True)),
+    ttl=REDIS_TTL_SHORT,
+    negative_ttl=REDIS_TTL_NEGATIVE
+)
 async def get_codpro_list_from_identifier(payload: ProductIdentifierRequest, db: AsyncSession):
-    redis_key = resolve_codpro_key(**payload.model_dump())
-    try:
-        cached = await redis_client.get(redis_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] fallback get_codpro_list_from_identifier")
-
     if payload.grouping_crn == 1 and payload.cod_pro:
         result = await db.execute(text("""
             SELECT TOP 1 grouping_crn
@@ -67,12 +62,4 @@ async def get_codpro_list_from_identifier(payload: ProductIdentifierRequest, db:
     rows = result.fetchall()
     resolved = [row[0] for row in rows] or ([payload.cod_pro] if payload.cod_pro else [])
 
-    # LOG ICI : combien de codes résolus et le détail du payload
-    #logger.warning(f"[get_codpro_list_from_identifier] Résolu {len(resolved)} codes | payload={payload.model_dump()}")
-
-    try:
-        await redis_client.set(redis_key, json.dumps(resolved), ex=REDIS_TTL_SHORT)
-    except Exception:
-        logger.exception("[Redis] set failed get_codpro_list_from_identifier")
-
     return resolved
@@ -2,21 +2,16 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.common.redis_client import redis_client
-from app.common.constants import REDIS_TTL_SHORT
-from app.common.logger import logger
-import json
+from app.cache.read_through import read_through
+from app.common.constants import REDIS_TTL_NEGATIVE, REDIS_TTL_SHORT
 
 
+@read_through(
+    key=lambda cod_pro, db: f"suggest:refcrn:{cod_pro}",
+    ttl=REDIS_TTL_SHORT,
+    negative_ttl=REDIS_TTL_NEGATIVE
+)
 async def get_refcrn_by_codpro(cod_pro: int, db: AsyncSession):
-    redis_key = f"suggest:refcrn:{cod_pro}"
-    try:
-        cached = await redis_client.get(redis_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] refcrn_by_codpro fallback")
-
     query = text("""
         SELECT DISTINCT ref_crn
         FROM CBM_DATA.Pricing.Dimensions_Produit
@@ -24,14 +19,7 @@ async def get_refcrn_by_codpro(cod_pro: int, db: AsyncSession):
         ORDER BY ref_crn
     """)
     result = await db.execute(query, {"cod_pro": cod_pro})
-    data = [row[0] for row in result.fetchall()]
-
-    try:
-        await redis_client.set(redis_key, json.dumps(data), ex=REDIS_TTL_SHORT)
-    except Exception:
-        logger.exception("[Redis] set refcrn_by_codpro failed")
-
-    return data
+    return [row[0] for row in result.fetchall()]
 
 
 async def autocomplete_refint_or_codpro(query: str, db: AsyncSession):
@@ -6,12 +6,20 @@ from sqlalchemy import func, desc, asc, text, and_, or_
 from fastapi import HTTPException
 from app.models.comparatif_tarif import ComparatifTarifPivot
 from app.schemas.tarifs.comparatif_multi_schema import ComparatifFilterRequest
+from app.services.tarifs.comparatif_query import (
+    build_count_query, build_page_query, get_pivot_tarifs, sort_keys, sort_signature, validate_tarifs
+)
+from app.common.pagination import decode_cursor, encode_cursor
+from app.cache.cache_keys import comparatif_multi_key, comparatif_usage_key, count_key
+from app.cache.read_through import get_or_compute
+from app.db.counts import count_total
+from app.db.session import run_in_session
 from app.common.redis_client import redis_client
-from app.cache.cache_keys import comparatif_multi_key
-from app.common.constants import REDIS_TTL_MEDIUM
+from app.common.constants import REDIS_TTL_MEDIUM, REDIS_TTL_STALE
 from app.common.logger import logger
-import json
 from decimal import Decimal
+from functools import partial
+import json
 
 # Configuration pour optimiser les performances
 CACHE_TTL_LONG = 300  # 5 minutes pour les gros datasets
@@ -26,55 +34,60 @@ def normalize(obj):
         return [normalize(v) for v in obj]
     return obj
 
-def build_tarif_conditions(tarifs: list) -> list:
-    """Construction des conditions de filtrage par tarifs"""
-    conditions = []
-    for t in tarifs:
-        conditions.append(text(f"prix_{t} IS NOT NULL AND prix_{t} > 0"))
-    return conditions
-
 def has_specific_filters(payload: ComparatifFilterRequest) -> bool:
     """Vérifie si des filtres spécifiques sont appliqués"""
     return any([payload.cod_pro, payload.refint, payload.qualite])
 
-async def get_cached_or_compute(
-    cache_key: str, 
-    compute_func, 
-    ttl: int = REDIS_TTL_MEDIUM
-) -> Dict[str, Any]:
-    """Récupération avec cache Redis optimisé"""
-    try:
-        cached = await redis_client.get(cache_key)
-        if cached:
-            logger.info(f"Cache hit: {cache_key}")
-            return json.loads(cached)
-    except Exception as e:
-        logger.warning(f"Erreur lecture cache: {e}")
-    
-    # Calcul si pas en cache
-    result = await compute_func()
-    
-    # Mise en cache
+def usage_member(payload: ComparatifFilterRequest) -> str:
+    """Combinaison (tarifs + tri + taille de page) telle que rejouée par app.cache.warmup"""
+    return json.dumps({
+        "tarifs": payload.tarifs,
+        "sort_by": payload.sort_by,
+        "sort_dir": payload.sort_dir,
+        "limit": payload.limit
+    }, sort_keys=True)
+
+async def record_comparatif_usage(payload: ComparatifFilterRequest):
+    """Compte les ouvertures de comparatif sans filtre (1re page) pour le préchauffage"""
+    if has_specific_filters(payload) or payload.export_all or payload.page != 1 or payload.cursor:
+        return
     try:
-        await redis_client.set(cache_key, json.dumps(result), ex=ttl)
-        logger.info(f"Cache mis à jour: {cache_key}")
-    except Exception as e:
-        logger.warning(f"Erreur cache: {e}")
-    
-    return result
+        await redis_client.zincrby(comparatif_usage_key(), 1, usage_member(payload))
+    except Exception:
+        logger.exception("[Redis] comptage usage comparatif échoué")
 
-async def get_comparatif_multi(db: AsyncSession, payload: ComparatifFilterRequest) -> Dict[str, Any]:
+async def get_comparatif_multi(
+    db: AsyncSession, payload: ComparatifFilterRequest, record_usage: bool = True
+) -> Dict[str, Any]:
     """
     Service principal de comparaison tarifaire multi
     Gère la pagination et le tri côté serveur sur toutes les données
+    `record_usage=False` : appel interne (préchauffage), non compté dans les statistiques d'usage
     """
+    if not (1 <= len(payload.tarifs) <= 3):
+        raise ValueError("Entre 1 et 3 tarifs requis.")
+
+    # Seuls les tarifs présents dans la table pivot génèrent des colonnes SQL
+    validate_tarifs(payload.tarifs, await get_pivot_tarifs(db))
+
+    if record_usage:
+        await record_comparatif_usage(payload)
+
+    # Cache avec TTL adaptatif, puis servi périmé pendant le rafraîchissement en arrière-plan
+    cache_ttl = CACHE_TTL_LONG if not has_specific_filters(payload) else REDIS_TTL_MEDIUM
+    return await get_or_compute(
+        comparatif_multi_key(**payload.model_dump()),
+        lambda: _compute_comparatif_multi(db, payload),
+        cache_ttl,
+        stale_ttl=REDIS_TTL_STALE,
+        refresh=partial(run_in_session, _compute_comparatif_multi, payload=payload)
+    )
+
+async def _compute_comparatif_multi(db: AsyncSession, payload: ComparatifFilterRequest) -> Dict[str, Any]:
     tarifs = payload.tarifs
     is_export = getattr(payload, "export_all", False)
     has_filters = has_specific_filters(payload)
 
-    if not (1 <= len(tarifs) <= 3):
-        raise ValueError("Entre 1 et 3 tarifs requis.")
-
     # Gestion pagination
     if is_export:
         page, offset, limit = 1, 0, 999_999
@@ -83,164 +96,40 @@ async def get_comparatif_multi(db: AsyncSession, payload: ComparatifFilterReques
         limit = payload.limit  # Respecter la limite demandée par le frontend
         offset = (page - 1) * limit
 
-    sort_field = payload.sort_by or "cod_pro"
-    sort_dir = payload.sort_dir.lower() if payload.sort_dir else "asc"
+    # Pagination keyset : le curseur remplace page/offset (ValueError → 400 si invalide)
+    cursor_values = decode_cursor(payload.cursor, sort_signature(payload)) if payload.cursor and not is_export else None
 
-    # Clé de cache stratifiée
-    cache_key_base = comparatif_multi_key(**payload.model_dump())
-    count_cache_key = f"{cache_key_base}:count"
-    
     async def compute_total():
-        """Calcul du total avec la même logique que la requête principale"""
+        """Calcul du total avec la même clause WHERE que la requête principale"""
         try:
-            count_where_conditions = []
-            
-            # Condition tarifs obligatoire
-            tarif_condition = " OR ".join([f"prix_{t} IS NOT NULL AND prix_{t} > 0" for t in tarifs])
-            count_where_conditions.append(f"({tarif_condition})")
-            
-            # Filtres optionnels
-            if payload.cod_pro:
-                count_where_conditions.append(f"cod_pro = {payload.cod_pro}")
-            
-            if payload.refint:
-                count_where_conditions.append(f"refint LIKE '%{payload.refint}%'")
-            
-            if payload.qualite:
-                count_where_conditions.append(f"qualite = '{payload.qualite}'")
-            
-            count_where_clause = " AND ".join(count_where_conditions)
-            
-            # Requête COUNT avec SQL brut
-            count_sql = f"""
-            SELECT COUNT(*) as total
-            FROM [CBM_DATA].[Pricing].[Comparatif_Tarif_Pivot]
-            WHERE {count_where_clause}
-            """
-            
-            logger.info(f"SQL count: {count_sql}")
-            
-            result = await db.execute(text(count_sql))
+            count_sql, count_params = build_count_query(payload)
+            result = await db.execute(text(count_sql), count_params)
             row = result.fetchone()
             total = row[0] if row else 0
-                
+
             logger.info(f"Total calculé: {total} (filtres: {has_filters})")
             return total
         except Exception as e:
+            # Pas de total à 0 : il serait mis en cache (count_total) pour REDIS_TTL_MEDIUM
             logger.error(f"Erreur calcul total: {e}")
-            return 0
+            raise HTTPException(status_code=500, detail=f"Erreur calcul total: {str(e)}")
 
-    # Récupération du total avec cache
-    total = await get_cached_or_compute(count_cache_key, compute_total)
+    # Total mis en cache par signature de filtres : partagé par toutes les pages / curseurs
+    count_cache_key = count_key(
+        "comparatif", tarifs=tarifs, cod_pro=payload.cod_pro, refint=payload.refint, qualite=payload.qualite
+    )
+    total, total_exact = await count_total(db, count_cache_key, compute_total)
 
-    # Construction de la requête de données
+    # Requête de données paramétrée (tri et pagination côté SQL)
     try:
-        # Colonnes de base
-        base_columns = [
-            "cod_pro", "refint", "nom_pro", "qualite", "statut", "prix_achat",
-            "stock_LM", "pmp_LM", "qte_LM", "ca_LM", "marge_LM"
-        ]
-        
-        # Colonnes tarifs
-        tarif_columns_sql = []
-        prix_columns_for_ratio = []
-        
-        for t in tarifs:
-            tarif_columns_sql.extend([
-                f"prix_{t}", f"marge_{t}", f"qte_{t}", 
-                f"ca_{t}", f"marge_realisee_{t}"
-            ])
-            prix_columns_for_ratio.append(f"prix_{t}")
-        
-        # Construction de la liste des colonnes avec calcul du ratio si nécessaire
-        all_columns = base_columns + tarif_columns_sql
-        columns_sql = ", ".join([f'"{col}"' for col in all_columns])
-        
-        # Ajout du calcul du ratio pour 2+ tarifs (SQL Server)
-        if len(tarifs) >= 2:
-            if len(prix_columns_for_ratio) == 2:
-                # Pour 2 tarifs
-                ratio_calc = f"""
-                , CASE 
-                    WHEN {prix_columns_for_ratio[0]} > 0 AND {prix_columns_for_ratio[1]} > 0
-                    THEN CASE 
-                        WHEN {prix_columns_for_ratio[0]} >= {prix_columns_for_ratio[1]} 
-                        THEN CAST({prix_columns_for_ratio[0]} AS FLOAT) / {prix_columns_for_ratio[1]}
-                        ELSE CAST({prix_columns_for_ratio[1]} AS FLOAT) / {prix_columns_for_ratio[0]}
-                    END
-                    ELSE NULL
-                END AS ratio_max_min
-                """
-            else:
-                # Pour 3 tarifs - calcul du max/min parmi les 3
-                ratio_calc = f"""
-                , CASE 
-                    WHEN {' AND '.join([f'{col} > 0' for col in prix_columns_for_ratio])}
-                    THEN (
-                        SELECT CAST(MAX(v) AS FLOAT) / NULLIF(MIN(v), 0)
-                        FROM (VALUES ({prix_columns_for_ratio[0]}), ({prix_columns_for_ratio[1]}), ({prix_columns_for_ratio[2]})) AS t(v)
-                        WHERE v > 0
-                    )
-                    ELSE NULL
-                END AS ratio_max_min
-                """
-            columns_sql += ratio_calc
-        
-        # Construction des conditions WHERE
-        where_conditions = []
-        
-        # Condition tarifs obligatoire
-        tarif_condition = " OR ".join([f"prix_{t} IS NOT NULL AND prix_{t} > 0" for t in tarifs])
-        where_conditions.append(f"({tarif_condition})")
-        
-        # Filtres optionnels
-        if payload.cod_pro:
-            where_conditions.append(f"cod_pro = {payload.cod_pro}")
-        
-        if payload.refint:
-            where_conditions.append(f"refint LIKE '%{payload.refint}%'")
-        
-        if payload.qualite:
-            where_conditions.append(f"qualite = '{payload.qualite}'")
-        
-        where_clause = " AND ".join(where_conditions)
-        
-        logger.info(f"WHERE clause SQL: {where_clause}")
-        
-        # Gestion du tri - TOUS les tris se font côté SQL
-        valid_sort_fields = set(base_columns + tarif_columns_sql)
-        if len(tarifs) >= 2:
-            valid_sort_fields.add('ratio_max_min')
-        
-        if sort_field == "ratio_max_min" and len(tarifs) >= 2:
-            # Tri par le ratio calculé en SQL
-            order_clause = f"ORDER BY ratio_max_min {sort_dir.upper()}"
-        elif sort_field in valid_sort_fields:
-            order_clause = f"ORDER BY {sort_field} {sort_dir.upper()}"
-        else:
-            # Tri par défaut
-            if len(tarifs) >= 2:
-                order_clause = "ORDER BY ratio_max_min DESC"
-            else:
-                order_clause = "ORDER BY cod_pro ASC"
-        
-        # Requête SQL brute complète avec pagination
-        raw_sql = f"""
-        SELECT {columns_sql}
-        FROM [CBM_DATA].[Pricing].[Comparatif_Tarif_Pivot]
-        WHERE {where_clause}
-        {order_clause}
-        OFFSET {offset} ROWS FETCH NEXT {limit} ROWS ONLY
-        """
-        
-        logger.info(f"Exécution requête SQL: page={page}, limit={limit}, offset={offset}")
-        logger.debug(f"SQL généré: {raw_sql[:500]}...")
-        
-        result = await db.execute(text(raw_sql))
+        page_sql, page_params = build_page_query(payload, offset, limit, cursor_values)
+        logger.info(f"Exécution requête SQL: page={page}, limit={limit}, offset={offset}, curseur={cursor_values is not None}")
+
+        result = await db.execute(text(page_sql), page_params)
         rows = result.fetchall()
-        
+
         logger.info(f"Récupéré {len(rows)} lignes sur {total} total")
-        
+
     except Exception as e:
         logger.error(f"Erreur requête SQL: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur requête: {str(e)}")
@@ -296,12 +185,23 @@ async def get_comparatif_multi(db: AsyncSession, payload: ComparatifFilterReques
             logger.error(f"Erreur traitement ligne: {e}")
             continue
 
+    # Curseur vers la page suivante : valeurs de tri de la dernière ligne lue
+    next_cursor = None
+    if rows and len(rows) == limit and not is_export:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(
+            sort_signature(payload),
+            [last[column.strip("[]")] for column, _ in sort_keys(payload)]
+        )
+
     # Construction de la réponse finale
     response = {
         "total": total,
         "rows": result_rows,
+        "next_cursor": next_cursor,
+        "total_exact": total_exact,
         "meta": {
-            "has_more": total > offset + len(result_rows),
+            "has_more": next_cursor is not None if cursor_values is not None else total > offset + len(result_rows),
             "page": page,
             "page_size": limit,
             "total_pages": (total + limit - 1) // limit if limit > 0 else 1,
@@ -311,14 +211,4 @@ async def get_comparatif_multi(db: AsyncSession, payload: ComparatifFilterReques
     }
     
     # Normalisation pour JSON
-    response = normalize(response)
-
-    # Cache avec TTL adaptatif
-    cache_ttl = CACHE_TTL_LONG if not has_filters else REDIS_TTL_MEDIUM
-    try:
-        await redis_client.set(cache_key_base, json.dumps(response), ex=cache_ttl)
-        logger.info(f"Réponse mise en cache (TTL: {cache_ttl}s)")
-    except Exception as e:
-        logger.warning(f"Erreur cache réponse: {e}")
-
-    return response
\ No newline at end of file
+    return normalize(response)
\ No newline at end of file
@@ -0,0 +1,191 @@
+# app/services/tarifs/comparatif_query.py
+"""
+Construction du SQL du comparatif multi-tarifs (Comparatif_Tarif_Pivot).
+
+Toutes les valeurs saisies (cod_pro, refint, qualite, offset, limit) sont des paramètres
+liés : le texte SQL ne dépend que des tarifs comparés, des filtres présents et du tri,
+ce qui permet à SQL Server de réutiliser ses plans d'une page / d'un utilisateur à l'autre.
+Les colonnes dynamiques prix_{t}, marge_{t}... ne sont générées que pour des tarifs
+présents dans la table pivot (liste blanche lue dans le catalogue SQL Server).
+"""
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.cache_keys import comparatif_pivot_tarifs_key
+from app.cache.read_through import read_through
+from app.common.constants import REDIS_TTL_LONG
+from app.common.sql_utils import keyset_condition, sanitize_sort_direction
+from app.schemas.tarifs.comparatif_multi_schema import ComparatifFilterRequest
+
+COMPARATIF_TABLE = "[CBM_DATA].[Pricing].[Comparatif_Tarif_Pivot]"
+
+BASE_COLUMNS = (
+    "cod_pro", "refint", "nom_pro", "qualite", "statut", "prix_achat",
+    "stock_LM", "pmp_LM", "qte_LM", "ca_LM", "marge_LM"
+)
+TARIF_COLUMN_TEMPLATES = ("prix_{t}", "marge_{t}", "qte_{t}", "ca_{t}", "marge_realisee_{t}")
+
+
+@read_through(key=lambda db: comparatif_pivot_tarifs_key(), ttl=REDIS_TTL_LONG, local_ttl=REDIS_TTL_LONG)
+async def get_pivot_tarifs(db: AsyncSession) -> list[int]:
+    """Tarifs disposant de colonnes prix_{t} dans la table pivot (liste blanche)"""
+    result = await db.execute(text("""
+        SELECT c.name
+        FROM CBM_DATA.sys.columns c
+        WHERE c.object_id = OBJECT_ID('CBM_DATA.Pricing.Comparatif_Tarif_Pivot')
+          AND c.name LIKE 'prix[_]%'
+    """))
+    suffixes = (row[0][len("prix_"):] for row in result.fetchall())
+    return sorted(int(s) for s in suffixes if s.isdigit())
+
+
+def validate_tarifs(tarifs: list[int], pivot_tarifs: list[int]):
+    """ValueError (→ 400) si un tarif n'a pas de colonnes ; catalogue illisible : pas de filtrage"""
+    if not pivot_tarifs:
+        return
+    unknown = [t for t in tarifs if t not in pivot_tarifs]
+    if unknown:
+        raise ValueError(f"Tarif(s) absent(s) du comparatif : {unknown}")
+
+
+def tarif_columns(tarifs: list[int]) -> list[str]:
+    return [template.format(t=t) for t in tarifs for template in TARIF_COLUMN_TEMPLATES]
+
+
+def build_select(tarifs: list[int]) -> str:
+    columns_sql = ", ".join(f"[{col}]" for col in (*BASE_COLUMNS, *tarif_columns(tarifs)))
+    prix = [f"[prix_{t}]" for t in tarifs]
+    if len(prix) == 2:
+        columns_sql += f"""
+            , CASE
+                WHEN {prix[0]} > 0 AND {prix[1]} > 0
+                THEN CASE
+                    WHEN {prix[0]} >= {prix[1]}
+                    THEN CAST({prix[0]} AS FLOAT) / {prix[1]}
+                    ELSE CAST({prix[1]} AS FLOAT) / {prix[0]}
+                END
+                ELSE NULL
+            END AS ratio_max_min"""
+    elif len(prix) == 3:
+        columns_sql += f"""
+            , CASE
+                WHEN {' AND '.join(f'{col} > 0' for col in prix)}
+                THEN (
+                    SELECT CAST(MAX(v) AS FLOAT) / NULLIF(MIN(v), 0)
+                    FROM (VALUES ({prix[0]}), ({prix[1]}), ({prix[2]})) AS t(v)
+                    WHERE v > 0
+                )
+                ELSE NULL
+            END AS ratio_max_min"""
+    return columns_sql
+
+
+def build_where(payload: ComparatifFilterRequest) -> tuple[str, dict]:
+    """Conditions WHERE (paramètres liés) communes au COUNT et à la page de données"""
+    tarif_condition = " OR ".join(f"([prix_{t}] IS NOT NULL AND [prix_{t}] > 0)" for t in payload.tarifs)
+    conditions = [f"({tarif_condition})"]
+    params = {}
+    if payload.cod_pro:
+        conditions.append("cod_pro = :cod_pro")
+        params["cod_pro"] = payload.cod_pro
+    if payload.refint:
+        conditions.append("refint LIKE :refint")
+        params["refint"] = f"%{payload.refint}%"
+    if payload.qualite:
+        conditions.append("qualite = :qualite")
+        params["qualite"] = payload.qualite
+    return " AND ".join(conditions), params
+
+
+def sort_keys(payload: ComparatifFilterRequest) -> list[tuple[str, str]]:
+    """Tri sur une colonne de la liste blanche, cod_pro en départage (pagination stable)"""
+    tarifs = payload.tarifs
+    sortable = {*BASE_COLUMNS, *tarif_columns(tarifs)}
+    if len(tarifs) >= 2:
+        sortable.add("ratio_max_min")
+
+    if payload.sort_by in sortable:
+        sort_field, sort_dir = payload.sort_by, sanitize_sort_direction(payload.sort_dir)
+    elif len(tarifs) >= 2:
+        sort_field, sort_dir = "ratio_max_min", "desc"
+    else:
+        sort_field, sort_dir = "cod_pro", "asc"
+
+    if sort_field == "cod_pro":
+        return [("cod_pro", sort_dir)]
+    return [(f"[{sort_field}]", sort_dir), ("cod_pro", "asc")]
+
+
+def sort_signature(payload: ComparatifFilterRequest) -> str:
+    """Signature du tri embarquée dans les curseurs keyset"""
+    return ",".join(f"{column.strip('[]')}:{direction}" for column, direction in sort_keys(payload))
+
+
+def build_order(payload: ComparatifFilterRequest) -> str:
+    return "ORDER BY " + ", ".join(f"{column} {direction.upper()}" for column, direction in sort_keys(payload))
+
+
+def build_count_query(payload: ComparatifFilterRequest) -> tuple[str, dict]:
+    where_sql, params = build_where(payload)
+    return f"SELECT COUNT(*) AS total FROM {COMPARATIF_TABLE} WHERE {where_sql}", params
+
+
+def build_page_query(
+    payload: ComparatifFilterRequest,
+    offset: int,
+    limit: int,
+    cursor_values: Optional[list] = None
+) -> tuple[str, dict]:
+    """
+    Page de données : OFFSET/FETCH (pagination historique) ou, avec `cursor_values`,
+    recherche keyset après la dernière ligne servie (coût indépendant de la profondeur).
+    """
+    where_sql, params = build_where(payload)
+    if cursor_values is None:
+        sql = f"""
+            SELECT {build_select(payload.tarifs)}
+            FROM {COMPARATIF_TABLE}
+            WHERE {where_sql}
+            {build_order(payload)}
+            OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY
+        """
+        return sql, {**params, "offset": offset, "limit": limit}
+
+    # Sous-requête : ratio_max_min n'est visible dans le WHERE qu'une fois calculé
+    seek_sql, seek_params = keyset_condition(sort_keys(payload), cursor_values)
+    sql = f"""
+        SELECT TOP (:limit) *
+        FROM (
+            SELECT {build_select(payload.tarifs)}
+            FROM {COMPARATIF_TABLE}
+            WHERE {where_sql}
+        ) AS comparatif
+        WHERE {seek_sql}
+        {build_order(payload)}
+    """
+    return sql, {**params, **seek_params, "limit": limit}
+
+
+def export_columns(tarifs: list[int]) -> list[str]:
+    """En-têtes de l'export : colonnes fixes, ratio si plusieurs tarifs, puis colonnes par tarif"""
+    columns = [
+        "cod_pro", "refint", "nom_pro", "qualite", "statut", "prix_achat",
+        "pmp_LM", "stock_LM", "ca_LM", "qte_LM", "marge_LM"
+    ]
+    if len(tarifs) >= 2:
+        columns.append("ratio_max_min")
+    return columns + tarif_columns(sorted(tarifs))
+
+
+def build_export_query(payload: ComparatifFilterRequest) -> tuple[str, dict]:
+    """Toutes les lignes filtrées, dans l'ordre d'affichage : lues en flux, jamais paginées"""
+    where_sql, params = build_where(payload)
+    sql = f"""
+        SELECT {build_select(payload.tarifs)}
+        FROM {COMPARATIF_TABLE}
+        WHERE {where_sql}
+        {build_order(payload)}
+    """
+    return sql, params
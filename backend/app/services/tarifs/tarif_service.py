@@ -2,22 +2,13 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.common.redis_client import redis_client
 from app.cache.cache_keys import tarif_filter_options_key
+from app.cache.read_through import read_through
 from app.common.constants import REDIS_TTL_MEDIUM
-from app.common.logger import logger
-import json
 
 
+@read_through(key=lambda db: tarif_filter_options_key(), ttl=REDIS_TTL_MEDIUM, local_ttl=REDIS_TTL_MEDIUM)
 async def get_tarif_filter_options(db: AsyncSession):
-    redis_key = tarif_filter_options_key()
-    try:
-        cached = await redis_client.get(redis_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        logger.exception("[Redis] get_tarif_filter_options fallback")
-
     query = """
     SELECT 
         no_tarif,
@@ -28,12 +19,5 @@ async def get_tarif_filter_options(db: AsyncSession):
     """
     result = await db.execute(text(query))
     rows = result.fetchall()
-    data = [{"no_tarif": row.no_tarif, "lib_tarif": row.lib_tarif} for row in rows]
-
-    try:
-        await redis_client.set(redis_key, json.dumps(data), ex=REDIS_TTL_MEDIUM)
-    except Exception:
-        logger.exception("[Redis] set failed get_tarif_filter_options")
-
-    return data
+    return [{"no_tarif": row.no_tarif, "lib_tarif": row.lib_tarif} for row in rows]
 
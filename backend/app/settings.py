@@ -14,10 +14,38 @@ class Settings(BaseSettings):
     SQL_USER: str
     SQL_PASSWORD: str
     
+    # === POOL DE CONNEXIONS SQL SERVER (par worker) ===
+    DB_POOL_SIZE: int = 50
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: int = 5  # attente max d'une connexion libre (s)
+    DB_POOL_RECYCLE: int = -1  # durée de vie max d'une connexion (s), -1 : illimitée
+    DB_POOL_PRE_PING: bool = True  # SELECT 1 à chaque checkout (détecte les connexions coupées)
+
     # === REDIS ===
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_MAX_CONNECTIONS: int = 100
+    REDIS_POOL_TIMEOUT: int = 5  # attente max d'une connexion libre (s)
+
+    # === CACHE LOCAL (L1, par worker) ===
+    LOCAL_CACHE_MAX_ENTRIES: int = 512
+    LOCAL_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # === PRÉCHAUFFAGE DU CACHE ===
+    CACHE_WARMUP_ON_STARTUP: bool = False
+    CACHE_WARMUP_CONCURRENCY: int = 4
+    CACHE_WARMUP_TOP_COMBINATIONS: int = 10
+    CACHE_WARMUP_PAGES: int = 3
+
+    # === DATAMART VENTES MENSUELLES (dashboard) ===
+    DASHBOARD_DATAMART_ENABLED: bool = False
+    DASHBOARD_DATAMART_REFRESH_MINUTES: int = 0  # 0 : rafraîchissement externe (CLI / planificateur)
     
+    # === JOBS D'EXPORT (fichiers sur disque local, état dans Redis) ===
+    EXPORT_DIR: str = "./exports"
+    EXPORT_JOBS_CONCURRENCY: int = 2  # exports simultanés par worker
+    EXPORT_JOB_TTL_MINUTES: int = 60  # durée de conservation du fichier et de l'état du job
+
     # === DATABASE ===
     DATABASE_URL: str
     
@@ -0,0 +1,85 @@
+# scripts/tools/bench_cache_serializer.py
+# Compare taille et temps encode/decode : json.dumps historique vs app.cache.serializer
+# Usage : python scripts/tools/bench_cache_serializer.py [nb_lignes ...]
+import json
+import os
+import random
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from app.cache import serializer  # noqa: E402
+
+REPEAT = 5
+
+
+def fake_comparatif_rows(n, tarifs=(1, 2, 3)):
+    """Lignes au format de _compute_comparatif_multi (valeurs réalistes, déjà normalisées)"""
+    rnd = random.Random(42)
+    qualites = ["OE", "OEM", "PMQ", "PMV"]
+    rows = []
+    for i in range(n):
+        prix_achat = round(rnd.uniform(1, 500), 2)
+        rows.append({
+            "cod_pro": 100000 + i,
+            "refint": f"REF{rnd.randint(10000, 99999)}-{i}",
+            "nom_pro": f"PIECE DETACHEE MODELE {rnd.randint(1, 999)} {rnd.choice(['AV', 'AR', 'G', 'D'])}",
+            "qualite": rnd.choice(qualites),
+            "statut": rnd.choice([0, 0, 0, 1, 8]),
+            "prix_achat": prix_achat,
+            "pmp_LM": round(prix_achat * rnd.uniform(0.9, 1.1), 4),
+            "stock_LM": rnd.randint(0, 200),
+            "ca_LM": round(rnd.uniform(0, 50000), 2),
+            "qte_LM": rnd.randint(0, 1000),
+            "marge_LM": round(rnd.uniform(-0.1, 0.6), 4),
+            "tarifs": {
+                str(t): {
+                    "prix": round(prix_achat * rnd.uniform(1.1, 2.5), 2),
+                    "marge": round(rnd.uniform(0, 0.6), 4),
+                    "qte": rnd.randint(0, 300),
+                    "ca": round(rnd.uniform(0, 20000), 2),
+                    "marge_realisee": round(rnd.uniform(0, 0.5), 4),
+                }
+                for t in tarifs
+            },
+            "ratio_max_min": round(rnd.uniform(1, 2), 4),
+        })
+    return {"total": n, "rows": rows, "meta": {"page": 1, "page_size": n, "cached": False}}
+
+
+def timed(func, arg):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def bench(n):
+    payload = fake_comparatif_rows(n)
+    candidates = {
+        "json (historique)": (lambda v: json.dumps(v).encode(), json.loads),
+        "json + zlib": (lambda v: zlib.compress(json.dumps(v).encode(), 1),
+                        lambda b: json.loads(zlib.decompress(b))),
+        "serializer": (serializer.dumps, serializer.loads),
+    }
+    print(f"\n=== {n} lignes ===")
+    print(f"{'format':<20}{'taille (Ko)':>14}{'encode (ms)':>14}{'decode (ms)':>14}")
+    for name, (encode, decode) in candidates.items():
+        raw, t_enc = timed(encode, payload)
+        decoded, t_dec = timed(decode, raw)
+        assert decoded == json.loads(json.dumps(payload))
+        print(f"{name:<20}{len(raw) / 1024:>14.1f}{t_enc:>14.2f}{t_dec:>14.2f}")
+
+
+if __name__ == "__main__":
+    codecs = [
+        "orjson" if serializer.orjson else "json",
+        "zstd" if serializer.zstandard else "zlib",
+    ]
+    print(f"serializer : {' + '.join(codecs)}")
+    for n in [int(arg) for arg in sys.argv[1:]] or [50, 1000, 20000]:
+        bench(n)
@@ -0,0 +1,93 @@
+# scripts/tools/bench_log_modifications.py
+# Compare l'enregistrement des modifications tarif : boucle historique (INSERT + UPDATE par entrée)
+# vs lot OPENJSON (LOG_MODIFICATIONS_BATCH_SQL). Tout est exécuté puis annulé (ROLLBACK).
+# Usage : python scripts/tools/bench_log_modifications.py [nb_entrees ...]   (backend/.env requis)
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db.engine import engine  # noqa: E402
+from app.services.logs.log_modification_service import LOG_MODIFICATIONS_BATCH_SQL  # noqa: E402
+
+UTILISATEUR = "bench@cbm.local"
+
+INSERT_SQL = """
+    INSERT INTO [Pricing].[Log_modifications_tarif]
+    (cod_pro, refint, no_tarif, ancien_prix, nouveau_prix, ancienne_marge,
+     marge_simulee, statut_utilisateur, commentaire_utilisateur, date_modification, utilisateur)
+    VALUES
+    (:cod_pro, :refint, :no_tarif, :ancien_prix, :nouveau_prix, :ancienne_marge,
+     :marge_simulee, :statut_utilisateur, :commentaire_utilisateur, GETDATE(), :utilisateur)
+"""
+
+UPDATE_SQL = """
+    UPDATE [CBM_DATA].[Pricing].[Alertes_Tarif]
+    SET statut_utilisateur = :statut_utilisateur,
+        commentaire_utilisateur = :commentaire_utilisateur,
+        date_action_utilisateur = GETDATE(),
+        auteur_action = :utilisateur
+    WHERE cod_pro = :cod_pro AND no_tarif = :no_tarif AND est_active = 1
+"""
+
+
+async def sample_entries(conn, n):
+    """Entrées réalistes : couples (cod_pro, no_tarif) portant des alertes actives"""
+    result = await conn.execute(text("""
+        SELECT TOP (:n) cod_pro, refint, no_tarif
+        FROM [CBM_DATA].[Pricing].[Alertes_Tarif]
+        WHERE est_active = 1
+    """), {"n": n})
+    rows = result.fetchall()
+    return [
+        {
+            "cod_pro": r[0], "refint": r[1], "no_tarif": r[2],
+            "ancien_prix": 10.0, "nouveau_prix": 10.5, "ancienne_marge": 0.3, "marge_simulee": 0.33,
+            "statut_utilisateur": "CORRIGEE", "commentaire_utilisateur": "benchmark"
+        }
+        for r in (rows * (n // max(len(rows), 1) + 1))[:n]
+    ]
+
+
+async def loop_version(conn, entries):
+    for entry in entries:
+        await conn.execute(text(INSERT_SQL), {**entry, "utilisateur": UTILISATEUR})
+        await conn.execute(text(UPDATE_SQL), {**entry, "utilisateur": UTILISATEUR})
+
+
+async def batch_version(conn, entries):
+    await conn.execute(text(LOG_MODIFICATIONS_BATCH_SQL), {
+        "entries": json.dumps(entries), "utilisateur": UTILISATEUR
+    })
+
+
+async def timed(version, entries):
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            start = time.perf_counter()
+            await version(conn, entries)
+            return time.perf_counter() - start
+        finally:
+            await transaction.rollback()
+
+
+async def main(sizes):
+    async with engine.connect() as conn:
+        entries = await sample_entries(conn, max(sizes))
+    print(f"{'entrées':>8}{'boucle (ms)':>14}{'lot (ms)':>12}{'boucle (/s)':>14}{'lot (/s)':>12}")
+    for n in sizes:
+        batch = entries[:n]
+        t_loop = await timed(loop_version, batch)
+        t_batch = await timed(batch_version, batch)
+        print(f"{n:>8}{t_loop * 1000:>14.1f}{t_batch * 1000:>12.1f}{n / t_loop:>14.0f}{n / t_batch:>12.0f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(arg) for arg in sys.argv[1:]] or [10, 100, 1000]))
@@ -0,0 +1,59 @@
+# 📄 tests/backend/cache/test_cache_keys.py
+from app.cache.cache_keys import (
+    canonical_key,
+    alertes_map_key,
+    comparatif_multi_key,
+    alertes_summary_key,
+    dashboard_histo_key,
+    dashboard_kpi_key,
+    dashboard_products_key,
+    resolve_codpro_key,
+)
+from app.cache.stats import key_prefix
+from app.schemas.alertes.alertes_schema import AlertesSummaryRequest
+from app.schemas.produits.identifier_schema import ProductIdentifierRequest
+
+
+def test_list_order_and_duplicates_do_not_matter():
+    assert alertes_map_key(1, [3, 1, 2]) == alertes_map_key(1, [1, 2, 3, 3])
+    assert dashboard_histo_key(1, [3, 1, 2]) == dashboard_histo_key(1, [2, 3, 1])
+    assert dashboard_kpi_key(1, [3, 1, 2]) == dashboard_kpi_key(1, [1, 2, 3])
+    assert dashboard_products_key(1, [9, 8], 0, 100) == dashboard_products_key(1, [8, 9], 0, 100)
+
+
+def test_distinct_queries_get_distinct_keys():
+    assert alertes_map_key(1, [1, 2]) != alertes_map_key(2, [1, 2])
+    assert dashboard_products_key(1, [1, 2], 0, 100) != dashboard_products_key(1, [1, 2], 1, 100)
+    assert dashboard_histo_key(1, [1, 2]) != dashboard_histo_key(1, [1, 2, 3])
+
+
+def test_ordered_and_nested_lists_are_kept_as_is():
+    assert canonical_key("x", tarifs=[2, 1]) != canonical_key("x", tarifs=[1, 2])
+    assert canonical_key("x", tarifs=[1, 1]) != canonical_key("x", tarifs=[1])
+    assert canonical_key("x", filters=[{"a": 1}, ["b"]]) == canonical_key("x", filters=[{"a": 1}, ["b"]])
+    assert comparatif_multi_key(tarifs=[1, 2], page=1) != comparatif_multi_key(tarifs=[2, 1], page=1)
+    assert key_prefix(comparatif_multi_key(tarifs=list(range(3)), cod_pro=None)) == "comparatif_multi"
+
+
+def test_none_empty_and_whitespace_are_normalized():
+    assert canonical_key("x", ref_crn=" ABC ", refint=None, qualite="") == canonical_key("x", ref_crn="ABC")
+    assert canonical_key("x", a=1, b=2) == canonical_key("x", b=2, a=1)
+
+
+def test_pydantic_defaults_are_ignored():
+    explicit = ProductIdentifierRequest(ref_crn="ABC", grouping_crn=0, cod_pro=None)
+    implicit = ProductIdentifierRequest(ref_crn="ABC")
+    assert resolve_codpro_key(**explicit.model_dump(exclude_defaults=True)) == \
+        resolve_codpro_key(**implicit.model_dump(exclude_defaults=True))
+
+    summary_explicit = AlertesSummaryRequest(no_tarif=5, page=1, sort_by="ca_total", sort_dir="desc")
+    summary_implicit = AlertesSummaryRequest(no_tarif=5)
+    assert alertes_summary_key(**summary_explicit.model_dump(exclude_defaults=True)) == \
+        alertes_summary_key(**summary_implicit.model_dump(exclude_defaults=True))
+
+
+def test_keys_are_bounded_and_keep_their_prefix():
+    key = dashboard_products_key(1, list(range(1000)), 0, 100)
+    assert len(key) < 60
+    assert key_prefix(key) == "dashboard:products"
+    assert key_prefix(resolve_codpro_key(ref_crn="ABC")) == "resolve_codpro"
@@ -0,0 +1,37 @@
+# 📄 tests/backend/cache/test_local_cache.py
+import time
+from app.cache.local_cache import LocalCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LocalCache(max_entries=2, max_bytes=1000)
+    cache.set("a", 1, 10, ttl=60)
+    cache.set("b", 2, 10, ttl=60)
+    assert cache.get("a") == 1
+    cache.set("c", 3, 10, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_byte_budget_and_oversized_entries():
+    cache = LocalCache(max_entries=10, max_bytes=100)
+    cache.set("a", "x", 60, ttl=60)
+    cache.set("b", "y", 60, ttl=60)
+    cache.set("huge", "z", 500, ttl=60)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y"
+    assert cache.get("huge") is None
+    assert cache.stats()["bytes"] == 60
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    cache = LocalCache(max_entries=10, max_bytes=100)
+    cache.set("a", 1, 10, ttl=5)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+
+    assert cache.get("a", "absent") == "absent"
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,224 @@
+# 📄 tests/backend/cache/test_read_through.py
+import asyncio
+import pytest
+from app.cache import read_through as rt
+from app.cache import local_cache, tags
+from app.cache.stats import cache_stats
+from app.db.counts import count_total
+from tests.backend.utils.fake_redis import FakeRedis
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(rt, "redis_client", fake)
+    monkeypatch.setattr(tags, "redis_client", fake)
+    monkeypatch.setattr(local_cache, "redis_client", fake)
+    cache_stats.reset()
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_coalesced(fake_redis):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"items": [1, 2, 3]}
+
+    results = await asyncio.gather(*[rt.get_or_compute("dashboard:kpi:42:1", compute, 30) for _ in range(20)])
+
+    assert calls == 1
+    assert all(r == {"items": [1, 2, 3]} for r in results)
+    stats = cache_stats.snapshot()["by_prefix"]["dashboard:kpi"]
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 19
+
+
+@pytest.mark.asyncio
+async def test_second_call_is_a_hit(fake_redis):
+    @rt.read_through(key=lambda cod_pro, db: f"suggest:refcrn:{cod_pro}", ttl=30)
+    async def fetch(cod_pro, db):
+        return [f"CRN{cod_pro}"]
+
+    assert await fetch(1, None) == ["CRN1"]
+    assert await fetch(1, None) == ["CRN1"]
+    assert cache_stats.snapshot()["by_prefix"]["suggest:refcrn"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_waits_for_peer_worker_holding_lock(fake_redis):
+    fake_redis.store["lock:fiche:42:1"] = b"other-worker"
+
+    async def peer_publishes():
+        await asyncio.sleep(0.1)
+        fake_redis.store["fiche:42:1"] = b'[{"cod_pro": 1}]'
+        del fake_redis.store["lock:fiche:42:1"]
+
+    async def compute():
+        raise AssertionError("le calcul doit être fait par le worker détenteur du verrou")
+
+    _, value = await asyncio.gather(peer_publishes(), rt.get_or_compute("fiche:42:1", compute, 30))
+    assert value == [{"cod_pro": 1}]
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_revalidating(fake_redis):
+    fake_redis.store["dashboard:products:abc"] = b'{"total": 1}'  # témoin :fresh expiré
+
+    async def compute():
+        raise AssertionError("la requête ne doit pas attendre le recalcul")
+
+    async def refresh():
+        return {"total": 2}
+
+    value = await rt.get_or_compute("dashboard:products:abc", compute, 30, stale_ttl=600, refresh=refresh)
+    assert value == {"total": 1}
+
+    await asyncio.gather(*rt._revalidating.values())
+    assert rt.serializer.loads(fake_redis.store["dashboard:products:abc"]) == {"total": 2}
+    assert "dashboard:products:abc:fresh" in fake_redis.store
+    assert cache_stats.snapshot()["by_prefix"]["dashboard:products"]["stale"] == 1
+
+
+@pytest.mark.asyncio
+async def test_local_tier_skips_redis(fake_redis):
+    rt.local_cache.clear()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return [{"no_tarif": 1, "visible": 1}]
+
+    first = await rt.get_or_compute("parametres:tarifs", compute, 30, local_ttl=30)
+    fake_redis.store.clear()
+    second = await rt.get_or_compute("parametres:tarifs", compute, 30, local_ttl=30)
+
+    assert first == second
+    assert calls == 1
+    assert cache_stats.snapshot()["by_prefix"]["parametres:tarifs"]["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_purges_registered_keys(fake_redis):
+    async def compute():
+        return {"rows": []}
+
+    await rt.get_or_compute("alertes:details:5:1", compute, 30, tags=["tag:cod_pro:5"])
+    await rt.get_or_compute("alertes:details:6:1", compute, 30, tags=["tag:cod_pro:6"])
+    await tags.invalidate_tags("tag:cod_pro:5")
+
+    assert "alertes:details:5:1" not in fake_redis.store
+    assert "tag:cod_pro:5" not in fake_redis.store
+    assert "alertes:details:6:1" in fake_redis.store
+
+
+@pytest.mark.asyncio
+async def test_tag_ttl_covers_longest_lived_key(fake_redis):
+    async def compute():
+        return {"rows": [1]}
+
+    await rt.get_or_compute("parametres:tarifs", compute, 86400, tags=["tag:no_tarif:1"])
+    await rt.get_or_compute("dashboard:kpi:1:abc", compute, 30, stale_ttl=600, tags=["tag:no_tarif:1"])
+
+    assert fake_redis.ttls["tag:no_tarif:1"] == 86400
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_computes_only_missing_keys(fake_redis):
+    await rt.set_many({"alertes:details:1:7": [{"code_regle": "R1"}]}, 30)
+    batches = []
+
+    async def compute_missing(cod_pros):
+        batches.append(cod_pros)
+        return {cod: [] for cod in cod_pros}
+
+    keys = {cod: f"alertes:details:{cod}:7" for cod in (1, 2, 3)}
+    result = await rt.get_or_compute_many(keys, compute_missing, 30, tags=lambda cod: [f"tag:cod_pro:{cod}"])
+
+    assert result == {1: [{"code_regle": "R1"}], 2: [], 3: []}
+    assert batches == [[2, 3]]
+    assert rt.serializer.loads(fake_redis.store["alertes:details:3:7"]) == []
+    assert b"alertes:details:2:7" in fake_redis.store["tag:cod_pro:2"]
+
+
+@pytest.mark.asyncio
+async def test_empty_result_is_cached_as_negative_entry(fake_redis):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return []
+
+    for _ in range(3):
+        assert await rt.get_or_compute("resolve_codpro:abc", compute, 30, negative_ttl=5) == []
+
+    assert calls == 1
+    assert fake_redis.store["resolve_codpro:abc"].startswith(rt.NEGATIVE_PREFIX)
+    assert fake_redis.ttls["resolve_codpro:abc"] == 5
+    assert cache_stats.snapshot()["totals"]["negative_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_count_total_falls_back_to_cached_exact_count(fake_redis):
+    class SessionWithoutDmvAccess:
+        async def execute(self, *args, **kwargs):
+            raise RuntimeError("VIEW DATABASE STATE refusé")
+
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return 42
+
+    for _ in range(2):
+        total, exact = await count_total(
+            SessionWithoutDmvAccess(), "count:alertes:abc", compute, unfiltered_table="Pricing.Alertes_Synthese"
+        )
+
+    assert (total, exact, calls) == (42, True, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_count_is_not_cached(fake_redis):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("timeout SQL")
+        return 42
+
+    with pytest.raises(RuntimeError):
+        await count_total(None, "count:comparatif:abc", compute)
+    assert await count_total(None, "count:comparatif:abc", compute) == (42, True)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_owner_does_not_fail_coalesced_callers(fake_redis):
+    started = asyncio.Event()
+
+    async def owner_compute():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def waiter_compute():
+        return {"items": [7]}
+
+    owner = asyncio.create_task(rt.get_or_compute("dashboard:kpi:7:1", owner_compute, 30))
+    await started.wait()
+    waiter = asyncio.create_task(rt.get_or_compute("dashboard:kpi:7:1", waiter_compute, 30))
+    await asyncio.sleep(0)
+    owner.cancel()
+
+    assert await waiter == {"items": [7]}
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    assert "dashboard:kpi:7:1" not in rt._inflight
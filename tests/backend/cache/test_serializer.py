@@ -0,0 +1,27 @@
+# 📄 tests/backend/cache/test_serializer.py
+import datetime
+import decimal
+import json
+from app.cache import serializer
+
+
+def test_roundtrip_small_payload_is_not_compressed():
+    value = {"no_tarif": 1, "prix": decimal.Decimal("12.50"), "date": datetime.date(2024, 1, 31)}
+    raw = serializer.dumps(value)
+
+    assert raw[:3] == serializer.MAGIC
+    assert raw[4] == serializer.CODEC_RAW
+    assert serializer.loads(raw) == {"no_tarif": 1, "prix": 12.5, "date": "2024-01-31"}
+
+
+def test_large_payload_is_compressed():
+    value = {"rows": [{"cod_pro": i, "refint": f"REF{i}", "tarifs": {"1": {"prix": 1.5}}} for i in range(500)]}
+    raw = serializer.dumps(value)
+
+    assert raw[4] in (serializer.CODEC_ZLIB, serializer.CODEC_ZSTD)
+    assert len(raw) < len(json.dumps(value)) / 3
+    assert serializer.loads(raw) == value
+
+
+def test_legacy_plain_json_is_still_readable():
+    assert serializer.loads(json.dumps({"total": 3}).encode()) == {"total": 3}
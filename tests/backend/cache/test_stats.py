@@ -0,0 +1,34 @@
+# 📄 tests/backend/cache/test_stats.py
+from app.cache.stats import CacheStats, key_prefix
+
+
+def test_key_prefix():
+    assert key_prefix("dashboard:kpi:42:1,2") == "dashboard:kpi"
+    assert key_prefix("fiche:3:1234") == "fiche"
+    assert key_prefix("resolve_codpro:9e107d9d372bb6826bd81d3542a419d6") == "resolve_codpro"
+
+
+def test_snapshot_per_prefix_hit_rate_and_histograms():
+    stats = CacheStats()
+    stats.incr("dashboard:products", "hits", 3)
+    stats.incr("dashboard:products", "misses")
+    for ms in (3, 4, 40, 400):
+        stats.observe("dashboard:products", "compute_latency_ms", ms)
+
+    products = stats.snapshot()["by_prefix"]["dashboard:products"]
+    assert products["hit_rate"] == 0.75
+    assert products["compute_latency_ms"]["count"] == 4
+    assert products["compute_latency_ms"]["p50"] == 5.0
+    assert products["compute_latency_ms"]["p95"] == 500.0
+
+
+def test_prometheus_exposition():
+    stats = CacheStats()
+    stats.incr("fiche", "misses")
+    stats.observe("fiche", "payload_bytes", 2000)
+
+    text = stats.to_prometheus()
+    assert 'cbm_cache_events_total{prefix="fiche",event="misses"} 1' in text
+    assert 'cbm_cache_payload_bytes_bucket{prefix="fiche",le="1024"} 0' in text
+    assert 'cbm_cache_payload_bytes_bucket{prefix="fiche",le="4096"} 1' in text
+    assert 'cbm_cache_payload_bytes_count{prefix="fiche"} 1' in text
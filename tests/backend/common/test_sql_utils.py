@@ -0,0 +1,38 @@
+# 📄 tests/backend/common/test_sql_utils.py
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from app.common.pagination import decode_cursor, encode_cursor
+from app.common.sql_utils import json_int_list, keyset_condition
+
+
+def test_json_int_list_sql_is_independent_of_list_size():
+    small_sql, small_params = json_int_list("cod_pro_json", [1, 2])
+    large_sql, large_params = json_int_list("cod_pro_json", list(range(20_000)))
+
+    assert small_sql == large_sql == "SELECT CAST([value] AS INT) FROM OPENJSON(:cod_pro_json)"
+    assert json.loads(small_params["cod_pro_json"]) == [1, 2]
+    assert len(json.loads(large_params["cod_pro_json"])) == 20_000
+
+
+def test_keyset_condition_expands_tiebreakers_and_null_ordering():
+    sql, params = keyset_condition([("ca_total", "desc"), ("cod_pro", "asc")], [1250.5, 42])
+
+    assert sql == "((ca_total < :seek0 OR ca_total IS NULL) OR (ca_total = :seek0 AND cod_pro > :seek1))"
+    assert params == {"seek0": 1250.5, "seek1": 42}
+
+    null_sql, null_params = keyset_condition([("ca_total", "desc"), ("cod_pro", "asc")], [None, 42])
+    assert null_sql == "((ca_total IS NULL AND cod_pro > :seek1))"
+    assert null_params == {"seek1": 42}
+
+
+def test_cursor_round_trip_is_bound_to_sort_signature():
+    cursor = encode_cursor("ca_total:desc,cod_pro:asc", [Decimal("12.50"), datetime(2024, 5, 1, 8, 30), 42])
+
+    assert decode_cursor(cursor, "ca_total:desc,cod_pro:asc") == ["12.50", "2024-05-01T08:30:00.000", 42]
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "refint:asc,cod_pro:asc")
+    with pytest.raises(ValueError):
+        decode_cursor("pas-un-curseur", "ca_total:desc,cod_pro:asc")
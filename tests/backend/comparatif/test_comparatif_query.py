@@ -0,0 +1,55 @@
+# 📄 tests/backend/comparatif/test_comparatif_query.py
+import pytest
+from app.schemas.tarifs.comparatif_multi_schema import ComparatifFilterRequest
+from app.services.tarifs.comparatif_query import (
+    build_count_query, build_export_query, build_page_query, export_columns, validate_tarifs
+)
+
+
+def test_filters_are_bound_parameters_and_sql_is_stable():
+    first = ComparatifFilterRequest(tarifs=[7, 13], cod_pro=1, refint="ab'c", qualite="OE", page=1)
+    other = ComparatifFilterRequest(tarifs=[7, 13], cod_pro=2, refint="xyz", qualite="PMQ", page=5)
+
+    sql, params = build_page_query(first, offset=0, limit=100)
+    other_sql, _ = build_page_query(other, offset=400, limit=100)
+
+    assert sql == other_sql
+    assert "ab'c" not in sql
+    assert params == {"cod_pro": 1, "refint": "%ab'c%", "qualite": "OE", "offset": 0, "limit": 100}
+    count_sql, count_params = build_count_query(first)
+    assert "OFFSET" not in count_sql and count_params == {"cod_pro": 1, "refint": "%ab'c%", "qualite": "OE"}
+
+
+def test_unknown_sort_column_falls_back_to_default_order():
+    payload = ComparatifFilterRequest(tarifs=[7, 13], sort_by="cod_pro; DROP TABLE x", sort_dir="desc")
+    sql, _ = build_page_query(payload, offset=0, limit=10)
+
+    assert "DROP" not in sql
+    assert "ORDER BY [ratio_max_min] DESC, cod_pro ASC" in sql
+
+
+def test_validate_tarifs_rejects_tarif_without_pivot_columns():
+    validate_tarifs([7, 13], [7, 13, 20])
+    with pytest.raises(ValueError):
+        validate_tarifs([7, 99], [7, 13, 20])
+
+
+def test_cursor_page_seeks_after_last_row_without_offset():
+    payload = ComparatifFilterRequest(tarifs=[7, 13], sort_by="prix_7", sort_dir="asc", qualite="OE")
+    sql, params = build_page_query(payload, offset=0, limit=50, cursor_values=["10.5", 1234])
+
+    assert "OFFSET" not in sql and "TOP (:limit)" in sql
+    assert "([prix_7] > :seek0 OR ([prix_7] = :seek0 AND cod_pro > :seek1))" in sql
+    assert params == {"qualite": "OE", "seek0": "10.5", "seek1": 1234, "limit": 50}
+
+
+def test_export_query_is_unpaginated_and_columns_follow_tarifs():
+    payload = ComparatifFilterRequest(tarifs=[13, 7], refint="ab", sort_by="prix_7", sort_dir="asc")
+    sql, params = build_export_query(payload)
+
+    assert "OFFSET" not in sql and "TOP" not in sql
+    assert "ORDER BY [prix_7] ASC, cod_pro ASC" in sql
+    assert params == {"refint": "%ab%"}
+    columns = export_columns(payload.tarifs)
+    assert columns[11] == "ratio_max_min"
+    assert columns[12:14] == ["prix_7", "marge_7"] and columns[-1] == "marge_realisee_13"
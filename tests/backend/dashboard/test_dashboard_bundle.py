@@ -0,0 +1,47 @@
+# 📄 tests/backend/dashboard/test_dashboard_bundle.py
+import pytest
+
+from app.services.dashboard import dashboard_service
+
+
+class FakeResult:
+    def fetchall(self):
+        return []
+
+
+class FakeSession:
+    def __init__(self, fail_on=None):
+        self.statements, self.fail_on = [], fail_on
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((sql, params))
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("Invalid object name")
+        return FakeResult()
+
+
+@pytest.mark.asyncio
+async def test_bundle_creates_temp_tables_before_parameterized_statements():
+    db = FakeSession()
+
+    result = await dashboard_service._query_dashboard_bundle(1, [3, 4], 100, db)
+
+    (create, create_params), (fill, fill_params), *reads, (drop, drop_params) = db.statements
+    # Création sans paramètre (exécution directe) : les tables #temp survivent à l'appel
+    assert create_params is None and ":no_tarif" not in create and ":cod_pro_json" not in create
+    assert "INTO #bundle_ventes" in create and "INSERT" not in create
+    assert fill_params["no_tarif"] == 1 and "INSERT INTO #bundle_ventes" in fill
+    assert len(reads) == 3 and all("#bundle_" in sql and params for sql, params in reads)
+    assert drop_params is None and "DROP TABLE IF EXISTS #bundle_ventes" in drop
+    assert result["products"] == {"total": 0, "rows": [], "total_exact": True, "next_cursor": None}
+
+
+@pytest.mark.asyncio
+async def test_bundle_drops_temp_tables_when_a_read_fails():
+    db = FakeSession(fail_on="ORDER BY b.periode")
+
+    with pytest.raises(RuntimeError):
+        await dashboard_service._query_dashboard_bundle(1, [3, 4], 100, db)
+
+    assert "DROP TABLE IF EXISTS #bundle_produits" in db.statements[-1][0]
@@ -0,0 +1,76 @@
+# 📄 tests/backend/dashboard/test_ventes_mensuelles.py
+# Datamart Ventes_Mensuelles sans serveur SQL : texte du rafraîchissement et choix de la source
+import re
+
+import pytest
+
+from app.services.dashboard import ventes_mensuelles as vm
+from app.settings import get_settings
+
+
+class FakeMappings:
+    def one(self):
+        return {"debut": "2026-09-01", "watermark": "2026-10-16", "lignes": 12}
+
+
+class FakeResult:
+    def mappings(self):
+        return FakeMappings()
+
+
+class FakeSession:
+    def __init__(self, events):
+        self.events, self.params = events, []
+
+    async def execute(self, statement, params=None):
+        self.events.append("execute")
+        self.params.append(params)
+        return FakeResult()
+
+    async def commit(self):
+        self.events.append("commit")
+
+
+def test_refresh_window_is_rebuilt_in_staging_then_switched():
+    sql = vm.REFRESH_SQL
+    # Fenêtre : mois conservés avant le mois du watermark, recalcul à partir de ce mois
+    assert "DATEFROMPARTS(YEAR(@watermark), MONTH(@watermark), 1)" in sql
+    assert "IF @debut < @plus_ancien SET @debut = @plus_ancien" in sql
+    assert "WHERE mois >= @plus_ancien AND mois < @debut" in sql
+    assert "WHERE dat_mvt >= @debut AND dat_mvt <= @fin" in sql
+    # Jamais de DELETE / INSERT sur la table lue par le dashboard : bascule par SWITCH
+    assert not re.search(rf"(DELETE FROM|INSERT INTO) {re.escape(vm.VENTES_MENSUELLES_TABLE)}\b", sql)
+    assert sql.index(f"INSERT INTO {vm.STAGING_TABLE}") < sql.index(f"SWITCH TO {vm.ANCIEN_TABLE}") \
+        < sql.index(f"{vm.STAGING_TABLE} SWITCH TO {vm.VENTES_MENSUELLES_TABLE}")
+    for table in (vm.VENTES_MENSUELLES_TABLE, vm.STAGING_TABLE, vm.ANCIEN_TABLE):
+        assert f"CREATE TABLE {table} (" in vm.CREATE_TABLES_SQL
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("full", [False, True])
+async def test_refresh_commits_before_invalidating_dashboard_caches(monkeypatch, full):
+    events = []
+
+    async def fake_invalidate_tags(*tags):
+        events.append(("invalidate", tags))
+
+    monkeypatch.setattr(vm, "invalidate_tags", fake_invalidate_tags)
+    db = FakeSession(events)
+
+    summary = await vm.refresh_ventes_mensuelles(db, full=full)
+
+    assert events == ["execute", "execute", "commit", ("invalidate", ("tag:table:Ventes_Mensuelles",))]
+    assert db.params[1] == {"full": int(full), "mois_historique": vm.MOIS_HISTORIQUE}
+    assert summary["lignes"] == 12
+
+
+def test_ventes_source_follows_datamart_setting(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "DASHBOARD_DATAMART_ENABLED", True)
+    assert vm.VENTES_MENSUELLES_TABLE in vm.ventes_source()
+    assert vm.VENTES_MENSUELLES_TABLE in vm.ventes_depot_annee_sql(918)
+
+    monkeypatch.setattr(settings, "DASHBOARD_DATAMART_ENABLED", False)
+    assert vm.MOUVEMENTS_TABLE in vm.ventes_source()
+    assert vm.VENTES_MENSUELLES_TABLE not in vm.ventes_source()
+    assert "dat_mvt AS mois" in vm.ventes_source()
@@ -0,0 +1,81 @@
+# 📄 tests/backend/dashboard/test_ventes_mensuelles_parity.py
+# Parité datamart Ventes_Mensuelles / mouvements bruts (SQL Server CBM_DATA requis)
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+pytest.importorskip("aioodbc", reason="pilote SQL Server absent")
+
+# Modules `app.*` (et non `backend.app.*`) : ventes_source() lit app.settings, c'est
+# cette instance de Settings qu'il faut basculer pour comparer les deux sources
+from app.settings import get_settings  # noqa: E402
+from app.services.dashboard.dashboard_service import (  # noqa: E402
+    _query_dashboard_bundle,
+    _query_dashboard_kpi,
+    _query_dashboard_products,
+    _query_historique_prix_marge,
+)
+from app.services.dashboard.ventes_mensuelles import refresh_ventes_mensuelles  # noqa: E402
+
+NO_TARIF = 1
+
+
+@pytest.fixture
+async def mssql_session(db_session):
+    """Session de test sur CBM_DATA ; ignoré sous SQLite ou sans serveur joignable"""
+    if db_session.bind.dialect.name != "mssql":
+        pytest.skip("SQL Server CBM_DATA requis")
+    try:
+        await db_session.execute(text("SELECT 1"))
+    except Exception:
+        pytest.skip("SQL Server CBM_DATA injoignable")
+    return db_session
+
+
+async def _both_sources(monkeypatch, query, *args):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "DASHBOARD_DATAMART_ENABLED", False)
+    brut = await query(*args)
+    monkeypatch.setattr(settings, "DASHBOARD_DATAMART_ENABLED", True)
+    return brut, await query(*args)
+
+
+def _approx(rows):
+    return [
+        {k: round(float(v), 2) if isinstance(v, (int, float, Decimal)) else v for k, v in row.items()}
+        for row in rows
+    ]
+
+
+@pytest.mark.asyncio
+async def test_dashboard_queries_match_raw_movements(mssql_session, monkeypatch):
+    await refresh_ventes_mensuelles(mssql_session, full=True)
+    result = await mssql_session.execute(text("""
+        SELECT TOP 200 cod_pro FROM CBM_DATA.Pricing.Dimensions_Produit WHERE no_tarif = :no_tarif
+    """), {"no_tarif": NO_TARIF})
+    cod_pro_list = [r[0] for r in result.fetchall()]
+
+    brut, datamart = await _both_sources(monkeypatch, _query_dashboard_kpi, NO_TARIF, cod_pro_list, mssql_session)
+    assert _approx(datamart["items"]) == _approx(brut["items"])
+
+    brut, datamart = await _both_sources(monkeypatch, _query_historique_prix_marge, NO_TARIF, cod_pro_list, mssql_session)
+    assert _approx(datamart) == _approx(brut)
+
+    brut, datamart = await _both_sources(monkeypatch, _query_dashboard_products, NO_TARIF, cod_pro_list, 0, 400, mssql_session)
+    assert _approx(datamart["rows"]) == _approx(brut["rows"])
+
+
+@pytest.mark.asyncio
+async def test_bundle_matches_dashboard_queries(mssql_session):
+    result = await mssql_session.execute(text("""
+        SELECT TOP 200 cod_pro FROM CBM_DATA.Pricing.Dimensions_Produit WHERE no_tarif = :no_tarif
+    """), {"no_tarif": NO_TARIF})
+    cod_pro_list = [r[0] for r in result.fetchall()]
+
+    bundle = await _query_dashboard_bundle(NO_TARIF, cod_pro_list, 100, mssql_session)
+    assert bundle["kpi"] == await _query_dashboard_kpi(NO_TARIF, cod_pro_list, mssql_session)
+    assert bundle["historique"] == await _query_historique_prix_marge(NO_TARIF, cod_pro_list, mssql_session)
+    products = await _query_dashboard_products(NO_TARIF, cod_pro_list, 0, 100, mssql_session)
+    assert bundle["products"]["rows"] == products["rows"]
+    assert bundle["products"]["next_cursor"] == products["next_cursor"]
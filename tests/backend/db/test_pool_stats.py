@@ -0,0 +1,39 @@
+# 📄 tests/backend/db/test_pool_stats.py
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.db.pool_stats import TimedPoolMixin, pool_stats
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+def test_checkout_overflow_and_timeout():
+    pool = TimedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=1, timeout=0.05)
+    pool_stats.reset()
+    pool_stats.instrument(pool)
+
+    first, second = pool.connect(), pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    snapshot = pool_stats.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["checked_out"] == 2
+    assert snapshot["overflow"] == 1
+    assert snapshot["peak_overflow"] == 1
+    assert snapshot["saturation"] == 1.0
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checkout_wait_ms"]["count"] == 3
+    assert snapshot["checkout_wait_ms"]["p95"] >= 50
+
+    first.close()
+    second.close()
+    snapshot = pool_stats.snapshot()
+    assert snapshot["checkins"] == 2
+    assert snapshot["checked_out"] == 0
+    assert snapshot["peak_checked_out"] == 2
+    assert 'cbm_db_pool_events_total{event="timeouts"} 1' in pool_stats.to_prometheus()
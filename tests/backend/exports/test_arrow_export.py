@@ -0,0 +1,52 @@
+# 📄 tests/backend/exports/test_arrow_export.py
+import io
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from app.services.exports.arrow_export import arrow_chunks, arrow_schema, parquet_chunks  # noqa: E402
+
+COLUMNS = ["cod_pro", "refint", "prix_7", "marge_7", "date_detection"]
+BATCHES = (
+    [{"cod_pro": 1, "refint": "A", "prix_7": None, "marge_7": None, "date_detection": None}],
+    [{"cod_pro": 2, "refint": "B", "prix_7": Decimal("12.50"), "marge_7": 0.3, "date_detection": datetime(2024, 5, 1)}],
+)
+
+
+async def _chunks(*batches):
+    for batch in batches:
+        yield batch
+
+
+@pytest.mark.asyncio
+async def test_parquet_one_row_group_per_batch_with_stable_types():
+    import pyarrow.parquet as pq
+
+    parts = [part async for part in parquet_chunks(COLUMNS, _chunks(*BATCHES))]
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(parts)))
+
+    assert len(parts) == 3  # deux row groups puis le pied de fichier
+    assert parquet.num_row_groups == 2
+    table = parquet.read()
+    assert table.schema.field("cod_pro").type == pa.int64()
+    assert table.schema.field("prix_7").type == pa.float64()
+    assert table.schema.field("date_detection").type == pa.timestamp("ms")
+    assert table.column("prix_7").to_pylist() == [None, 12.5]
+
+
+@pytest.mark.asyncio
+async def test_arrow_ipc_file_roundtrip():
+    content = b"".join([part async for part in arrow_chunks(COLUMNS, _chunks(*BATCHES))])
+    table = pa.ipc.open_file(pa.BufferReader(content)).read_all()
+
+    assert table.num_rows == 2
+    assert table.column("refint").to_pylist() == ["A", "B"]
+
+
+def test_quantities_and_stock_are_integers():
+    schema = arrow_schema(pa, ["qte_LM", "stock_LM", "qte_7", "ca_7", "prix_7"])
+
+    assert [field.type for field in schema] == [pa.int64()] * 3 + [pa.float64()] * 2
@@ -0,0 +1,31 @@
+# 📄 tests/backend/exports/test_csv_export.py
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.services.exports.csv_export import csv_chunks
+
+
+async def _chunks(*batches):
+    for batch in batches:
+        yield batch
+
+
+@pytest.mark.asyncio
+async def test_csv_chunks_one_chunk_per_batch_with_header_and_bom():
+    columns = ["cod_pro", "prix_7", "date_detection"]
+    batches = (
+        [{"cod_pro": 1, "prix_7": Decimal("12.50"), "date_detection": datetime(2024, 5, 1, 8, 30)}],
+        [{"cod_pro": 2, "prix_7": None}],
+    )
+
+    parts = [part async for part in csv_chunks(columns, _chunks(*batches))]
+
+    assert len(parts) == 2
+    content = b"".join(parts).decode("utf-8-sig")
+    assert content.splitlines() == [
+        "cod_pro;prix_7;date_detection",
+        "1;12.5;2024-05-01T08:30:00",
+        "2;;",
+    ]
@@ -0,0 +1,34 @@
+# 📄 tests/backend/exports/test_export_jobs.py
+import asyncio
+
+import pytest
+
+from app.services.exports import jobs
+from app.settings import get_settings
+from tests.backend.utils.fake_redis import FakeRedis
+
+
+async def _chunks(*batches):
+    for batch in batches:
+        await asyncio.sleep(0)
+        yield batch
+
+
+@pytest.mark.asyncio
+async def test_export_job_writes_file_and_publishes_progress(monkeypatch, tmp_path):
+    monkeypatch.setattr(jobs, "redis_client", FakeRedis())
+    monkeypatch.setattr(jobs, "_semaphore", None)
+    monkeypatch.setattr(get_settings(), "EXPORT_DIR", str(tmp_path))
+
+    job = await jobs.start_export_job(
+        "alertes", "csv", ["cod_pro", "no_tarif"],
+        _chunks([{"cod_pro": 1, "no_tarif": 7}, {"cod_pro": 2, "no_tarif": 7}], [{"cod_pro": 3, "no_tarif": 7}])
+    )
+    assert (await jobs.get_export_job(job["job_id"]))["status"] in ("pending", "running")
+    await asyncio.gather(*jobs._running)
+
+    state = await jobs.get_export_job(job["job_id"])
+    assert state["status"] == "done" and state["rows"] == 3 and state["finished_at"]
+    with open(jobs.export_path(state), encoding="utf-8-sig") as exported:
+        assert exported.read().splitlines() == ["cod_pro;no_tarif", "1;7", "2;7", "3;7"]
+    assert jobs.cleanup_expired_exports() == 0
@@ -0,0 +1,38 @@
+# 📄 tests/backend/exports/test_xlsx_export.py
+import io
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("xlsxwriter")
+
+from app.services.exports.xlsx_export import xlsx_chunks  # noqa: E402
+
+
+async def _chunks(*batches):
+    for batch in batches:
+        yield batch
+
+
+@pytest.mark.asyncio
+async def test_xlsx_typed_cells_and_sheet_rollover():
+    columns = ["cod_pro", "refint", "prix_7", "date_detection"]
+    batches = (
+        [{"cod_pro": 1, "refint": "=A1", "prix_7": Decimal("12.50"), "date_detection": datetime(2024, 5, 1)}],
+        [{"cod_pro": 2, "refint": "0042", "prix_7": None}, {"cod_pro": 3, "refint": "B"}],
+    )
+
+    content = b"".join([part async for part in xlsx_chunks(columns, _chunks(*batches), max_rows=3)])
+
+    with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+        first = workbook.read("xl/worksheets/sheet1.xml").decode()
+        second = workbook.read("xl/worksheets/sheet2.xml").decode()
+    # Nombres et dates typés, texte jamais interprété comme formule
+    assert '<c r="C2"><v>12.5</v></c>' in first
+    assert '<c r="D2" s="2"><v>45413</v></c>' in first
+    assert '<c r="B2" t="inlineStr"><is><t>=A1</t></is></c>' in first
+    assert '<c r="B3" t="inlineStr"><is><t>0042</t></is></c>' in first
+    # Feuille pleine : en-tête répété sur la suivante
+    assert '<t>cod_pro</t>' in second and '<c r="A2"><v>3</v></c>' in second
@@ -0,0 +1,44 @@
+# 📄 tests/backend/parametres/test_parametres_service.py
+import json
+import pytest
+from app.schemas.parametres.parametres_schema import TarifParam
+from app.services.parametres import parametres_service
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeSession:
+    def __init__(self, updated):
+        self.updated, self.params, self.commits = updated, [], 0
+
+    async def execute(self, statement, params=None):
+        self.params.append(params)
+        return FakeResult(self.updated)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("updated, expected", [(0, []), (2, [("parametres:tarifs", "filter:tarif_options")])])
+async def test_visibility_update_is_one_statement_and_purges_dim_tarif_caches(monkeypatch, updated, expected):
+    purged = []
+
+    async def fake_invalidate(*keys):
+        purged.append(keys)
+
+    monkeypatch.setattr(parametres_service, "invalidate", fake_invalidate)
+    db = FakeSession(updated)
+    payload = [TarifParam(no_tarif=1, visible=True), TarifParam(no_tarif=2, visible=False), TarifParam(no_tarif=1, visible=False)]
+
+    result = await parametres_service.update_tarif_visibility(payload, db)
+
+    assert len(db.params) == 1 and db.commits == 1
+    assert json.loads(db.params[0]["visibilites"]) == [{"no_tarif": 1, "visible": False}, {"no_tarif": 2, "visible": False}]
+    assert result["updated"] == updated and purged == expected
@@ -0,0 +1,86 @@
+# 📄 tests/backend/utils/fake_redis.py
+# Redis en mémoire pour les tests unitaires (cache read-through, tags, jobs d'export) :
+# seules les commandes utilisées par l'application, sans serveur Redis.
+
+
+class FakeLock:
+    def __init__(self, store, name):
+        self.store, self.name = store, name
+
+    async def acquire(self, blocking=False):
+        if self.name in self.store:
+            return False
+        self.store[self.name] = b"token"
+        return True
+
+    async def release(self):
+        self.store.pop(self.name, None)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis, self.commands = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, name), args, kwargs))
+        return queue
+
+    async def execute(self):
+        return [await command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def mget(self, *keys):
+        return [self.store.get(k) for k in keys]
+
+    async def set(self, key, value, ex=None):
+        self.ttls[key] = ex
+        self.store[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    async def sadd(self, key, *members):
+        self.store.setdefault(key, set()).update(m.encode() for m in members)
+
+    async def smembers(self, key):
+        return self.store.get(key, set())
+
+    async def expire(self, key, seconds, nx=False, gt=False):
+        current = self.ttls.get(key)
+        if (nx and current is not None) or (gt and (current is None or seconds <= current)):
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        # Seul script utilisé : app.cache.tags.INVALIDATE_TAGS_SCRIPT
+        tag_names = keys_and_args[:numkeys]
+        keys = [k for tag in tag_names for k in await self.smembers(tag)]
+        await self.delete(*(k.decode() for k in keys), *tag_names)
+        return keys
+
+    async def publish(self, channel, message):
+        return 0
+
+    def lock(self, name, timeout=None):
+        return FakeLock(self.store, name)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)